@@ -0,0 +1,234 @@
+# Engine and prompt display benchmarks driven by synthetic keystroke streams
+#
+# Usage: python benchmarks/engine.py [--filter TEXT] [--quick] [--rounds N] [--json out.json]
+#                                    [--compare baseline.json] [--threshold 0.25]
+#
+# Every case runs in-process on a virtual clock, and calls are timed one by one, so we
+# report latency percentiles as well as throughput. Each case runs --rounds times and
+# keeps its fastest round, which filters out most scheduler noise. With --compare, a
+# case is flagged when its throughput drops or its median latency grows by more than
+# --threshold against the baseline JSON, and the exit status is 1. (p99 is reported
+# but too noisy to gate on.)
+
+import argparse
+import io
+import json
+import pathlib
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from monkeytyper_cli.core import engine # noqa: E402
+from monkeytyper_cli.core.models import GameMode, GameState # noqa: E402
+
+PROMPT_WORDS = (25, 100, 1000, 10000)
+QUICK_PROMPT_WORDS = (25, 1000)
+ERROR_RATES = (0.0, 0.05, 0.2)
+KEY_INTERVAL = 0.08 # Seconds between synthetic keystrokes (~150 WPM)
+CORRECTION_RATE = 0.5 # Share of mistakes the synthetic typist backspaces over and fixes
+DISPLAY_FRAMES = 200 # Frames rendered per display case, spread over the whole test
+MIN_KEYSTROKES = 20000 # Short prompts are replayed in fresh games until this many keys were timed
+SEED = 1234
+
+Keystroke = Tuple[str, float]
+
+
+def keystrokes(prompt: str, error_rate: float, rng: random.Random) -> List[Keystroke]:
+    """A typist who mistypes `error_rate` of the chars and corrects some of the mistakes."""
+    stream: List[Keystroke] = []
+    now = 0.0
+    for char in prompt:
+        if error_rate and rng.random() < error_rate:
+            stream.append(("x" if char != "x" else "z", now))
+            now += KEY_INTERVAL
+            if rng.random() >= CORRECTION_RATE:
+                continue # Left uncorrected; the cursor has moved on
+            stream.append((engine.BACKSPACE_CHAR, now))
+            now += KEY_INTERVAL
+        stream.append((char, now))
+        now += KEY_INTERVAL
+    return stream
+
+
+def new_game(words: int, now: List[float]) -> GameState:
+    game_state = engine.start_game(GameMode.WORDS, words, "en", seed=SEED)
+    game_state.clock = lambda: now[0]
+    return game_state
+
+
+def _latencies(samples_ns: List[int], ops: int, total_ns: int) -> Dict[str, float]:
+    samples_ns.sort()
+
+    def percentile(p: float) -> float:
+        return samples_ns[min(len(samples_ns) - 1, int(p / 100 * len(samples_ns)))] / 1000
+
+    return {
+        "ops": ops,
+        "ops_per_sec": round(ops / (total_ns / 1e9), 1) if total_ns else 0.0,
+        "mean_us": round(total_ns / ops / 1000, 3) if ops else 0.0,
+        "p50_us": round(percentile(50), 3),
+        "p95_us": round(percentile(95), 3),
+        "p99_us": round(percentile(99), 3),
+        "max_us": round(samples_ns[-1] / 1000, 3),
+    }
+
+
+def _repeat(func: Callable[[], object], min_time: float = 0.2, max_ops: int = 10000) -> Dict[str, float]:
+    """Calls `func` until `min_time` seconds or `max_ops` calls, timing each call."""
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(min_time * 1e9)
+    while len(samples) < max_ops and (not samples or clock() < deadline):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return _latencies(samples, len(samples), sum(samples))
+
+
+def bench_process_input(words: int, error_rate: float) -> Dict[str, float]:
+    now = [0.0]
+    process_input = engine.process_input
+    clock = time.perf_counter_ns
+    rng = random.Random(SEED)
+    samples: List[int] = []
+    while len(samples) < MIN_KEYSTROKES:
+        game_state = new_game(words, now)
+        for char, timestamp in keystrokes(game_state.prompt_text, error_rate, rng):
+            now[0] = timestamp
+            start = clock()
+            process_input(game_state, char, timestamp)
+            samples.append(clock() - start)
+    return _latencies(samples, len(samples), sum(samples))
+
+
+def bench_calculate_results(words: int, error_rate: float) -> Dict[str, float]:
+    now = [0.0]
+    game_state = new_game(words, now)
+    for char, timestamp in keystrokes(game_state.prompt_text, error_rate, random.Random(SEED)):
+        now[0] = timestamp
+        engine.process_input(game_state, char, timestamp)
+    engine.finish_game(game_state)
+    return _repeat(lambda: engine.calculate_results(game_state))
+
+
+def bench_generate_prompt_text(words: int) -> Dict[str, float]:
+    word_list = engine.load_word_list("en")
+    rng = random.Random(SEED)
+    return _repeat(lambda: engine.generate_prompt_text(word_list, GameMode.WORDS, words, rng=rng))
+
+
+def bench_load_word_list() -> Dict[str, float]:
+    def load():
+        engine.WORD_LIST_CACHE.clear() # Cold in-process cache; the compiled pack stays on disk
+        engine.load_word_list("en")
+
+    return _repeat(load, max_ops=2000)
+
+
+def bench_create_prompt_display(words: int, error_rate: float) -> Dict[str, float]:
+    from rich.console import Console
+    from monkeytyper_cli.ui import prompts
+
+    sink = Console(file=io.StringIO(), width=100, force_terminal=True, color_system="truecolor")
+    now = [0.0]
+    clock = time.perf_counter_ns
+    rng = random.Random(SEED)
+    samples: List[int] = []
+    while len(samples) < DISPLAY_FRAMES:
+        game_state = new_game(words, now)
+        stream = keystrokes(game_state.prompt_text, error_rate, rng)
+        every = max(1, len(stream) // DISPLAY_FRAMES)
+        for i, (char, timestamp) in enumerate(stream):
+            now[0] = timestamp
+            engine.process_input(game_state, char, timestamp)
+            if i % every:
+                continue
+            start = clock()
+            sink.print(prompts.create_prompt_display(game_state)) # Build and render one frame
+            samples.append(clock() - start)
+            sink.file.seek(0)
+            sink.file.truncate()
+    return _latencies(samples, len(samples), sum(samples))
+
+
+def cases(prompt_words) -> Dict[str, Callable[[], Dict[str, float]]]:
+    """Benchmark name -> zero-argument runner."""
+    suite: Dict[str, Callable[[], Dict[str, float]]] = {"load_word_list": bench_load_word_list}
+    for words in prompt_words:
+        suite[f"generate_prompt_text[words={words}]"] = lambda words=words: bench_generate_prompt_text(words)
+        for error_rate in ERROR_RATES:
+            label = f"words={words},errors={error_rate:g}"
+            suite[f"process_input[{label}]"] = (
+                lambda words=words, error_rate=error_rate: bench_process_input(words, error_rate))
+            suite[f"calculate_results[{label}]"] = (
+                lambda words=words, error_rate=error_rate: bench_calculate_results(words, error_rate))
+            suite[f"create_prompt_display[{label}]"] = (
+                lambda words=words, error_rate=error_rate: bench_create_prompt_display(words, error_rate))
+    return suite
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Descriptions of the cases that regressed by more than `threshold` (0.25 = 25%)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if previous["ops_per_sec"] and current["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['ops_per_sec']:,.0f} -> {current['ops_per_sec']:,.0f} ops/s")
+        if previous["p50_us"] and current["p50_us"] > previous["p50_us"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {previous['p50_us']:.1f} -> {current['p50_us']:.1f} us")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the typing engine and prompt display.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--quick", action="store_true", help=f"Only prompt sizes {QUICK_PROMPT_WORDS}.")
+    parser.add_argument("--rounds", type=int, default=3, help="Runs per case; the fastest one is kept.")
+    parser.add_argument("--json", type=pathlib.Path, help="Write the results to this file.")
+    parser.add_argument("--compare", type=pathlib.Path, help="Baseline results JSON to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before a case is flagged.")
+    args = parser.parse_args()
+
+    engine.load_word_list("en") # Compile the word pack outside of any timing
+    suite = cases(QUICK_PROMPT_WORDS if args.quick else PROMPT_WORDS)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, run in suite.items():
+        if args.filter not in name:
+            continue
+        results[name] = stats = max((run() for _ in range(max(1, args.rounds))), key=lambda r: r["ops_per_sec"])
+        print(f"{name:<58} {stats['ops_per_sec']:>12,.0f} ops/s  "
+              f"p50 {stats['p50_us']:>9.1f} us  p99 {stats['p99_us']:>9.1f} us")
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        if baseline.get("python") != report["python"]:
+            print(f"Note: baseline is from Python {baseline.get('python')}, this run is {report['python']}.")
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# Startup-time benchmark for the CLI entry points
+#
+# Usage: python benchmarks/startup.py [--runs N] [--json out.json] [--check]
+#
+# Each command is run in a fresh interpreter with `-X importtime`. We report the median
+# wall time above a bare `python -c pass` (so budgets hold across machines) and the
+# slowest imports, and with --check exit non-zero when a command is over its budget.
+
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT / "src"
+
+# name -> (argv, budget in ms above interpreter startup)
+COMMANDS: Dict[str, Tuple[List[str], float]] = {
+    "version": (["--version"], 150.0),
+    "start": (["start", "--mode", "words", "--length", "10"], 500.0),
+    "leaderboard": (["leaderboard"], 900.0), # Includes the failed connection attempt
+}
+
+UNREACHABLE_API = "http://127.0.0.1:9" # Makes `leaderboard` fail fast after its imports
+MAX_ATTEMPTS = "1" # No retry backoff on that failure, it isn't startup time
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Returns (module, cumulative microseconds) for top-level imports."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()[1:]
+        if name.startswith(" "): # Nested import, already counted in its parent
+            continue
+        imports.append((name, int(parts[1])))
+    return imports
+
+
+def run_command(argv: List[str], module: bool = True) -> Tuple[float, List[Tuple[str, int]]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env["API_BASE_URL"] = UNREACHABLE_API
+    env["API_MAX_ATTEMPTS"] = MAX_ATTEMPTS
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *(["-m", "monkeytyper_cli.main"] if module else []), *argv],
+        stdin=subprocess.DEVNULL, # `start` gives up as soon as it needs a terminal
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, _parse_importtime(proc.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI startup time per command.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to show per command.")
+    parser.add_argument("--json", type=pathlib.Path, help="Write the results to this file.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a command is over budget.")
+    parser.add_argument("commands", nargs="*", default=list(COMMANDS))
+    args = parser.parse_args()
+
+    baseline = statistics.median(run_command(["-c", "pass"], module=False)[0] for _ in range(args.runs))
+    print(f"{'interpreter':<12} median {baseline:7.1f} ms")
+
+    report = {"interpreter_ms": round(baseline, 1), "commands": {}}
+    over_budget = []
+    for name in args.commands:
+        argv, budget = COMMANDS[name]
+        timings = []
+        imports: List[Tuple[str, int]] = []
+        for _ in range(args.runs):
+            elapsed_ms, imports = run_command(argv)
+            timings.append(elapsed_ms)
+        median = statistics.median(timings) - baseline
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:args.top]
+        report["commands"][name] = {
+            "argv": argv,
+            "median_ms": round(median, 1),
+            "min_ms": round(min(timings) - baseline, 1),
+            "budget_ms": budget,
+            "slowest_imports": [{"module": m, "ms": round(us / 1000, 1)} for m, us in slowest],
+        }
+
+        status = "ok" if median <= budget else "OVER BUDGET"
+        print(f"{name:<12} median {median:+7.1f} ms  (budget {budget:.0f} ms)  {status}")
+        for module, us in slowest:
+            print(f"    {us / 1000:7.1f} ms  {module}")
+        if median > budget:
+            over_budget.append(name)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    return 1 if args.check and over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# Persistent cache for API responses
+#
+# Entries are small JSON files keyed by request. Each endpoint has a TTL during which
+# the cached body is served as-is; after that it is still served (stale) for a while
+# as long as the client revalidates it with If-None-Match/If-Modified-Since.
+
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import time
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+# endpoint -> (seconds fresh, further seconds servable while revalidating)
+ENDPOINT_TTLS: Dict[str, Tuple[int, int]] = {
+    "/leaderboards": (300, 24 * 3600),
+    "/users/stats": (60, 24 * 3600),
+    "/users/personalBests": (300, 24 * 3600),
+}
+DEFAULT_TTL = (0, 0)
+
+
+class CacheEntry(NamedTuple):
+    body: Any
+    stored_at: float # time.time() when the body was fetched or last revalidated
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def ttl_for(endpoint: str) -> Tuple[int, int]:
+    return ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL)
+
+
+class ResponseCache:
+    """Response bodies on disk, one file per (base URL, endpoint, params, ApeKey)."""
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+
+    @staticmethod
+    def key(base_url: str, endpoint: str, params: Optional[Mapping[str, Any]], api_key: Optional[str]) -> str:
+        query = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        # The ApeKey is part of the key so one user's stats never answer for another's
+        material = json.dumps([base_url.rstrip("/"), endpoint, query, api_key or ""])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return CacheEntry(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError): # Damaged entry, treat as a miss
+            return None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry._asdict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write API cache entry {path}: {e}", file=sys.stderr)
+
+    def touch(self, key: str, entry: CacheEntry) -> CacheEntry:
+        """Marks an entry as fresh again after a 304 Not Modified."""
+        refreshed = entry._replace(stored_at=time.time())
+        self.put(key, refreshed)
+        return refreshed
@@ -1,28 +1,60 @@
+import asyncio
+import importlib.util
 import httpx
-from typing import Any, Dict, Optional, List
+import random
+from typing import Any, Dict, Optional, Set
 import sys
+import time
 from pydantic import ValidationError
 
-from monkeytyper_cli.config.settings import settings # Main settings with ApeKey
+from monkeytyper_cli.config.settings import get_settings # Main settings with ApeKey
 from monkeytyper_cli import __version__
-from .models import UserStatsResponse, PersonalBestsResponse, LeaderboardResponse
+from .cache import CacheEntry, ResponseCache, ttl_for
+from .ratelimit import RETRY_STATUS_CODES, RateLimiter, RetryPolicy, retry_after
+from .models import UserStatsResponse, PersonalBestsResponse, LeaderboardResponse, LeaderboardPage, LeaderboardPageData
 
 DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+# Keep idle connections long enough to be reused between menu actions
+DEFAULT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=120.0)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Failures worth retrying for any method; GETs also retry read timeouts and dropped connections
+RETRY_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRY_GET_ERRORS = RETRY_CONNECT_ERRORS + (httpx.ReadTimeout, httpx.RemoteProtocolError)
 
 class ApiClientError(Exception):
     pass
 
+class RequestDeadlineExceeded(ApiClientError):
+    """A request (including its retries) ran past its deadline."""
+
 class APIClient:
     """Handles communication with the Monkeytype API."""
 
     def __init__(
         self,
-        base_url: str = settings.api_base_url,
-        api_key: Optional[str] = settings.monkeytype_ape_key,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        offline: bool = False,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        rng: Optional[random.Random] = None,
     ):
-        self.base_url = base_url
-        self.api_key = api_key
+        settings = get_settings()
+        self.base_url = base_url or settings.api_base_url
+        self.api_key = api_key if api_key is not None else settings.monkeytype_ape_key
+        self.cache = cache
+        self.offline = offline # Serve GETs from the cache only, never touch the network
+        self.http2 = http2 and HTTP2_AVAILABLE # Needs the `h2` package (httpx[http2])
+        self.transport = transport # e.g. httpx.MockTransport in tests
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max(1, settings.api_max_attempts))
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.rng = rng # Backoff jitter
         self._client: Optional[httpx.AsyncClient] = None
+        self._revalidations: Set[asyncio.Task] = set()
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Returns an httpx AsyncClient instance, creating it if necessary."""
@@ -35,33 +67,125 @@ class APIClient:
                 headers["Authorization"] = f"ApeKey {self.api_key}"
             
             self._client = httpx.AsyncClient(
-                base_url=self.base_url, 
-                headers=headers, 
-                timeout=DEFAULT_TIMEOUT
+                base_url=self.base_url,
+                headers=headers,
+                timeout=DEFAULT_TIMEOUT,
+                limits=DEFAULT_LIMITS,
+                http2=self.http2,
+                transport=self.transport,
             )
         return self._client
 
+    async def _send(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                    json_data: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """Sends a request through the rate limiter, retrying transient failures until the deadline."""
+        client = await self._get_client()
+        policy = self.retry_policy
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        retry_errors = RETRY_GET_ERRORS if method == "GET" else RETRY_CONNECT_ERRORS
+        attempt = 0
+        while True:
+            attempt += 1
+            delay = None
+            try:
+                response = await asyncio.wait_for(
+                    self._send_once(client, method, endpoint, params, json_data, headers),
+                    max(0.0, deadline - loop.time()),
+                )
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= policy.max_attempts:
+                    if response.status_code != 304: # Not Modified answers a conditional GET
+                        response.raise_for_status()
+                    return response
+                delay = retry_after(response.headers)
+            except asyncio.TimeoutError:
+                raise RequestDeadlineExceeded(f"{method} {endpoint} did not complete within {policy.deadline:g}s.")
+            except httpx.HTTPStatusError as e:
+                print(f"HTTP error occurred: {e}")
+                raise
+            except httpx.RequestError as e:
+                if not isinstance(e, retry_errors) or attempt >= policy.max_attempts:
+                    print(f"Request error occurred: {e}")
+                    raise
+
+            delay = max(delay or 0.0, policy.backoff(attempt, self.rng))
+            if loop.time() + delay >= deadline:
+                raise RequestDeadlineExceeded(f"{method} {endpoint} did not complete within {policy.deadline:g}s.")
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, client: httpx.AsyncClient, method: str, endpoint: str,
+                         params: Optional[Dict[str, Any]], json_data: Optional[Dict[str, Any]],
+                         headers: Optional[Dict[str, str]]) -> httpx.Response:
+        await self.rate_limiter.acquire(self.api_key, endpoint)
+        response = await client.request(method, endpoint, params=params, json=json_data, headers=headers)
+        self.rate_limiter.observe(self.api_key, endpoint, response.status_code, response.headers)
+        return response
+
+    @staticmethod
+    def _parse_body(response: httpx.Response) -> Dict[str, Any]:
+        if not response.content:
+             return {}
+        try:
+             return response.json()
+        except ValueError:
+             raise ApiClientError("Invalid JSON response from server", response.status_code)
+
     async def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, json_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Makes an async API request and handles common errors."""
-        client = await self._get_client()
+        if method == "GET" and self.cache is not None:
+            return await self._cached_get(self.cache, endpoint, params)
+        if self.offline:
+            raise ApiClientError(f"Cannot {method} {endpoint} while offline.")
+        response = await self._send(method, endpoint, params=params, json_data=json_data)
+        return self._parse_body(response)
+
+    async def _cached_get(self, cache: ResponseCache, endpoint: str,
+                          params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """GET through the response cache: fresh hits skip the network, stale ones revalidate."""
+        key = ResponseCache.key(self.base_url, endpoint, params, self.api_key)
+        entry = cache.get(key)
+        if self.offline:
+            if entry is None:
+                raise ApiClientError(f"No cached response for {endpoint} (offline mode).")
+            return entry.body
+
+        if entry is not None:
+            fresh_for, stale_for = ttl_for(endpoint)
+            age = entry.age()
+            if age < fresh_for:
+                return entry.body
+            if age < fresh_for + stale_for:
+                # Answer now, refresh the entry in the background before close()
+                task = asyncio.create_task(self._revalidate(cache, key, endpoint, params, entry))
+                self._revalidations.add(task)
+                task.add_done_callback(self._revalidations.discard)
+                return entry.body
+
         try:
-            response = await client.request(method, endpoint, params=params, json=json_data)
-            response.raise_for_status() 
-            
-            if not response.content:
-                 return {} 
-            
-            try:
-                 return response.json()
-            except ValueError: 
-                 raise ApiClientError("Invalid JSON response from server", response.status_code)
+            return await self._revalidate(cache, key, endpoint, params, entry)
+        except (httpx.RequestError, httpx.HTTPStatusError, RequestDeadlineExceeded) as e:
+            outage = (not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+                      or e.response.status_code in RETRY_STATUS_CODES) # Still rate limited after retrying
+            if entry is None or not outage: # Any other 4xx is an answer, not an outage
+                raise
+            print(f"Using cached {endpoint} response from {time.ctime(entry.stored_at)}.", file=sys.stderr)
+            return entry.body
 
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error occurred: {e}")
-            raise
-        except httpx.RequestError as e:
-            print(f"Request error occurred: {e}")
-            raise
+    async def _revalidate(self, cache: ResponseCache, key: str, endpoint: str,
+                          params: Optional[Dict[str, Any]], entry: Optional[CacheEntry]) -> Dict[str, Any]:
+        response = await self._send("GET", endpoint, params=params,
+                                    headers=entry.validators() if entry else None)
+        if response.status_code == 304 and entry is not None:
+            return cache.touch(key, entry).body
+        body = self._parse_body(response)
+        cache.put(key, CacheEntry(
+            body=body,
+            stored_at=time.time(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        ))
+        return body
 
     async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Performs an asynchronous GET request."""
@@ -69,7 +193,10 @@ class APIClient:
         return response
 
     async def close(self) -> None:
-        """Closes the underlying httpx AsyncClient."""
+        """Finishes background revalidations and closes the underlying httpx AsyncClient."""
+        if self._revalidations:
+            # A failed refresh just leaves the stale entry in place
+            await asyncio.gather(*self._revalidations, return_exceptions=True)
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -111,3 +238,26 @@ class APIClient:
             raise ApiClientError(f"Failed to parse leaderboard response: {e}")
         except ApiClientError as e:
             raise
+
+    async def get_leaderboard_page(self, mode: str, language: str, mode2: Optional[str] = None,
+                                   page: int = 0, page_size: int = 50) -> LeaderboardPage:
+        """Fetches one page of a leaderboard (pages are 0-based)."""
+        endpoint = "/leaderboards"
+        params: Dict[str, Any] = {"mode": mode, "language": language, "page": page, "pageSize": page_size}
+        if mode2 is not None:
+            params["mode2"] = mode2
+        try:
+            raw_data = await self._request("GET", endpoint, params=params)
+            data = raw_data.get("data")
+            if isinstance(data, dict):
+                page_data = LeaderboardPageData(**data)
+            else: # Older responses are a bare list of entries
+                page_data = LeaderboardPageData(entries=data or [])
+        except ValidationError as e:
+            raise ApiClientError(f"Failed to parse leaderboard response: {e}")
+
+        first_rank = page * page_size + 1
+        for offset, entry in enumerate(page_data.entries):
+            if entry.rank is None:
+                entry.rank = first_rank + offset
+        return LeaderboardPage(page=page, page_size=page_size, count=page_data.count, entries=page_data.entries)
@@ -40,3 +40,14 @@ class LeaderboardEntry(BaseModel):
 class LeaderboardResponse(BaseModel):
     message: Optional[str] = None
     data: List[LeaderboardEntry] = []
+
+class LeaderboardPageData(BaseModel):
+    count: Optional[int] = None # Total entries on the leaderboard
+    pageSize: Optional[int] = None
+    entries: List[LeaderboardEntry] = []
+
+class LeaderboardPage(BaseModel):
+    page: int
+    page_size: int
+    count: Optional[int] = None # None when the API doesn't report the total
+    entries: List[LeaderboardEntry] = []
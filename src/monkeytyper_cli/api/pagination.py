@@ -0,0 +1,161 @@
+# Paged access to leaderboards: streaming iteration and page-level binary search
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from .client import APIClient
+from .models import LeaderboardEntry, LeaderboardPage
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_CONCURRENCY = 4
+
+
+class LeaderboardPager:
+    """Fetches pages of one leaderboard (mode, mode2, language), remembering what it fetched."""
+
+    def __init__(self, client: APIClient, mode: str, language: str, mode2: Optional[str] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE):
+        self.client = client
+        self.mode = mode
+        self.language = language
+        self.mode2 = mode2
+        self.page_size = page_size
+        self.count: Optional[int] = None # Total entries, once a page has reported it
+        self._pages: Dict[int, LeaderboardPage] = {}
+
+    @property
+    def page_count(self) -> Optional[int]:
+        if self.count is None:
+            return None
+        return -(-self.count // self.page_size)
+
+    async def page(self, index: int) -> LeaderboardPage:
+        if index not in self._pages:
+            page = await self.client.get_leaderboard_page(
+                self.mode, self.language, self.mode2, page=index, page_size=self.page_size
+            )
+            if page.count is not None:
+                self.count = page.count
+            self._pages[index] = page
+        return self._pages[index]
+
+    async def pages(self, start: int = 0, max_pages: Optional[int] = None,
+                    concurrency: int = DEFAULT_CONCURRENCY) -> AsyncIterator[LeaderboardPage]:
+        """Yields pages in order, keeping up to `concurrency` requests in flight ahead of the consumer."""
+        end = None if max_pages is None else start + max_pages
+        first = await self.page(start)
+        if not first.entries:
+            return
+        yield first
+        if len(first.entries) < self.page_size:
+            return
+
+        pending: Deque[asyncio.Task] = deque()
+        next_index = start + 1
+        try:
+            while True:
+                last = self.page_count
+                while (len(pending) < concurrency
+                       and (end is None or next_index < end)
+                       and (last is None or next_index < last)):
+                    pending.append(asyncio.create_task(self.page(next_index)))
+                    next_index += 1
+                if not pending:
+                    return
+                page = await pending.popleft()
+                if not page.entries:
+                    return
+                yield page
+                if len(page.entries) < self.page_size: # Short page: this was the last one
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def entries(self, start: int = 0, max_pages: Optional[int] = None,
+                      concurrency: int = DEFAULT_CONCURRENCY) -> AsyncIterator[LeaderboardEntry]:
+        async for page in self.pages(start, max_pages, concurrency):
+            for entry in page.entries:
+                yield entry
+
+    async def search(self, compare: Callable[[LeaderboardPage], int]) -> Optional[LeaderboardPage]:
+        """Binary search over page offsets.
+
+        `compare(page)` returns a negative number if the target comes before the page,
+        0 if it is on the page and a positive number if it comes after. Empty pages
+        (past the end) count as "before". Without a reported total the upper bound is
+        found by doubling, so only O(log pages) pages are fetched either way.
+        """
+        lo = 0
+        first = await self.page(0)
+        hi = self.page_count
+        if hi is None:
+            hi = 1
+            while True: # Gallop until a page at or past the target
+                page = await self.page(hi)
+                if not page.entries or compare(page) <= 0:
+                    break
+                lo = hi + 1
+                hi *= 2
+            hi += 1
+        elif not first.entries:
+            return None
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            page = await self.page(mid)
+            order = compare(page) if page.entries else -1
+            if order == 0:
+                return page
+            if order < 0:
+                hi = mid
+            else:
+                lo = mid + 1
+        return None
+
+    async def find_rank(self, rank: int) -> Optional[LeaderboardEntry]:
+        """Entry at 1-based `rank`."""
+        def compare(page: LeaderboardPage) -> int:
+            # get_leaderboard_page numbers entries the API left unranked
+            if rank < (page.entries[0].rank or 0):
+                return -1
+            if rank > (page.entries[-1].rank or 0):
+                return 1
+            return 0
+
+        # Ranks are normally contiguous, so the page can be computed directly
+        guess = await self.page((rank - 1) // self.page_size)
+        page = guess if guess.entries and compare(guess) == 0 else await self.search(compare)
+        if page is None:
+            return None
+        return next((entry for entry in page.entries if entry.rank == rank), None)
+
+    async def find_user(self, name: str, wpm: float) -> Optional[LeaderboardEntry]:
+        """Finds a user given their leaderboard WPM (the board is sorted by WPM, not name)."""
+        wanted = name.casefold()
+
+        def compare(page: LeaderboardPage) -> int:
+            if wpm > (page.entries[0].wpm or 0):
+                return -1
+            if wpm < (page.entries[-1].wpm or 0):
+                return 1
+            return 0
+
+        def matches(entry: LeaderboardEntry) -> bool:
+            return (entry.name or "").casefold() == wanted or entry.uid == name
+
+        page = await self.search(compare)
+        if page is None:
+            return None
+        found = next((entry for entry in page.entries if matches(entry)), None)
+        # Users tied on WPM can spill over onto neighbouring pages
+        for step in (-1, 1):
+            index = page.page + step
+            while found is None and index >= 0:
+                neighbour = await self.page(index)
+                if not any(entry.wpm == wpm for entry in neighbour.entries):
+                    break
+                found = next((entry for entry in neighbour.entries if matches(entry)), None)
+                index += step
+        return found
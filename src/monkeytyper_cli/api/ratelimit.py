@@ -0,0 +1,145 @@
+# Client-side rate limiting and retry backoff for the Monkeytype API
+
+import asyncio
+import random
+import time
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+# The API allows roughly 30 requests a minute per ApeKey/IP; stay a little under it
+KEY_RATE_PER_MINUTE = 28
+KEY_BURST = 5
+# Endpoints with their own, tighter limits
+ENDPOINT_RATES_PER_MINUTE: Dict[str, int] = {
+    "/leaderboards": 20,
+    "/users/stats": 10,
+    "/users/personalBests": 10,
+}
+ENDPOINT_BURST = 3
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy(NamedTuple):
+    max_attempts: int = 4
+    base_delay: float = 0.5 # Seconds; doubles with every attempt
+    max_delay: float = 8.0
+    deadline: float = 20.0 # Seconds for a request including all its retries
+
+    def backoff(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return (rng or random).uniform(0, ceiling)
+
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts of up to `capacity`.
+
+    The server's view wins: `update` lowers the available tokens to what its
+    rate-limit headers report and blocks the bucket until the reported reset.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a request may go out (0 if one may go now)."""
+        now = self.clock()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    async def acquire(self) -> None:
+        async with self._lock: # Waiters are served in order
+            while (wait := self.delay()) > 0:
+                await asyncio.sleep(wait)
+            self.tokens -= 1
+
+    def update(self, remaining: Optional[int], reset_in: Optional[float]) -> None:
+        now = self.clock()
+        self._refill(now)
+        if remaining is None:
+            return
+        if remaining <= 0 and reset_in is not None:
+            # Nothing left until the server's window resets; then it is safe to send again
+            self.blocked_until = max(self.blocked_until, now + reset_in)
+            self.tokens = 1.0
+        else:
+            self.tokens = min(self.tokens, float(remaining))
+
+    def block_for(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rate_limit(headers: Mapping[str, str], now: Optional[float] = None) -> Tuple[Optional[int], Optional[float]]:
+    """Returns (remaining, seconds until reset) from rate-limit headers, None where absent."""
+    remaining = _header_number(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+    reset = _header_number(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+    if reset is not None and reset > 1e9: # An epoch timestamp rather than a delta
+        reset = max(0.0, reset - (time.time() if now is None else now))
+    return (None if remaining is None else int(remaining)), reset
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from a Retry-After header (only the delta-seconds form)."""
+    return _header_number(headers, "Retry-After")
+
+
+class RateLimiter:
+    """One token bucket per ApeKey and one per (ApeKey, endpoint)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._buckets: Dict[tuple, TokenBucket] = {}
+
+    def _bucket(self, key: tuple, per_minute: float, burst: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(per_minute / 60, burst, self.clock)
+        return bucket
+
+    def buckets(self, api_key: Optional[str], endpoint: str) -> Tuple[TokenBucket, ...]:
+        key_bucket = self._bucket(("key", api_key), KEY_RATE_PER_MINUTE, KEY_BURST)
+        per_minute = ENDPOINT_RATES_PER_MINUTE.get(endpoint)
+        if per_minute is None:
+            return (key_bucket,)
+        return key_bucket, self._bucket(("endpoint", api_key, endpoint), per_minute, ENDPOINT_BURST)
+
+    async def acquire(self, api_key: Optional[str], endpoint: str) -> None:
+        for bucket in self.buckets(api_key, endpoint):
+            await bucket.acquire()
+
+    def observe(self, api_key: Optional[str], endpoint: str, status_code: int, headers: Mapping[str, str]) -> None:
+        """Feeds a response's rate-limit headers back into the buckets."""
+        remaining, reset_in = parse_rate_limit(headers)
+        buckets = self.buckets(api_key, endpoint)
+        # The headers describe the server's limit for this route, i.e. the tightest bucket
+        buckets[-1].update(remaining, reset_in)
+        if status_code == 429:
+            wait = retry_after(headers) or reset_in
+            if wait:
+                for bucket in buckets:
+                    bucket.block_for(wait)
@@ -0,0 +1,99 @@
+# Long-lived API session: one event loop thread and one pooled client
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+from .client import APIClient
+
+T = TypeVar("T")
+
+CLOSE_TIMEOUT = 5.0 # Seconds close() waits for submitted background work
+
+
+class ApiSession:
+    """Runs API coroutines on a background event loop that outlives any single call.
+
+    The loop and its APIClient (and so its keep-alive connections and cache
+    revalidations) are shared by every call until `close`. Blocking callers use
+    `run`, which can be called from any thread except the loop's own.
+    """
+
+    def __init__(self, client_factory: Callable[[], APIClient]):
+        self._client_factory = client_factory
+        self._client: Optional[APIClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending: Set[concurrent.futures.Future] = set()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="api-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @property
+    def client(self) -> APIClient:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def run(self, func: Callable[[APIClient], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Runs `func(client)` on the session loop and waits for its result."""
+        future = self.submit(func)
+        try:
+            return future.result(timeout)
+        except BaseException: # Ctrl+C or timeout: don't leave the request running
+            future.cancel()
+            raise
+
+    def submit(self, func: Callable[[APIClient], Awaitable[T]]) -> "concurrent.futures.Future[T]":
+        """Starts `func(client)` on the session loop without waiting for it."""
+        loop = self._ensure_started()
+        client = self.client
+
+        async def call() -> T:
+            return await func(client)
+
+        future = asyncio.run_coroutine_threadsafe(call(), loop)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def close(self) -> None:
+        """Closes the client (finishing background refreshes) and stops the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        _, unfinished = concurrent.futures.wait(list(self._pending), timeout=CLOSE_TIMEOUT)
+        for future in unfinished:
+            future.cancel()
+        try:
+            if self._client is not None:
+                # wait_for cancels a hung close on the loop itself, before the loop stops
+                closing: "concurrent.futures.Future[None]" = asyncio.run_coroutine_threadsafe(
+                    asyncio.wait_for(self._client.close(), CLOSE_TIMEOUT), loop
+                )
+                try:
+                    closing.result(CLOSE_TIMEOUT + 1)
+                except (asyncio.TimeoutError, concurrent.futures.TimeoutError): # A hung refresh mustn't hold up exit
+                    closing.cancel()
+        finally:
+            self._client = None
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(CLOSE_TIMEOUT)
+            if not thread.is_alive(): # Closing a loop that is still running raises
+                loop.close()
+
+    def __enter__(self) -> "ApiSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,50 @@
+# Incremental refresh of local leaderboard snapshots
+
+import asyncio
+from typing import Dict, List
+
+from monkeytyper_cli.core.snapshots import LeaderboardSnapshot, SnapshotStore, refresh_plan
+
+from .pagination import LeaderboardPager
+
+DEFAULT_REFRESH_PAGES = 8 # Pages fetched per refresh; the rest of the plan is covered by later ones
+
+
+async def refresh_snapshot(pager: LeaderboardPager, store: SnapshotStore,
+                           max_pages: int = DEFAULT_REFRESH_PAGES) -> LeaderboardSnapshot:
+    """Re-fetches the top page plus the next few pages of the refresh plan and saves a new snapshot.
+
+    Rows from pages not fetched this time are carried over from the previous snapshot,
+    so a full picture builds up over several cheap refreshes.
+    """
+    previous = store.latest(pager.mode, pager.mode2, pager.language)
+    first = await pager.page(0)
+    page_count = pager.page_count or 1
+    total = pager.count or (previous.total if previous else len(first.entries))
+
+    plan = refresh_plan(page_count)
+    cursor = previous.cursor % len(plan) if previous and previous.page_size == pager.page_size else 0
+    batch: List[int] = []
+    while len(batch) < min(max_pages - 1, len(plan) - 1):
+        index = plan[cursor]
+        cursor = (cursor + 1) % len(plan)
+        if index != 0:
+            batch.append(index)
+    pages = [first, *await asyncio.gather(*(pager.page(index) for index in batch))]
+
+    rows: Dict[int, float] = {}
+    if previous is not None and previous.page_size == pager.page_size:
+        rows = previous.rows()
+        for page in pages: # Drop the old rows of every page fetched again
+            start = page.page * pager.page_size + 1
+            for rank in range(start, start + pager.page_size):
+                rows.pop(rank, None)
+    for page in pages:
+        for entry in page.entries:
+            if entry.rank is not None and entry.wpm is not None:
+                rows[entry.rank] = entry.wpm
+    rows = {rank: wpm for rank, wpm in rows.items() if rank <= total}
+
+    snapshot = LeaderboardSnapshot.from_rows(rows.items(), total, pager.page_size, cursor)
+    store.save(pager.mode, pager.mode2, pager.language, snapshot)
+    return snapshot
@@ -1,5 +1,12 @@
 # Placeholder for config submodule
 
-from .settings import settings
+__all__ = ["get_settings"]
 
-__all__ = ["settings"] 
\ No newline at end of file
+
+def __getattr__(name: str):
+    # Imported lazily: pydantic-settings is slow to import and most commands don't need it.
+    # The settings object itself is `config.settings.settings` / `get_settings()`.
+    if name == "get_settings":
+        from .settings import get_settings
+        return get_settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,8 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 from pathlib import Path
 
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 ENV_FILE_PATH = BASE_DIR / ".env"
 
@@ -14,6 +16,8 @@ class Settings(BaseSettings):
 
     api_base_url: str = "https://api.monkeytype.com"
 
+    api_max_attempts: int = 4 # Per API request, retries included; 1 turns retries off
+
     model_config = SettingsConfigDict(
         env_file=ENV_FILE_PATH,
         env_file_encoding='utf-8',
@@ -21,4 +25,15 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings() 
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Loads the settings on first use (reading .env and the environment)."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # `settings` is created on first access so importing this module stays cheap
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
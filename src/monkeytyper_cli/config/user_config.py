@@ -12,8 +12,8 @@ DEFAULT_CONFIG_DIR_NAME = "monkeytyper-cli"
 DEFAULT_CONFIG_FILE_NAME = "user_settings.json"
 
 
-def get_config_path() -> pathlib.Path:
-    """Determines the path for the user configuration file."""
+def get_config_dir() -> pathlib.Path:
+    """Determines the per-user directory for settings and local data."""
     if sys.platform == "win32":
         app_data = pathlib.Path.home() / "AppData" / "Local"
     elif sys.platform == "darwin":
@@ -23,7 +23,12 @@ def get_config_path() -> pathlib.Path:
 
     config_dir = app_data / DEFAULT_CONFIG_DIR_NAME
     config_dir.mkdir(parents=True, exist_ok=True) # Create dir if it doesn't exist
-    return config_dir / DEFAULT_CONFIG_FILE_NAME
+    return config_dir
+
+
+def get_config_path() -> pathlib.Path:
+    """Determines the path for the user configuration file."""
+    return get_config_dir() / DEFAULT_CONFIG_FILE_NAME
 
 
 class UserSettings(BaseModel):
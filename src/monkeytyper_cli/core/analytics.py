@@ -0,0 +1,190 @@
+# Local result analytics over the history store (needs NumPy: `pip install monkeytyper-cli[analytics]`)
+
+import time
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
+
+from .history import HistoryStore
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ROLLING_WINDOWS = (10, 100)
+PERCENTILES = (10, 50, 90, 99)
+SECONDS_PER_DAY = 86400.0
+OFFSET_SLOT = 900.0 # Time zones change their UTC offset on quarter hours
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """NumPy is not installed."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise AnalyticsUnavailable(
+            "Local analytics need NumPy. Install it with: pip install 'monkeytyper-cli[analytics]'"
+        ) from None
+    return numpy
+
+
+class RollingStats(NamedTuple):
+    window: int
+    current_wpm: float # Mean of the last `window` tests
+    best_wpm: float # Best mean over any `window` consecutive tests
+    current_accuracy: float
+
+
+class GroupStats(NamedTuple):
+    mode: str
+    config_value: int
+    tests: int
+    mean_wpm: float
+    percentiles: Tuple[float, ...] # WPM at each of PERCENTILES
+    mean_accuracy: float
+    slope_per_week: float # Least-squares WPM change per week, 0 with too little data
+
+
+class HourStats(NamedTuple):
+    hour: int # Local hour of day the tests finished in
+    tests: int
+    mean_wpm: float
+    mean_accuracy: float
+
+
+class LocalStats(NamedTuple):
+    tests: int
+    first_at: float
+    last_at: float
+    rolling: List[RollingStats]
+    groups: List[GroupStats]
+    hours: List[HourStats]
+
+
+class HistoryColumns(NamedTuple):
+    finished_at: "np.ndarray" # float64 seconds
+    wpm: "np.ndarray"
+    accuracy: "np.ndarray"
+    group: "np.ndarray" # Index into `group_keys` for every test
+    group_keys: List[Tuple[str, int]] # (mode, config_value)
+
+
+def load_columns(store: HistoryStore, language: Optional[str] = None,
+                 since: Optional[float] = None) -> HistoryColumns:
+    """Loads the history into columnar arrays, oldest test first."""
+    np = _numpy()
+    finished_at, mode, config_value, wpm, accuracy = store.columns(
+        "finished_at", "mode", "config_value", "wpm", "accuracy", language=language, since=since
+    )
+    modes, mode_ids = np.unique(np.array(mode, dtype=object).astype(str), return_inverse=True)
+    configs = np.array(config_value, dtype=np.int64)
+    # One id per (mode, config) pair without a Python-level loop over the rows
+    stride = int(configs.max(initial=0)) + 1
+    pairs, group = np.unique(mode_ids.astype(np.int64) * stride + configs, return_inverse=True)
+    group_keys = [(str(modes[p // stride]), int(p % stride)) for p in pairs]
+    return HistoryColumns(
+        finished_at=np.array(finished_at, dtype=np.float64),
+        wpm=np.array(wpm, dtype=np.float64),
+        accuracy=np.array(accuracy, dtype=np.float64),
+        group=group.astype(np.intp),
+        group_keys=group_keys,
+    )
+
+
+def _rolling(np, values: "np.ndarray", window: int) -> "np.ndarray":
+    """Means of every `window` consecutive values (empty if there are fewer)."""
+    if len(values) < window:
+        return values[:0]
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    return (sums[window:] - sums[:-window]) / window
+
+
+def _slopes(np, x: "np.ndarray", y: "np.ndarray", group: "np.ndarray", groups: int) -> "np.ndarray":
+    """Least-squares slope of y over x for every group at once."""
+    n = np.bincount(group, minlength=groups).astype(np.float64)
+    sx = np.bincount(group, x, groups)
+    sy = np.bincount(group, y, groups)
+    sxx = np.bincount(group, x * x, groups)
+    sxy = np.bincount(group, x * y, groups)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = (n * sxy - sx * sy) / denominator
+    return np.where((n >= 3) & (denominator > 1e-9), slopes, 0.0)
+
+
+def _local_offsets(np, timestamps: "np.ndarray") -> "np.ndarray":
+    """UTC offset of the local time zone at every timestamp, DST included."""
+    # One lookup per quarter hour with tests in it rather than one per test
+    slots, inverse = np.unique(timestamps // OFFSET_SLOT, return_inverse=True)
+    offsets = np.array([time.localtime(slot * OFFSET_SLOT).tm_gmtoff for slot in slots.tolist()], dtype=np.float64)
+    return offsets[inverse]
+
+
+def analyse(columns: HistoryColumns, utc_offset: Optional[float] = None) -> Optional[LocalStats]:
+    """Rolling means, per mode/config percentiles and trends, and a time-of-day breakdown.
+
+    Hours are local time at each test, unless a fixed `utc_offset` in seconds is given.
+    """
+    np = _numpy()
+    tests = len(columns.wpm)
+    if tests == 0:
+        return None
+    wpm, accuracy, group = columns.wpm, columns.accuracy, columns.group
+    groups = len(columns.group_keys)
+
+    rolling = []
+    for window in ROLLING_WINDOWS:
+        wpm_means = _rolling(np, wpm, window)
+        if len(wpm_means) == 0:
+            continue
+        rolling.append(RollingStats(
+            window=window,
+            current_wpm=float(wpm_means[-1]),
+            best_wpm=float(wpm_means.max()),
+            current_accuracy=float(accuracy[-window:].mean()),
+        ))
+
+    counts = np.bincount(group, minlength=groups)
+    mean_wpm = np.bincount(group, wpm, groups) / counts
+    mean_accuracy = np.bincount(group, accuracy, groups) / counts
+    # Weeks since the first test; the slope doesn't depend on the origin
+    weeks = (columns.finished_at - columns.finished_at[0]) / (7 * SECONDS_PER_DAY)
+    slopes = _slopes(np, weeks, wpm, group, groups)
+
+    # Sort once by (group, wpm); each group's WPMs are then a contiguous sorted slice
+    order = np.lexsort((wpm, group))
+    sorted_wpm = wpm[order]
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    group_stats = []
+    for g, (mode, config_value) in enumerate(columns.group_keys):
+        values = sorted_wpm[starts[g]:starts[g + 1]]
+        group_stats.append(GroupStats(
+            mode=mode,
+            config_value=config_value,
+            tests=int(counts[g]),
+            mean_wpm=float(mean_wpm[g]),
+            percentiles=tuple(float(p) for p in np.percentile(values, PERCENTILES)),
+            mean_accuracy=float(mean_accuracy[g]),
+            slope_per_week=float(slopes[g]),
+        ))
+    group_stats.sort(key=lambda stats: stats.tests, reverse=True)
+
+    offsets = _local_offsets(np, columns.finished_at) if utc_offset is None else utc_offset
+    hour = (((columns.finished_at + offsets) % SECONDS_PER_DAY) // 3600).astype(np.intp)
+    hour_counts = np.bincount(hour, minlength=24)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hour_wpm = np.bincount(hour, wpm, 24) / hour_counts
+        hour_accuracy = np.bincount(hour, accuracy, 24) / hour_counts
+    hours = [
+        HourStats(int(h), int(hour_counts[h]), float(hour_wpm[h]), float(hour_accuracy[h]))
+        for h in np.flatnonzero(hour_counts)
+    ]
+
+    return LocalStats(
+        tests=tests,
+        first_at=float(columns.finished_at[0]),
+        last_at=float(columns.finished_at[-1]),
+        rolling=rolling,
+        groups=group_stats,
+        hours=hours,
+    )
@@ -1,21 +1,47 @@
-import time
-from typing import Tuple, List
+from typing import Dict, Optional, Sequence, Tuple, List
 import random
 import pathlib
 import sys # For backspace character check
+import threading
 
-from .models import GameState, TestResult, TestState, GameMode
+from monkeytyper_cli.config.user_config import get_config_dir
+
+from . import practice, wordpack
+from .keylog import BACKSPACE_CODE
+from .keystats import KeyStats
+from .models import GameState, TestResult, TestState, GameMode, PromptOptions
+from .sampling import WordSampler
 
 DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
 
-WORD_LIST_CACHE = {}
+WORDPACK_DIR_NAME = "wordpacks"
+
+WORD_LIST_CACHE: Dict[str, Sequence[str]] = {}
+SAMPLER_CACHE: Dict[int, WordSampler] = {} # For plain lists; word packs carry their own sampler
+BIGRAM_INDEX_CACHE: Dict[int, Tuple[Sequence[str], practice.BigramIndex]] = {}
+# The prompt pool calls start_game from its own thread; this keeps it and the UI thread from
+# compiling the same word pack or index at once
+_LOAD_LOCK = threading.Lock()
+
+PROMPT_CHUNK_WORDS = 50 # Time-mode prompts start with this many words and grow by as many
+PROMPT_LOOKAHEAD_CHARS = 120 # Extend a time-mode prompt once the cursor gets this close to its end
+NUMBER_PROBABILITY = 0.1
+SENTENCE_ENDINGS = (".", "?", "!")
+# Cumulative probabilities of a word being followed by each mark
+PUNCTUATION_THRESHOLDS = ((",", 0.08), (".", 0.14), ("?", 0.155), ("!", 0.17), (";", 0.18), (":", 0.19))
 
 
-def load_word_list(language: str) -> List[str]:
-    """Loads and caches word list for a given language."""
+def load_word_list(language: str) -> Sequence[str]:
+    """Loads and caches the memory-mapped word list for a given language."""
     if language in WORD_LIST_CACHE:
         return WORD_LIST_CACHE[language]
+    with _LOAD_LOCK:
+        if language in WORD_LIST_CACHE: # Loaded by the other thread while this one waited
+            return WORD_LIST_CACHE[language]
+        return _load_word_list(language)
 
+
+def _load_word_list(language: str) -> Sequence[str]:
     file_path = DATA_DIR / f"{language}_words.txt"
     if not file_path.is_file():
         print(f"Warning: Word list for '{language}' not found. Falling back to English.", file=sys.stderr)
@@ -25,104 +51,294 @@ def load_word_list(language: str) -> List[str]:
             raise FileNotFoundError("Default English word list (en_words.txt) not found in data directory.")
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            words = [line.strip() for line in f if line.strip()]
-        if not words:
-            raise ValueError(f"Word list file '{file_path}' is empty.")
-        WORD_LIST_CACHE[language] = words
-        return words
+        words = wordpack.open_for_source(file_path, get_config_dir() / WORDPACK_DIR_NAME)
     except Exception as e:
         raise IOError(f"Error loading word list from '{file_path}': {e}") from e
-
-
-def generate_prompt_text(word_list: List[str], mode: GameMode, config_value: int) -> str:
-    """Generates the prompt string based on the mode and config."""
+    if not words:
+        raise ValueError(f"Word list file '{file_path}' is empty.")
+    WORD_LIST_CACHE[language] = words
+    return words
+
+
+def get_sampler(word_list: Sequence[str]) -> WordSampler:
+    """Returns the cached weighted sampler for a word list."""
+    if isinstance(word_list, wordpack.WordPack):
+        return word_list.sampler()
+    sampler = SAMPLER_CACHE.get(id(word_list))
+    if sampler is None or sampler.words is not word_list:
+        sampler = WordSampler(word_list)
+        SAMPLER_CACHE[id(word_list)] = sampler
+    return sampler
+
+
+def get_bigram_index(word_list: Sequence[str]) -> practice.BigramIndex:
+    """Returns the key/bigram to word index for a word list, cached on disk for word packs."""
+    cached = BIGRAM_INDEX_CACHE.get(id(word_list))
+    if cached is not None and cached[0] is word_list:
+        return cached[1]
+    with _LOAD_LOCK:
+        cached = BIGRAM_INDEX_CACHE.get(id(word_list))
+        if cached is not None and cached[0] is word_list:
+            return cached[1]
+        if isinstance(word_list, wordpack.WordPack):
+            index = practice.open_for_pack(word_list.path, word_list, get_config_dir() / WORDPACK_DIR_NAME)
+        else:
+            index = practice.BigramIndex.build(word_list)
+        BIGRAM_INDEX_CACHE[id(word_list)] = (word_list, index)
+    return index
+
+
+def _add_punctuation_and_numbers(words: List[str], options: PromptOptions,
+                                 rng: Optional[random.Random] = None, capitalize: bool = True,
+                                 end_sentence: bool = True) -> List[str]:
+    """Swaps in numbers and adds punctuation/capitalisation, Monkeytype-style.
+
+    `capitalize` says whether the first word starts a sentence, and `end_sentence`
+    whether the last one has to close it; both are off between chunks of a stream.
+    """
+    rand = rng or random
+    decorated = []
+    capitalize = options.punctuation and capitalize
+    for word in words:
+        if options.numbers and rand.random() < NUMBER_PROBABILITY:
+            word = str(rand.randint(0, 9999))
+        if options.punctuation:
+            if capitalize:
+                word = word[:1].upper() + word[1:]
+            roll = rand.random()
+            mark = next((mark for mark, threshold in PUNCTUATION_THRESHOLDS if roll < threshold), "")
+            word += mark
+            capitalize = mark in SENTENCE_ENDINGS
+        decorated.append(word)
+    if end_sentence and options.punctuation and decorated and decorated[-1][-1:] not in SENTENCE_ENDINGS:
+        decorated[-1] += "."
+    return decorated
+
+
+def draw_words(word_list: Sequence[str], count: int, options: Optional[PromptOptions] = None,
+               rng: Optional[random.Random] = None) -> List[str]:
+    """Draws `count` prompt words (weighted by frequency if the list has counts), honouring `options`."""
+    options = options or PromptOptions()
+    selected_words = get_sampler(word_list).draw(
+        count, max_length=options.max_word_length, top_n=options.top_n, rng=rng
+    )
+    if options.punctuation or options.numbers:
+        selected_words = _add_punctuation_and_numbers(selected_words, options, rng)
+    return selected_words
+
+
+class PromptStream:
+    """Endless time-mode prompt, drawn a chunk at a time but punctuated as one text.
+
+    The sentence carries on across chunks, so a chunk boundary never forces a
+    capital letter or a full stop.
+    """
+
+    def __init__(self, word_list: Sequence[str], options: Optional[PromptOptions] = None,
+                 rng: Optional[random.Random] = None):
+        self.word_list = word_list
+        self.options = options or PromptOptions()
+        self.rng = rng
+        self._capitalize = True # The next word starts a sentence
+
+    def __call__(self, count: int) -> List[str]:
+        options = self.options
+        selected_words = get_sampler(self.word_list).draw(
+            count, max_length=options.max_word_length, top_n=options.top_n, rng=self.rng
+        )
+        if selected_words and (options.punctuation or options.numbers):
+            selected_words = _add_punctuation_and_numbers(
+                selected_words, options, self.rng, capitalize=self._capitalize, end_sentence=False
+            )
+            self._capitalize = selected_words[-1][-1:] in SENTENCE_ENDINGS
+        return selected_words
+
+
+def generate_prompt_text(word_list: Sequence[str], mode: GameMode, config_value: int,
+                         options: Optional[PromptOptions] = None,
+                         rng: Optional[random.Random] = None,
+                         key_stats: Optional[KeyStats] = None) -> str:
+    """Generates the prompt string based on the mode and config.
+
+    Words are drawn from the precomputed table for the difficulty filter in
+    `options`, weighted by frequency when the word list has counts. Time mode only gets the first chunk; the rest
+    is streamed in by `extend_prompt` as the user types. Practice mode draws most
+    words through the bigram index for the weakest spots in `key_stats`, and is
+    a plain words test until there is enough typing to tell what those are. Pass
+    a seeded `rng` for a reproducible prompt.
+    """
     if not word_list:
         return "error loading words"
 
-    num_available_words = len(word_list)
-    if mode == GameMode.WORDS:
-        num_words_to_select = min(config_value, num_available_words)
-        selected_words = random.sample(word_list, k=num_words_to_select)
-    elif mode == GameMode.TIME:
-        num_words_to_select = min(200, num_available_words) # Adjust sample size as needed
-        selected_words = random.choices(word_list, k=num_words_to_select)
+    if mode == GameMode.PRACTICE and key_stats is not None:
+        index = get_bigram_index(word_list)
+        weak_spots = practice.plan(key_stats, index)
+        if weak_spots is not None:
+            selected_words = practice.draw_practice_words(
+                word_list, get_sampler(word_list), index, weak_spots, config_value, options, rng
+            )
+            if options is not None and (options.punctuation or options.numbers):
+                selected_words = _add_punctuation_and_numbers(selected_words, options, rng)
+            return " ".join(selected_words)
+
+    if mode == GameMode.TIME:
+        return " ".join(PromptStream(word_list, options, rng)(PROMPT_CHUNK_WORDS))
+    if mode in (GameMode.WORDS, GameMode.PRACTICE):
+        num_words_to_select = config_value
     else:
-        selected_words = random.sample(word_list, k=min(50, num_available_words)) # Fallback
+        num_words_to_select = 50 # Fallback
 
-    return " ".join(selected_words)
+    return " ".join(draw_words(word_list, num_words_to_select, options, rng))
 
 
-def start_game(mode: GameMode, config_value: int, language: str) -> GameState:
-    """Initializes the game state for a new test including language support."""
+def start_game(mode: GameMode, config_value: int, language: str,
+               options: Optional[PromptOptions] = None, seed: Optional[int] = None,
+               key_stats: Optional[KeyStats] = None) -> GameState:
+    """Initializes the game state for a new test including language support.
+
+    The same `seed` and settings always produce the same prompt, including the
+    words streamed in later in time mode. `key_stats` steers practice mode.
+    """
     try:
         words = load_word_list(language)
     except (FileNotFoundError, IOError, ValueError) as e:
         print(f"Error: {e}", file=sys.stderr)
         words = ["error", "loading", "wordlist"]
 
-    prompt = generate_prompt_text(words, mode, config_value)
+    rng = random.Random(seed) if seed is not None else None
+    prompt_source = None
+    if mode == GameMode.TIME:
+        prompt_source = PromptStream(words, options, rng)
+        prompt = " ".join(prompt_source(PROMPT_CHUNK_WORDS))
+    else:
+        prompt = generate_prompt_text(words, mode, config_value, options, rng, key_stats)
     return GameState(
         prompt_text=prompt,
         mode=mode,
         config_value=config_value,
         state=TestState.NOT_STARTED,
-        language=language # Store language in state if needed later
+        language=language, # Store language in state if needed later
+        prompt_source=prompt_source,
     )
 
+
+def extend_prompt(game_state: GameState, num_words: int = PROMPT_CHUNK_WORDS) -> None:
+    """Appends another chunk of words from the game's prompt source."""
+    if game_state.prompt_source is None:
+        return
+    words = game_state.prompt_source(num_words)
+    if not words:
+        return
+    game_state.prompt_text = f"{game_state.prompt_text} {' '.join(words)}"
+    game_state.prompt_words.extend(words)
+    if game_state.mode == GameMode.TIME:
+        game_state.target_chars = len(game_state.prompt_text)
+
 BACKSPACE_CHAR = '\x7f' if sys.platform != 'win32' else '\b'
 
-def process_input(game_state: GameState, char: str) -> None:
-    """Processes a single character input from the user, including backspace."""
+def process_input(game_state: GameState, char: str, timestamp: float | None = None) -> None:
+    """Processes a single character input from the user, including backspace.
+
+    `timestamp` is the monotonic time the key was pressed; defaults to now.
+    """
     if game_state.state == TestState.FINISHED or game_state.is_finished():
         return
 
+    if timestamp is None:
+        timestamp = game_state.clock()
+
     if game_state.state == TestState.NOT_STARTED:
         if char != BACKSPACE_CHAR:
             game_state.state = TestState.RUNNING
-            game_state.start_time = time.monotonic()
+            game_state.start_time = timestamp
         else:
             return # Ignore backspace before starting
+    start_time = game_state.start_time
+    if start_time is None: # Only a restored, inconsistent state gets here
+        return
+    elapsed = timestamp - start_time
 
-    current_input_index = len(game_state.user_input_chars)
+    game_state.keylog.record(BACKSPACE_CODE if char == BACKSPACE_CHAR else ord(char), timestamp)
 
     if char == BACKSPACE_CHAR:
-        if current_input_index > 0:
-            game_state.user_input_chars.pop()
-            removed_char_index = current_input_index - 1
-            game_state.error_indices.discard(removed_char_index)
-            game_state.current_char_index_overall = len(game_state.user_input_chars)
-            game_state.user_input_text = "".join(game_state.user_input_chars)
-            game_state.current_word_index = game_state.user_input_text.count(' ')
-
+        _remove_last_char(game_state)
+        game_state.key_stats.break_sequence()
+        game_state.seconds.correct_changed(elapsed, game_state.correct_chars_count)
     elif char.isprintable() or char == ' ':
-        game_state.user_input_chars.append(char)
-        game_state.user_input_text = "".join(game_state.user_input_chars)
-        game_state.total_typed_entries += 1
-        current_input_index = len(game_state.user_input_chars) - 1 # Index of char just added
-
-        if current_input_index < len(game_state.prompt_text):
-            expected_char = game_state.prompt_text[current_input_index]
-            if char != expected_char:
-                game_state.error_indices.add(current_input_index)
-            else:
-                game_state.error_indices.discard(current_input_index)
-        else:
-            game_state.error_indices.add(current_input_index)
-
-        game_state.current_char_index_overall = len(game_state.user_input_chars)
-        if char == ' ':
-            game_state.current_word_index += 1
+        _append_char(game_state, char, timestamp, elapsed)
 
     if game_state.is_finished() and game_state.state != TestState.FINISHED:
         finish_game(game_state)
 
+def _append_char(game_state: GameState, char: str, timestamp: float, elapsed: float) -> None:
+    """Appends a typed char and updates the running counters and per-second buckets in O(1)."""
+    index = len(game_state.user_input_chars)
+    game_state.user_input_chars.append(char)
+    game_state.total_typed_entries += 1
+
+    error = True
+    if index < len(game_state.prompt_text):
+        expected = game_state.prompt_text[index]
+        if char == expected:
+            game_state.correct_chars_count += 1
+            error = False
+        else:
+            game_state.incorrect_chars_count += 1
+            game_state.error_indices.add(index)
+        game_state.key_stats.record(expected, error, timestamp)
+    else:
+        game_state.extra_chars_count += 1
+        game_state.error_indices.add(index)
+        game_state.key_stats.break_sequence()
+    game_state.seconds.record(elapsed, error, game_state.correct_chars_count)
+
+    game_state.current_char_index_overall = index + 1
+    if char == ' ':
+        game_state.current_word_index += 1
+
+    if game_state.prompt_source is not None and len(game_state.prompt_text) - index < PROMPT_LOOKAHEAD_CHARS:
+        extend_prompt(game_state)
+
+
+def _remove_last_char(game_state: GameState) -> None:
+    """Removes the last typed char and rolls back its contribution to the counters."""
+    if not game_state.user_input_chars:
+        return
+
+    removed_char = game_state.user_input_chars.pop()
+    index = len(game_state.user_input_chars)
+
+    if index >= len(game_state.prompt_text):
+        game_state.extra_chars_count -= 1
+        game_state.error_indices.discard(index)
+    elif index in game_state.error_indices:
+        game_state.incorrect_chars_count -= 1
+        game_state.error_indices.discard(index)
+    else:
+        game_state.correct_chars_count -= 1
+
+    game_state.current_char_index_overall = index
+    if removed_char == ' ':
+        game_state.current_word_index -= 1
+
+
+def feed(game_state: GameState, chunk: str, timestamp: float | None = None) -> None:
+    """Processes a burst of characters (pasted or buffered input) in one call."""
+    for char in chunk:
+        if game_state.state == TestState.FINISHED:
+            break
+        process_input(game_state, char, timestamp)
+
+
 def finish_game(game_state: GameState):
     """Sets the game state to finished and records end time."""
     if game_state.state != TestState.FINISHED:
         game_state.state = TestState.FINISHED
         if game_state.end_time is None:
-            game_state.end_time = time.monotonic()
+            game_state.end_time = game_state.clock()
+            if game_state.mode == GameMode.TIME and game_state.start_time is not None:
+                # A time-mode test ends exactly at its deadline, however late it is noticed
+                game_state.end_time = min(game_state.end_time, game_state.start_time + game_state.config_value)
         if game_state.start_time is None:
             game_state.start_time = game_state.end_time
 
@@ -139,22 +355,8 @@ def calculate_results(game_state: GameState) -> TestResult:
     if elapsed_time <= 0:
         return TestResult(mode=game_state.mode, config_value=game_state.config_value)
 
-    correct_chars = 0
-    incorrect_chars = 0
-    num_chars_to_compare = min(len(game_state.user_input_text), len(game_state.prompt_text))
-
-    for i in range(num_chars_to_compare):
-        if game_state.user_input_text[i] == game_state.prompt_text[i]:
-            correct_chars += 1
-        else:
-            incorrect_chars += 1
-
-    extra_chars = len(game_state.user_input_text) - len(game_state.prompt_text)
-    if extra_chars > 0:
-        incorrect_chars += extra_chars
-
-    game_state.correct_chars_count = correct_chars
-    game_state.incorrect_chars_count = incorrect_chars # Update state for consistency? Or just use local vars?
+    correct_chars = game_state.correct_chars_count
+    incorrect_chars = game_state.incorrect_chars_count + game_state.extra_chars_count
 
     correct_wpm = (correct_chars / 5) / (elapsed_time / 60)
 
@@ -164,15 +366,15 @@ def calculate_results(game_state: GameState) -> TestResult:
     accuracy = (correct_chars / total_compared_chars * 100) if total_compared_chars > 0 else 0.0
 
     if game_state.mode == GameMode.TIME:
-        total_expected_chars = len(game_state.user_input_text)
-    elif game_state.mode == GameMode.WORDS:
-        words_to_consider = game_state.prompt_words[:game_state.config_value]
-        if len(words_to_consider) < game_state.config_value:
-             print(f"Warning: Generated prompt has only {len(words_to_consider)} words, less than requested {game_state.config_value}.", file=sys.stderr)
-        total_expected_chars = len(" ".join(words_to_consider))
+        total_expected_chars = len(game_state.user_input_chars)
+    elif game_state.mode in (GameMode.WORDS, GameMode.PRACTICE):
+        if len(game_state.prompt_words) < game_state.config_value:
+             print(f"Warning: Generated prompt has only {len(game_state.prompt_words)} words, less than requested {game_state.config_value}.", file=sys.stderr)
+        total_expected_chars = game_state.target_chars
     else:
         total_expected_chars = len(game_state.prompt_text) # Fallback
 
+    per_second = game_state.seconds.series(elapsed_time)
     return TestResult(
         wpm=correct_wpm,
         raw_wpm=raw_wpm,
@@ -183,4 +385,8 @@ def calculate_results(game_state: GameState) -> TestResult:
         time_elapsed_seconds=elapsed_time,
         mode=game_state.mode,
         config_value=game_state.config_value,
+        consistency=per_second.consistency,
+        raw_per_second=per_second.raw_wpm,
+        wpm_per_second=per_second.wpm,
+        errors_per_second=per_second.errors,
     ) 
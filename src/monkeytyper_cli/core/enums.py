@@ -0,0 +1,18 @@
+# Game enums, kept free of heavy imports so the CLI can build its options cheaply
+
+from enum import Enum
+
+class GameMode(Enum):
+    TIME = "time"
+    WORDS = "words"
+    PRACTICE = "practice" # Word-count test drawn around the user's weakest keys and bigrams
+
+class Language(str, Enum):
+    EN = "en"
+    ID = "id"
+
+
+class TestState(Enum):
+    NOT_STARTED = "not_started"
+    RUNNING = "running"
+    FINISHED = "finished"
@@ -0,0 +1,252 @@
+# Persistent result history (SQLite, WAL mode)
+
+import pathlib
+import sqlite3
+import time
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .keystats import KeyStats
+from .models import TestResult
+
+HISTORY_DB_NAME = "history.sqlite3"
+SCHEMA_VERSION = 2
+BUSY_TIMEOUT_MS = 5000 # How long an append waits for another CLI process holding the write lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    config_value INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    wpm REAL NOT NULL,
+    raw_wpm REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    correct_chars INTEGER NOT NULL,
+    incorrect_chars INTEGER NOT NULL,
+    total_chars INTEGER NOT NULL,
+    time_elapsed REAL NOT NULL,
+    keylog_path TEXT
+);
+CREATE INDEX IF NOT EXISTS results_finished_at ON results (finished_at);
+-- Covers the per-mode aggregates, so summaries never touch the table itself
+CREATE INDEX IF NOT EXISTS results_mode_config ON results (mode, config_value, finished_at, wpm, accuracy, time_elapsed);
+CREATE INDEX IF NOT EXISTS results_language ON results (language, finished_at);
+-- Running per-key/bigram counters (see core.keystats), one row per slot ever typed
+CREATE TABLE IF NOT EXISTS key_stats (
+    slot INTEGER PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL
+);
+"""
+
+_COLUMNS = ("id, finished_at, mode, config_value, language, wpm, raw_wpm, accuracy, "
+            "correct_chars, incorrect_chars, total_chars, time_elapsed, keylog_path")
+
+
+class StoredResult(NamedTuple):
+    id: int
+    finished_at: float # time.time() when the test ended
+    mode: str
+    config_value: int
+    language: str
+    wpm: float
+    raw_wpm: float
+    accuracy: float
+    correct_chars: int
+    incorrect_chars: int
+    total_chars: int
+    time_elapsed: float
+    keylog_path: Optional[str]
+
+
+class HistorySummary(NamedTuple):
+    mode: Optional[str] # None for totals over every mode
+    config_value: Optional[int]
+    tests: int
+    avg_wpm: float
+    best_wpm: float
+    avg_accuracy: float
+    time_typing: float # Seconds
+    first_at: float
+    last_at: float
+
+
+class HistoryStore:
+    """Append-only store of finished tests.
+
+    WAL mode lets several CLI processes append at once while others read; every
+    query filters on indexed columns, so views stay fast with 100k+ rows.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL") # Durable enough with WAL, much cheaper
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            with self._transaction(): # executescript() would commit behind our back
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        self._conn.execute(statement)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, result: TestResult, language: str, finished_at: Optional[float] = None,
+               key_stats: Optional[KeyStats] = None) -> int:
+        """Stores a finished test and returns its id, merging its key stats in the same transaction."""
+        with self._transaction():
+            result_id = self._insert(result, language, finished_at)
+            if key_stats is not None:
+                self._merge_key_stats(key_stats)
+        return result_id
+
+    def _insert(self, result: TestResult, language: str, finished_at: Optional[float]) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO results (finished_at, mode, config_value, language, wpm, raw_wpm, accuracy, "
+            "correct_chars, incorrect_chars, total_chars, time_elapsed, keylog_path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                time.time() if finished_at is None else finished_at,
+                result.mode.value, result.config_value, language,
+                result.wpm, result.raw_wpm, result.accuracy,
+                result.correct_chars, result.incorrect_chars, result.total_chars,
+                result.time_elapsed_seconds, result.keylog_path,
+            ),
+        )
+        if cursor.lastrowid is None:
+            raise sqlite3.DatabaseError("Inserted history row has no id.")
+        return cursor.lastrowid
+
+    def _merge_key_stats(self, key_stats: KeyStats) -> None:
+        if not key_stats:
+            return
+        merged = self.key_stats()
+        for row in key_stats.rows():
+            merged.merge_row(*row)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO key_stats (slot, hits, errors, samples, mean, m2) VALUES (?, ?, ?, ?, ?, ?)",
+            merged.rows(key_stats.slots),
+        )
+
+    def key_stats(self) -> KeyStats:
+        """Per-key/bigram counters over every stored test. At most a few thousand rows, whatever the history size."""
+        stats = KeyStats()
+        for row in self._conn.execute("SELECT slot, hits, errors, samples, mean, m2 FROM key_stats"):
+            stats.merge_row(*row)
+        return stats
+
+    @staticmethod
+    def _filters(mode: Optional[str], config_value: Optional[int], language: Optional[str],
+                 since: Optional[float], until: Optional[float],
+                 ids: Optional[Sequence[int]] = None) -> Tuple[str, List[object]]:
+        clauses: List[str] = []
+        params: List[object] = []
+        for column, value in (("mode", mode), ("config_value", config_value), ("language", language)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("finished_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("finished_at < ?")
+            params.append(until)
+        if ids is not None:
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def recent(self, limit: int = 20, offset: int = 0, mode: Optional[str] = None,
+               config_value: Optional[int] = None, language: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               ids: Optional[Sequence[int]] = None) -> List[StoredResult]:
+        """Newest results first, optionally filtered, limited to [since, until) or to the rows `ids`."""
+        where, params = self._filters(mode, config_value, language, since, until, ids)
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM results{where} ORDER BY finished_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        return [StoredResult(*row) for row in rows]
+
+    def iter_results(self, mode: Optional[str] = None, config_value: Optional[int] = None,
+                     language: Optional[str] = None, since: Optional[float] = None,
+                     until: Optional[float] = None) -> Iterator[StoredResult]:
+        """Oldest first; rows are streamed rather than loaded at once."""
+        where, params = self._filters(mode, config_value, language, since, until)
+        for row in self._conn.execute(f"SELECT {_COLUMNS} FROM results{where} ORDER BY finished_at, id", params):
+            yield StoredResult(*row)
+
+    def columns(self, *names: str, language: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> Tuple[tuple, ...]:
+        """Selected columns of every matching result, oldest first, one tuple per column."""
+        unknown = set(names) - set(StoredResult._fields)
+        if unknown:
+            raise ValueError(f"Unknown history columns: {', '.join(sorted(unknown))}")
+        where, params = self._filters(None, None, language, since, until)
+        rows = self._conn.execute(f"SELECT {', '.join(names)} FROM results{where} ORDER BY finished_at, id", params).fetchall()
+        if not rows:
+            return tuple(() for _ in names)
+        return tuple(zip(*rows))
+
+    def count(self, mode: Optional[str] = None, config_value: Optional[int] = None,
+              language: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, ids: Optional[Sequence[int]] = None) -> int:
+        where, params = self._filters(mode, config_value, language, since, until, ids)
+        return self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def summary(self, language: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> List[HistorySummary]:
+        """Aggregates per (mode, config), busiest first, followed by the overall totals."""
+        where, params = self._filters(None, None, language, since, until)
+        aggregates = ("COUNT(*), AVG(wpm), MAX(wpm), AVG(accuracy), SUM(time_elapsed), "
+                      "MIN(finished_at), MAX(finished_at)")
+        rows = self._conn.execute(
+            f"SELECT mode, config_value, {aggregates} FROM results{where} "
+            "GROUP BY mode, config_value ORDER BY COUNT(*) DESC",
+            params,
+        ).fetchall()
+        summaries = [HistorySummary(*row) for row in rows]
+        if summaries:
+            tests = sum(s.tests for s in summaries)
+            summaries.append(HistorySummary(
+                mode=None,
+                config_value=None,
+                tests=tests,
+                avg_wpm=sum(s.avg_wpm * s.tests for s in summaries) / tests,
+                best_wpm=max(s.best_wpm for s in summaries),
+                avg_accuracy=sum(s.avg_accuracy * s.tests for s in summaries) / tests,
+                time_typing=sum(s.time_typing for s in summaries),
+                first_at=min(s.first_at for s in summaries),
+                last_at=max(s.last_at for s in summaries),
+            ))
+        return summaries
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolling back on errors (the connection is in autocommit mode)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
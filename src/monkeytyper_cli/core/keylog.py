@@ -0,0 +1,135 @@
+# Compact keystroke log and its on-disk format
+
+from array import array
+import pathlib
+import struct
+import sys
+from typing import Iterator, NamedTuple, Tuple
+
+MAGIC = b"MTKL"
+FORMAT_VERSION = 1
+BACKSPACE_CODE = 0x08 # Backspace is normalised to this code regardless of platform
+
+# magic, version, mode length, language length, prompt length (bytes), key count,
+# config value, duration
+_HEADER = struct.Struct("<4sBBBxIIId")
+
+
+class KeystrokeLog:
+    """Array-backed record of every keystroke: codepoint plus time since the first key."""
+
+    __slots__ = ("codes", "times", "origin")
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.times = array("d")
+        self.origin: float | None = None
+
+    def record(self, code: int, timestamp: float) -> None:
+        """Appends one keystroke. Timestamps are monotonic seconds."""
+        if self.origin is None:
+            self.origin = timestamp
+        self.codes.append(code)
+        self.times.append(timestamp - self.origin)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.codes, self.times)
+
+
+class RecordedSession(NamedTuple):
+    """Everything needed to replay a test: its configuration plus the keystroke log."""
+    prompt_text: str
+    mode: str
+    config_value: int
+    language: str
+    duration: float # Seconds from the first key to the end of the test
+    log: KeystrokeLog
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def dumps(session: RecordedSession) -> bytes:
+    """Serialises a recorded session to the binary keystroke log format."""
+    mode = session.mode.encode("ascii")
+    language = session.language.encode("ascii")
+    prompt = session.prompt_text.encode("utf-8")
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(mode), len(language),
+        len(prompt), len(session.log), session.config_value, session.duration,
+    )
+    return b"".join((
+        header, mode, language, prompt,
+        _little_endian(session.log.codes).tobytes(),
+        _little_endian(session.log.times).tobytes(),
+    ))
+
+
+def loads(data: bytes) -> RecordedSession:
+    """Parses bytes produced by `dumps`."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Keystroke log is truncated.")
+    magic, version, mode_len, lang_len, prompt_len, count, config_value, duration = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a keystroke log file.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported keystroke log version: {version}")
+
+    offset = _HEADER.size
+    mode = data[offset:offset + mode_len].decode("ascii")
+    offset += mode_len
+    language = data[offset:offset + lang_len].decode("ascii")
+    offset += lang_len
+    prompt_text = data[offset:offset + prompt_len].decode("utf-8")
+    offset += prompt_len
+
+    log = KeystrokeLog()
+    log.origin = 0.0
+    codes_end = offset + count * log.codes.itemsize
+    times_end = codes_end + count * log.times.itemsize
+    if len(data) < times_end:
+        raise ValueError("Keystroke log is truncated.")
+    log.codes.frombytes(data[offset:codes_end])
+    log.times.frombytes(data[codes_end:times_end])
+    if sys.byteorder == "big":
+        log.codes.byteswap()
+        log.times.byteswap()
+
+    return RecordedSession(prompt_text, mode, config_value, language, duration, log)
+
+
+def save(path: pathlib.Path, session: RecordedSession) -> pathlib.Path:
+    """Writes a recorded session to `path`, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(dumps(session))
+    return path
+
+
+def save_new(directory: pathlib.Path, stem: str, session: RecordedSession) -> pathlib.Path:
+    """Writes a recorded session to a new `<stem>.mtkl` in `directory`, never replacing an existing log.
+
+    A name that's taken gets a -2, -3, ... suffix.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    data = dumps(session)
+    attempt = 1
+    while True:
+        path = directory / (f"{stem}.mtkl" if attempt == 1 else f"{stem}-{attempt}.mtkl")
+        try:
+            with open(path, "xb") as f:
+                f.write(data)
+            return path
+        except FileExistsError:
+            attempt += 1
+
+
+def load(path: pathlib.Path) -> RecordedSession:
+    """Reads a recorded session from `path`."""
+    return loads(pathlib.Path(path).read_bytes())
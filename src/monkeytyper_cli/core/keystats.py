@@ -0,0 +1,152 @@
+# Per-key and per-bigram hit, error and latency counters
+
+from array import array
+import heapq
+import math
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+FIRST_CODE = 0x20 # Printable ASCII, space to tilde, gets a slot; anything else isn't tracked
+KEYS = 95
+BIGRAMS = KEYS * KEYS
+SLOTS = KEYS + BIGRAMS # Keys first, then bigram `a * KEYS + b` at KEYS + that
+MAX_LATENCY = 2.0 # Seconds; longer gaps are pauses, not typing speed
+ERROR_PENALTY = 1.0 # Seconds a mistake costs in the weakness score (noticing it and backspacing)
+
+
+def key_id(char: str) -> int:
+    """Slot of a single char, or -1 if it isn't tracked."""
+    code = ord(char) - FIRST_CODE
+    return code if 0 <= code < KEYS else -1
+
+
+def slot_text(slot: int) -> str:
+    if slot < KEYS:
+        return chr(FIRST_CODE + slot)
+    first, second = divmod(slot - KEYS, KEYS)
+    return chr(FIRST_CODE + first) + chr(FIRST_CODE + second)
+
+
+class Weakness(NamedTuple):
+    slot: int
+    text: str # The key or bigram
+    hits: int
+    errors: int
+    error_rate: float # 0-1
+    mean_latency: float # Seconds from the previous key
+    stdev_latency: float
+    score: float # Expected seconds per attempt, mistakes included; higher is weaker
+
+
+class KeyStats:
+    """Hits, errors and inter-key latency (Welford mean/variance) per key and bigram.
+
+    Counters are keyed by the prompt char the user was meant to type. Each slot
+    gets a column in dense arrays the first time it's seen, found through a
+    fixed-size slot -> column table, so recording a keystroke is O(1) and a test
+    only pays for the keys and bigrams it actually touched.
+    """
+
+    __slots__ = ("columns", "slots", "hits", "errors", "samples", "mean", "m2", "_previous", "_previous_time")
+
+    def __init__(self) -> None:
+        self.columns = array("H", bytes(2 * SLOTS)) # 1 + column of each slot, 0 if never seen
+        self.slots = array("H") # Slot of each column, in order of first use
+        self.hits = array("I")
+        self.errors = array("I")
+        self.samples = array("I") # Latencies seen; first keys and pauses have none
+        self.mean = array("d")
+        self.m2 = array("d") # Sum of squared deviations from the mean
+        self._previous = -1 # Key slot of the last char typed in sequence
+        self._previous_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _column(self, slot: int) -> int:
+        column = self.columns[slot] - 1
+        if column < 0:
+            column = len(self.slots)
+            self.columns[slot] = column + 1
+            self.slots.append(slot)
+            for values in (self.hits, self.errors, self.samples):
+                values.append(0)
+            self.mean.append(0.0)
+            self.m2.append(0.0)
+        return column
+
+    def _update(self, slot: int, error: bool, latency: Optional[float]) -> None:
+        column = self._column(slot)
+        self.hits[column] += 1
+        if error:
+            self.errors[column] += 1
+        if latency is not None:
+            n = self.samples[column] + 1
+            self.samples[column] = n
+            delta = latency - self.mean[column]
+            self.mean[column] += delta / n
+            self.m2[column] += delta * (latency - self.mean[column])
+
+    def record(self, expected: str, error: bool, timestamp: float) -> None:
+        """Counts an attempt at the prompt char `expected`, typed at `timestamp`."""
+        slot = key_id(expected)
+        if slot < 0:
+            self._previous = -1
+            return
+        latency = None
+        if self._previous >= 0 and 0 <= timestamp - self._previous_time <= MAX_LATENCY:
+            latency = timestamp - self._previous_time
+        self._update(slot, error, latency)
+        if self._previous >= 0:
+            self._update(KEYS + self._previous * KEYS + slot, error, latency)
+        self._previous, self._previous_time = slot, timestamp
+
+    def break_sequence(self) -> None:
+        """The next char doesn't follow the last one (a backspace came in between)."""
+        self._previous = -1
+
+    def rows(self, slots: Optional[Iterable[int]] = None) -> List[Tuple[int, int, int, int, float, float]]:
+        """(slot, hits, errors, samples, mean, m2) for the given slots, default every slot seen."""
+        rows = []
+        for slot in sorted(self.slots if slots is None else slots):
+            column = self.columns[slot] - 1
+            if column >= 0:
+                rows.append((slot, self.hits[column], self.errors[column], self.samples[column],
+                             self.mean[column], self.m2[column]))
+        return rows
+
+    def merge_row(self, slot: int, hits: int, errors: int, samples: int, mean: float, m2: float) -> None:
+        """Adds counters gathered elsewhere (Chan et al.'s parallel variance update)."""
+        column = self._column(slot)
+        self.hits[column] += hits
+        self.errors[column] += errors
+        if samples == 0:
+            return
+        n_a = self.samples[column]
+        n = n_a + samples
+        delta = mean - self.mean[column]
+        self.mean[column] += delta * samples / n
+        self.m2[column] += m2 + delta * delta * n_a * samples / n
+        self.samples[column] = n
+
+    def weakness(self, slot: int) -> Weakness:
+        column = self.columns[slot] - 1
+        if column < 0:
+            return Weakness(slot, slot_text(slot), 0, 0, 0.0, 0.0, 0.0, 0.0)
+        hits, errors, samples = self.hits[column], self.errors[column], self.samples[column]
+        error_rate = errors / hits if hits else 0.0
+        mean = self.mean[column]
+        stdev = math.sqrt(self.m2[column] / (samples - 1)) if samples > 1 else 0.0
+        return Weakness(slot, slot_text(slot), hits, errors, error_rate, mean, stdev,
+                        mean + error_rate * ERROR_PENALTY)
+
+    def weakest(self, bigrams: bool = False, limit: int = 10, min_hits: int = 20) -> List[Weakness]:
+        """The `limit` keys (or bigrams) with the highest weakness score and enough data."""
+        hits, slots = self.hits, self.slots
+        candidates = (
+            column for column in range(len(slots))
+            if hits[column] >= min_hits and (slots[column] >= KEYS) == bigrams
+        )
+        return [self.weakness(slots[column]) for column in heapq.nlargest(limit, candidates, key=self._score)]
+
+    def _score(self, column: int) -> float:
+        return self.mean[column] + self.errors[column] / self.hits[column] * ERROR_PENALTY
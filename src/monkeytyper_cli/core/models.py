@@ -1,21 +1,26 @@
-from pydantic import BaseModel, Field
-from enum import Enum
-from typing import List, Any, Optional
+from array import array
+from dataclasses import dataclass, field
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Callable, Iterator, List, Optional
+import sys
 import time
 
-class GameMode(Enum):
-    TIME = "time"
-    WORDS = "words"
+from .enums import GameMode, Language, TestState
+from .keylog import KeystrokeLog
+from .keystats import KeyStats
+from .timeline import SecondBuckets
 
-class Language(str, Enum):
-    EN = "en"
-    ID = "id"
+INPUT_TYPECODE = "w" if sys.version_info >= (3, 13) else "u" # 'u' is deprecated from 3.13
 
 
-class TestState(Enum):
-    NOT_STARTED = "not_started"
-    RUNNING = "running"
-    FINISHED = "finished"
+class PromptOptions(BaseModel):
+    """Difficulty and content options for prompt generation."""
+    model_config = ConfigDict(frozen=True)
+
+    punctuation: bool = False
+    numbers: bool = False
+    max_word_length: Optional[int] = None
+    top_n: Optional[int] = None # Only draw from the N most common words
 
 
 class TestResult(BaseModel):
@@ -27,15 +32,84 @@ class TestResult(BaseModel):
     total_chars: int = 0 # Total expected chars in the completed part
     time_elapsed_seconds: float = 0.0
     mode: GameMode
-    config_value: int # Duration in seconds for time mode, word count for words mode
+    config_value: int # Duration in seconds for time mode, word count for words and practice mode
+    keylog_path: Optional[str] = None # Where the keystroke log of this test was saved
+    consistency: Optional[float] = None # 0-100, Monkeytype's kogasa() of the raw WPM per second
+    raw_per_second: List[float] = Field(default_factory=list)
+    wpm_per_second: List[float] = Field(default_factory=list) # Cumulative WPM at the end of each second
+    errors_per_second: List[int] = Field(default_factory=list)
 
 
-class GameState(BaseModel):
+class GameSnapshot(BaseModel):
+    """Serializable copy of a GameState."""
     prompt_text: str
-    prompt_words: List[str] = Field(default_factory=list)
-    user_input_text: str = ""
-    user_input_chars: List[str] = Field(default_factory=list) # Store individual typed chars
-    error_indices: set[int] = Field(default_factory=set) # Indices of errors in user_input_chars
+    user_input: str
+    error_indices: List[int]
+    correct_chars_count: int
+    incorrect_chars_count: int
+    extra_chars_count: int
+    total_typed_entries: int
+    target_chars: int
+    start_time: Optional[float]
+    end_time: Optional[float]
+    state: TestState
+    mode: GameMode
+    config_value: int
+    language: Optional[Language]
+
+
+class ErrorBitmap:
+    """Set of error indices, one bit per typed char, that grows as input runs past the prompt."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, size: int = 0) -> None:
+        self.bits = bytearray((size >> 3) + 1)
+
+    def reserve(self, size: int) -> None:
+        """Makes room for indices below `size` up front, so adding them never grows the buffer."""
+        missing = (size >> 3) + 1 - len(self.bits)
+        if missing > 0:
+            self.bits.extend(bytes(missing))
+
+    def add(self, index: int) -> None:
+        byte = index >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1, 2 * len(self.bits)) - len(self.bits)))
+        self.bits[byte] |= 1 << (index & 7)
+
+    def discard(self, index: int) -> None:
+        byte = index >> 3
+        if byte < len(self.bits):
+            self.bits[byte] &= ~(1 << (index & 7)) & 0xFF
+
+    def __contains__(self, index: object) -> bool:
+        if not isinstance(index, int):
+            return False
+        byte = index >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] >> (index & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for byte, value in enumerate(self.bits):
+            while value:
+                low = value & -value
+                yield (byte << 3) + low.bit_length() - 1
+                value ^= low
+
+
+@dataclass(slots=True, kw_only=True)
+class GameState:
+    """Everything process_input mutates while a test runs.
+
+    A plain slots dataclass rather than a pydantic model, since it's updated several
+    times per keystroke. Input and errors live in flat buffers, so a keystroke adds
+    a few bytes instead of new Python objects. Use snapshot() to serialize it.
+    """
+
+    prompt_text: str
+    prompt_words: List[str] = field(default_factory=list)
+    user_input_chars: array = field(default_factory=lambda: array(INPUT_TYPECODE)) # Typed chars
+    error_indices: ErrorBitmap = field(default_factory=ErrorBitmap) # Indices of errors in user_input_chars
 
     current_word_index: int = 0
     current_char_index_overall: int = 0 # Index in the overall prompt string
@@ -44,18 +118,60 @@ class GameState(BaseModel):
     end_time: float | None = None
     state: TestState = TestState.NOT_STARTED
 
-    correct_chars_count: int = 0
-    incorrect_chars_count: int = 0
+    # Running counters, kept up to date by engine.process_input
+    correct_chars_count: int = 0 # Typed chars matching the prompt
+    incorrect_chars_count: int = 0 # Typed chars not matching the prompt
+    extra_chars_count: int = 0 # Typed chars past the end of the prompt
     total_typed_entries: int = 0 # All valid character keystrokes (non-backspace)
+    target_chars: int = 0 # Length of the part of the prompt the test covers
 
     # Configuration
     mode: GameMode
     config_value: int # Duration or word count
     language: Optional[Language] = None # Store language, make optional for safety
 
-    def model_post_init(self, __context: Any) -> None:
+    keylog: KeystrokeLog = field(default_factory=KeystrokeLog)
+    seconds: SecondBuckets = field(init=False) # Sized from the mode and config in __post_init__
+    key_stats: KeyStats = field(default_factory=KeyStats) # Merged into the history when saved
+    # Supplies more words on demand (time mode); None for a fixed prompt
+    prompt_source: Optional[Callable[[int], List[str]]] = None
+    clock: Callable[[], float] = time.monotonic # Replaced when replaying
+
+    def __post_init__(self) -> None:
+        if self.language is not None:
+            self.language = Language(self.language)
         if self.prompt_text:
             self.prompt_words = self.prompt_text.split(' ')
+        if self.mode in (GameMode.WORDS, GameMode.PRACTICE):
+            words_to_consider = self.prompt_words[:self.config_value]
+            self.target_chars = len(" ".join(words_to_consider))
+        else:
+            self.target_chars = len(self.prompt_text)
+        self.error_indices.reserve(len(self.prompt_text))
+        self.seconds = SecondBuckets.for_test(self.mode == GameMode.TIME, self.config_value)
+
+    @property
+    def user_input_text(self) -> str:
+        """The typed input as a string. Builds a new string, keep it off the keystroke path."""
+        return self.user_input_chars.tounicode()
+
+    def snapshot(self) -> GameSnapshot:
+        return GameSnapshot(
+            prompt_text=self.prompt_text,
+            user_input=self.user_input_text,
+            error_indices=list(self.error_indices),
+            correct_chars_count=self.correct_chars_count,
+            incorrect_chars_count=self.incorrect_chars_count,
+            extra_chars_count=self.extra_chars_count,
+            total_typed_entries=self.total_typed_entries,
+            target_chars=self.target_chars,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            state=self.state,
+            mode=self.mode,
+            config_value=self.config_value,
+            language=self.language,
+        )
 
     def current_prompt_word(self) -> str | None:
         if 0 <= self.current_word_index < len(self.prompt_words):
@@ -66,7 +182,7 @@ class GameState(BaseModel):
         """Calculates elapsed time since the test started."""
         if self.start_time is None:
             return 0.0
-        current_time = self.end_time or time.monotonic()
+        current_time = self.end_time or self.clock()
         return current_time - self.start_time
 
     def is_finished(self) -> bool:
@@ -75,7 +191,7 @@ class GameState(BaseModel):
             return True
         if self.mode == GameMode.TIME:
             return self.time_elapsed() >= self.config_value
-        elif self.mode == GameMode.WORDS:
+        elif self.mode in (GameMode.WORDS, GameMode.PRACTICE):
             # Finish when the start of the configured word count is reached
             return self.current_word_index >= self.config_value
         return False 
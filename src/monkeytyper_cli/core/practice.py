@@ -0,0 +1,211 @@
+# Weak-spot practice prompts, drawn through an inverted index from keys/bigrams to words
+
+from array import array
+import bisect
+import mmap
+import os
+import pathlib
+import random
+import struct
+import sys
+import tempfile
+from typing import Dict, List, Literal, NamedTuple, Optional, Sequence, Tuple
+
+from .keystats import KEYS, SLOTS, KeyStats, key_id
+from .models import PromptOptions
+from .sampling import AliasTable, WordSampler
+
+MAGIC = b"MTBI"
+FORMAT_VERSION = 1
+INDEX_SUFFIX = ".mtbi"
+MAX_POSTINGS = 1000 # Words kept per key/bigram; lists are frequency ordered, so the most common ones
+MAX_COUNT = 255
+
+PRACTICE_TARGETS = 12 # Weak keys/bigrams a prompt concentrates on
+PRACTICE_SHARE = 0.7 # Fraction of words drawn for a weak spot; the rest is ordinary text
+MIN_TARGET_HITS = 20 # Keys/bigrams typed less often than this don't count as weak yet
+FILTER_TRIES = 4 # Draws per weak-spot word before giving up on the length filter
+
+# magic, version, word count, postings count. Followed by uint32 starts[SLOTS + 1],
+# uint32 word_ids[postings] and uint8 counts[postings].
+_HEADER = struct.Struct("<4sB3xII")
+_Typecode = Literal["I", "B"]
+
+
+def word_slots(word: str) -> Dict[int, int]:
+    """Key and bigram slots in `word` with how often each occurs.
+
+    The word is padded with spaces, so ' t' means "starts with t" and 'e ' "ends with e",
+    matching how those bigrams are recorded while typing.
+    """
+    slots: Dict[int, int] = {}
+    previous = 0 # key_id(" ")
+    for char in word:
+        slot = key_id(char)
+        if slot < 0:
+            previous = -1
+            continue
+        slots[slot] = slots.get(slot, 0) + 1
+        if previous >= 0:
+            bigram = KEYS + previous * KEYS + slot
+            slots[bigram] = slots.get(bigram, 0) + 1
+        previous = slot
+    if previous >= 0:
+        bigram = KEYS + previous * KEYS
+        slots[bigram] = slots.get(bigram, 0) + 1
+    return slots
+
+
+class BigramIndex:
+    """Compressed sparse rows: the words containing slot s are word_ids[starts[s]:starts[s + 1]].
+
+    Postings are in word id (frequency) order, each with how often the slot occurs
+    in the word. Built once per word list and memory-mapped from disk after that.
+    """
+
+    def __init__(self, word_count: int, starts: Sequence[int], word_ids: Sequence[int], counts: Sequence[int]):
+        self.word_count = word_count
+        self.starts = starts
+        self.word_ids = word_ids
+        self.counts = counts
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, words: Sequence[str]) -> "BigramIndex":
+        postings: List[List[int]] = [[] for _ in range(SLOTS)]
+        counts: List[List[int]] = [[] for _ in range(SLOTS)]
+        for word_id, word in enumerate(words):
+            for slot, count in word_slots(word).items():
+                if len(postings[slot]) < MAX_POSTINGS:
+                    postings[slot].append(word_id)
+                    counts[slot].append(min(count, MAX_COUNT))
+        starts = array("I", [0])
+        word_ids = array("I")
+        all_counts = array("B")
+        for slot in range(SLOTS):
+            word_ids.extend(postings[slot])
+            all_counts.extend(counts[slot])
+            starts.append(len(word_ids))
+        return cls(len(words), starts, word_ids, all_counts)
+
+    def postings(self, slot: int) -> Tuple[Sequence[int], Sequence[int]]:
+        start, end = self.starts[slot], self.starts[slot + 1]
+        return self.word_ids[start:end], self.counts[start:end]
+
+    def save(self, path: pathlib.Path) -> None:
+        """Writes the index atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+                                         delete=False) as f:
+            tmp_path = f.name
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self.word_count, len(self.word_ids)))
+            sections: Tuple[Tuple[_Typecode, Sequence[int]], ...] = (
+                ("I", self.starts), ("I", self.word_ids), ("B", self.counts)
+            )
+            for typecode, values in sections:
+                section = array(typecode, values)
+                if sys.byteorder == "big":
+                    section.byteswap()
+                f.write(section.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "BigramIndex":
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _HEADER.size:
+            raise ValueError(f"Bigram index '{path}' is truncated.")
+        magic, version, word_count, postings = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a current bigram index.")
+        sections: List[Sequence[int]] = []
+        offset = _HEADER.size
+        layout: Tuple[Tuple[_Typecode, int], ...] = (("I", SLOTS + 1), ("I", postings), ("B", postings))
+        for typecode, count in layout:
+            end = offset + array(typecode).itemsize * count
+            if len(data) < end:
+                raise ValueError(f"Bigram index '{path}' is truncated.")
+            if sys.byteorder == "little":
+                sections.append(memoryview(data)[offset:end].cast(typecode))
+            else:
+                values = array(typecode, data[offset:end])
+                values.byteswap()
+                sections.append(values)
+            offset = end
+        index = cls(word_count, *sections)
+        index._mmap = data
+        return index
+
+
+def open_for_pack(pack_path: pathlib.Path, words: Sequence[str], cache_dir: pathlib.Path) -> BigramIndex:
+    """Opens the cached index for a word pack, building it on first use or when the pack changed."""
+    cached = cache_dir / f"{pack_path.stem}{INDEX_SUFFIX}"
+    try:
+        if cached.stat().st_mtime >= pack_path.stat().st_mtime:
+            index = BigramIndex.load(cached)
+            if index.word_count == len(words):
+                return index
+    except (OSError, ValueError):
+        pass # Missing or damaged: rebuild below
+    index = BigramIndex.build(words)
+    try:
+        index.save(cached)
+    except OSError as e:
+        print(f"Warning: Could not cache the bigram index: {e}", file=sys.stderr)
+    return index
+
+
+class PracticePlan(NamedTuple):
+    slots: List[int] # Weak keys/bigrams that have words to practise them
+    table: AliasTable # Draws a slot with probability proportional to its weakness
+
+
+def plan(key_stats: KeyStats, index: BigramIndex, targets: int = PRACTICE_TARGETS,
+         min_hits: int = MIN_TARGET_HITS) -> Optional[PracticePlan]:
+    """Picks the weakest keys and bigrams to practise; None until there's enough data."""
+    space = key_id(" ") # Every word practises it, so it's no use as a target
+    candidates = key_stats.weakest(limit=targets + 1, min_hits=min_hits)
+    candidates += key_stats.weakest(bigrams=True, limit=targets, min_hits=min_hits)
+    candidates.sort(key=lambda weakness: weakness.score, reverse=True)
+    chosen = [
+        weakness for weakness in candidates
+        if weakness.slot != space and index.starts[weakness.slot] != index.starts[weakness.slot + 1]
+    ][:targets]
+    if not chosen:
+        return None
+    return PracticePlan([weakness.slot for weakness in chosen], AliasTable([weakness.score for weakness in chosen]))
+
+
+def _practice_word(index: BigramIndex, slot: int, words: Sequence[str], options: PromptOptions,
+                   rng: random.Random) -> Optional[str]:
+    word_ids, counts = index.postings(slot)
+    if options.top_n is not None:
+        # Postings are in word id order, so the top-N cut is a bisect
+        limit = bisect.bisect_left(word_ids, options.top_n)
+        word_ids, counts = word_ids[:limit], counts[:limit]
+    if not word_ids:
+        return None
+    for _ in range(FILTER_TRIES):
+        # Best of two: favours words that contain the weak spot more than once
+        first, second = int(rng.random() * len(word_ids)), int(rng.random() * len(word_ids))
+        word = words[word_ids[first if counts[first] >= counts[second] else second]]
+        if options.max_word_length is None or len(word) <= options.max_word_length:
+            return word
+    return None
+
+
+def draw_practice_words(words: Sequence[str], sampler: WordSampler, index: BigramIndex,
+                        practice: PracticePlan, count: int, options: Optional[PromptOptions] = None,
+                        rng: Optional[random.Random] = None) -> List[str]:
+    """Draws `count` words, most of them chosen to contain one of the plan's weak spots."""
+    options = options or PromptOptions()
+    rng = rng or random.Random()
+    selected: List[str] = []
+    for _ in range(count):
+        word = None
+        if rng.random() < PRACTICE_SHARE:
+            word = _practice_word(index, practice.slots[practice.table.draw(rng)], words, options, rng)
+        if word is None or (selected and selected[-1] == word):
+            word = sampler.draw(1, max_length=options.max_word_length, top_n=options.top_n, rng=rng)[0]
+        selected.append(word)
+    return selected
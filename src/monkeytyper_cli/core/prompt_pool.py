@@ -0,0 +1,75 @@
+# Background pregeneration of prompts for upcoming tests
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+from typing import Deque, Hashable, Optional, Tuple
+
+from . import engine
+from .models import GameMode, GameState, PromptOptions
+
+DEFAULT_POOL_SIZE = 2
+
+
+def _pool_key(mode: GameMode, config_value: int, language: str,
+              options: Optional[PromptOptions], seed: Optional[int]) -> Hashable:
+    return (mode, config_value, language, options or PromptOptions(), seed)
+
+
+class PromptPool:
+    """Generates the next test's game state on a background thread.
+
+    `prefetch` queues generation for some settings (e.g. while results are on screen);
+    `take` hands out a ready game state for matching settings, or generates one
+    synchronously when nothing matching was prefetched. A seeded game state is the same
+    either way. Disabled until `enabled` is set.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.enabled = False
+        self._ready: Deque[Tuple[Hashable, Future]] = deque(maxlen=size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prompt-pool")
+        return self._executor
+
+    def prefetch(self, mode: GameMode, config_value: int, language: str,
+                 options: Optional[PromptOptions] = None, seed: Optional[int] = None) -> None:
+        """Starts generating a game state for these settings in the background."""
+        if not self.enabled:
+            return
+        key = _pool_key(mode, config_value, language, options, seed)
+        with self._lock:
+            if any(ready_key == key for ready_key, _ in self._ready):
+                return
+            future = self._get_executor().submit(engine.start_game, mode, config_value, language, options, seed)
+            self._ready.append((key, future))
+
+    def take(self, mode: GameMode, config_value: int, language: str,
+             options: Optional[PromptOptions] = None, seed: Optional[int] = None) -> GameState:
+        """Returns a prefetched game state for these settings, or a freshly generated one."""
+        key = _pool_key(mode, config_value, language, options, seed)
+        future = None
+        with self._lock:
+            for entry in self._ready:
+                if entry[0] == key:
+                    self._ready.remove(entry)
+                    future = entry[1]
+                    break
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass # Fall back to generating it here, where errors reach the caller
+        return engine.start_game(mode, config_value, language, options, seed)
+
+    def shutdown(self) -> None:
+        """Stops the background thread and drops anything not yet taken."""
+        with self._lock:
+            self._ready.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
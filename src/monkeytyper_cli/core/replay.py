@@ -0,0 +1,68 @@
+# Headless replay of recorded keystroke logs through the typing engine
+
+import pathlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+from . import engine, keylog
+from .keylog import BACKSPACE_CODE, RecordedSession
+from .models import GameMode, GameState, Language, TestResult
+
+
+def record_session(game_state: GameState) -> RecordedSession:
+    """Captures a finished game's configuration and keystrokes for saving."""
+    start = game_state.start_time or 0.0
+    end = game_state.end_time or start
+    language = game_state.language.value if game_state.language else Language.EN.value
+    return RecordedSession(
+        prompt_text=game_state.prompt_text,
+        mode=game_state.mode.value,
+        config_value=game_state.config_value,
+        language=language,
+        duration=max(0.0, end - start),
+        log=game_state.keylog,
+    )
+
+
+def _language(value: str) -> Optional[Language]:
+    """The recorded language, or None if it isn't one this version knows."""
+    try:
+        return Language(value)
+    except ValueError:
+        return None
+
+
+def replay(session: RecordedSession) -> TestResult:
+    """Feeds a recorded session through the engine and returns the recomputed result.
+
+    The game runs on a virtual clock driven by the log timestamps, so this takes
+    no wall-clock time beyond the processing itself.
+    """
+    now = [0.0]
+    game_state = GameState(
+        prompt_text=session.prompt_text,
+        mode=GameMode(session.mode),
+        config_value=session.config_value,
+        language=_language(session.language),
+        clock=lambda: now[0],
+    )
+
+    process_input = engine.process_input
+    backspace = engine.BACKSPACE_CHAR
+    for code, timestamp in session.log:
+        now[0] = timestamp
+        process_input(game_state, backspace if code == BACKSPACE_CODE else chr(code), timestamp)
+
+    now[0] = max(now[0], session.duration)
+    engine.finish_game(game_state)
+    return engine.calculate_results(game_state)
+
+
+def replay_file(path: pathlib.Path) -> TestResult:
+    """Loads a keystroke log file and replays it."""
+    return replay(keylog.load(path))
+
+
+def replay_many(paths: Iterable[pathlib.Path]) -> Iterator[Tuple[pathlib.Path, TestResult]]:
+    """Replays a batch of keystroke log files, yielding each path with its result."""
+    for path in paths:
+        yield path, replay_file(path)
@@ -0,0 +1,147 @@
+# Weighted word sampling with precomputed alias tables
+
+import bisect
+from array import array
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAX_BUCKET_LENGTH = 255 # Words longer than this share the last length bucket
+
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("Cannot build an alias table without weights.")
+        total = float(sum(weights))
+        if total <= 0:
+            weights = [1.0] * n
+            total = float(n)
+
+        scaled = [w * n / total for w in weights]
+        prob = array("d", [0.0]) * n
+        alias = array("I", [0]) * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        for i in large + small: # Leftovers are 1.0 up to rounding error
+            prob[i] = 1.0
+        self.prob: Sequence[float] = prob
+        self.alias: Sequence[int] = alias
+
+    @classmethod
+    def from_arrays(cls, prob: Sequence[float], alias: Sequence[int]) -> "AliasTable":
+        """Wraps a table that was built earlier (e.g. stored in a word pack)."""
+        table = cls.__new__(cls)
+        table.prob = prob
+        table.alias = alias
+        return table
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: Optional[random.Random] = None) -> int:
+        """Returns an index with probability proportional to its weight."""
+        uniform = (rng or random).random
+        i = int(uniform() * len(self.prob))
+        return i if uniform() < self.prob[i] else self.alias[i]
+
+
+class WordSampler:
+    """Weighted draws from a word list, with cached tables per difficulty filter.
+
+    Weights are word frequencies when the list has counts and uniform otherwise. Words are
+    expected most common first (word packs are built that way), so "top N" is ids below N.
+
+    `length_order` lists word ids sorted by (length, id) and `length_starts[n]` is where
+    words of length n begin in it. A filter is served by slicing those buckets, so each
+    (max length, top N) combination is resolved and turned into an alias table only once.
+    """
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        weights: Optional[Sequence[float]] = None,
+        length_order: Optional[Sequence[int]] = None,
+        length_starts: Optional[Sequence[int]] = None,
+        full_table: Optional[AliasTable] = None,
+    ):
+        self.words = words
+        if weights is None:
+            # No frequency counts: every word is equally likely, like a plain random.choice
+            weights = array("f", [1.0]) * len(words)
+        if length_order is None or length_starts is None:
+            length_order, length_starts = bucket_by_length(words)
+        self.weights = weights
+        self.length_order = length_order
+        self.length_starts = length_starts
+        self._tables: Dict[Tuple[Optional[int], Optional[int]], Tuple[Sequence[int], AliasTable]] = {}
+        if full_table is not None:
+            self._tables[(None, None)] = (range(len(words)), full_table)
+
+    def _candidates(self, max_length: Optional[int], top_n: Optional[int]) -> Sequence[int]:
+        if max_length is None and top_n is None:
+            return range(len(self.words))
+        max_length = MAX_BUCKET_LENGTH if max_length is None else min(max_length, MAX_BUCKET_LENGTH)
+        limit = len(self.words) if top_n is None else top_n
+        ids = array("I")
+        for length in range(1, max_length + 1):
+            start, end = self.length_starts[length], self.length_starts[length + 1]
+            if start == end:
+                continue
+            # Ids inside a bucket are ascending, so the top-N cut is a bisect
+            cut = bisect.bisect_left(self.length_order, limit, start, end)
+            ids.extend(self.length_order[start:cut])
+        return ids
+
+    def table(self, max_length: Optional[int] = None, top_n: Optional[int] = None) -> Tuple[Sequence[int], AliasTable]:
+        """Returns the candidate word ids and alias table for a filter, building them once."""
+        key = (max_length, top_n)
+        if key not in self._tables:
+            ids = self._candidates(max_length, top_n)
+            if not ids: # Filter too strict: ignore it rather than produce an empty test
+                ids = range(len(self.words))
+            self._tables[key] = (ids, AliasTable([self.weights[i] for i in ids]))
+        return self._tables[key]
+
+    def draw(self, count: int, max_length: Optional[int] = None, top_n: Optional[int] = None,
+             rng: Optional[random.Random] = None) -> List[str]:
+        """Draws `count` words, avoiding the same word twice in a row where possible."""
+        ids, table = self.table(max_length, top_n)
+        words = self.words
+        selected: List[str] = []
+        previous = -1
+        for _ in range(count):
+            word_id = ids[table.draw(rng)]
+            if word_id == previous and len(ids) > 1:
+                word_id = ids[table.draw(rng)]
+            selected.append(words[word_id])
+            previous = word_id
+        return selected
+
+
+def bucket_by_length(words: Sequence[str]) -> Tuple[array, array]:
+    """Sorts word ids into per-length buckets; see WordSampler."""
+    buckets: List[List[int]] = [[] for _ in range(MAX_BUCKET_LENGTH + 1)]
+    for word_id, word in enumerate(words):
+        buckets[min(len(word), MAX_BUCKET_LENGTH)].append(word_id)
+    length_order = array("I")
+    length_starts = array("I", [0])
+    for bucket in buckets:
+        length_order.extend(bucket)
+        length_starts.append(len(length_order))
+    return length_order, length_starts
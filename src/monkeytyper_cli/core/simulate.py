@@ -0,0 +1,254 @@
+# Headless synthetic typists for load testing the engine and checking its scoring
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import math
+import os
+import random
+import string
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from . import engine, replay
+from .keylog import BACKSPACE_CODE
+from .models import GameMode, GameState, PromptOptions, TestResult, TestState
+
+MIN_WPM = 5.0
+KEY_JITTER = 0.35 # Sigma of the log-normal spread of key intervals around the typist's pace
+MAX_NOTICE_DELAY = 2 # Chars a typist may type past a mistake before backspacing to it
+MAX_BATCH = 200 # Games per task sent to a worker process
+BATCHES_PER_WORKER = 4 # Smaller tasks than this keep the workers evenly loaded
+MAX_FAILURES = 20 # Failed checks kept for the report; the rest are only counted
+TOLERANCE = 1e-9
+METRICS = ("wpm", "raw_wpm", "accuracy", "consistency", "time_elapsed_seconds")
+
+
+class Typist(NamedTuple):
+    wpm: float = 80.0 # Mean pace of the typists
+    wpm_spread: float = 15.0 # Standard deviation of the pace between typists
+    error_rate: float = 0.03 # Chance of mistyping each char
+    correction_rate: float = 0.8 # Share of mistakes that get backspaced and fixed
+    burst: float = 0.0 # Mean chars typed between pauses; 0 types without pausing
+    pause: float = 0.4 # Mean seconds of a pause between bursts
+
+
+class Scenario(NamedTuple):
+    mode: GameMode
+    config_value: int
+    language: str
+    options: PromptOptions
+    typist: Typist
+    check: bool = False # Recount every game from its input and replay its keystroke log
+
+
+class BatchResult(NamedTuple):
+    games: int
+    keystrokes: int
+    metrics: Dict[str, array] # TestResult field -> one value per game
+    failures: List[str]
+    failure_count: int
+
+
+class Distribution(NamedTuple):
+    samples: int # Games with a value for the metric
+    mean: float
+    stdev: float
+    p5: float
+    p50: float
+    p95: float
+    min: float
+    max: float
+
+
+class Simulation(NamedTuple):
+    scenario: Scenario
+    seed: int
+    games: int
+    keystrokes: int
+    workers: int
+    seconds: float # Wall clock, pool start-up included
+    distributions: Dict[str, Distribution]
+    failures: List[str]
+    failure_count: int
+
+
+def _typo(expected: str, rng: random.Random) -> str:
+    char = string.ascii_lowercase[rng.randrange(25)]
+    return "z" if char == expected else char
+
+
+def type_prompt(game_state: GameState, typist: Typist, rng: random.Random) -> int:
+    """Types the game's prompt on a virtual clock until the test is over; returns the keystrokes sent.
+
+    Word count tests end on the last char of the prompt, time tests at their deadline.
+    """
+    now = [0.0]
+    game_state.clock = lambda: now[0]
+    process_input = engine.process_input
+    typed = game_state.user_input_chars
+    interval = 12 / max(MIN_WPM, rng.gauss(typist.wpm, typist.wpm_spread)) # Seconds per char at this pace
+    jitter = -KEY_JITTER * KEY_JITTER / 2 # Log-normal mu that keeps the mean interval at `interval`
+    burst_left = max(1, round(rng.expovariate(1 / typist.burst))) if typist.burst else -1
+    error_at = -1 # Index of a mistake the typist is going to correct
+    notice_in = 0
+    timestamp = 0.0
+    keys = 0
+    while True:
+        if error_at >= 0 and notice_in <= 0:
+            char = engine.BACKSPACE_CHAR
+            if len(typed) - 1 <= error_at:
+                error_at = -1
+        else:
+            index = len(typed)
+            prompt = game_state.prompt_text # Time tests extend it as the cursor advances
+            char = prompt[index] if index < len(prompt) else " "
+            if error_at >= 0:
+                notice_in -= 1
+            elif rng.random() < typist.error_rate:
+                char = _typo(char, rng)
+                if rng.random() < typist.correction_rate:
+                    error_at, notice_in = index, rng.randint(0, MAX_NOTICE_DELAY)
+
+        now[0] = timestamp
+        if game_state.is_finished():
+            break
+        process_input(game_state, char, timestamp)
+        keys += 1
+        if game_state.state == TestState.FINISHED:
+            break
+        if game_state.mode != GameMode.TIME and len(typed) >= game_state.target_chars:
+            break
+
+        timestamp += interval * rng.lognormvariate(jitter, KEY_JITTER)
+        if burst_left > 0:
+            burst_left -= 1
+            if burst_left == 0:
+                timestamp += rng.expovariate(1 / typist.pause) if typist.pause > 0 else 0.0
+                burst_left = max(1, round(rng.expovariate(1 / typist.burst)))
+
+    engine.finish_game(game_state)
+    return keys
+
+
+def check_game(game_state: GameState, result: TestResult) -> List[str]:
+    """Problems found by recounting a finished game from scratch and replaying its keystrokes."""
+    problems = []
+    prompt, text = game_state.prompt_text, game_state.user_input_text
+    overlap = min(len(prompt), len(text))
+    mismatched = [i for i in range(overlap) if text[i] != prompt[i]]
+    expected = {
+        "correct_chars_count": overlap - len(mismatched),
+        "incorrect_chars_count": len(mismatched),
+        "extra_chars_count": max(0, len(text) - len(prompt)),
+        "total_typed_entries": sum(1 for code, _ in game_state.keylog if code != BACKSPACE_CODE),
+    }
+    for name, value in expected.items():
+        if getattr(game_state, name) != value:
+            problems.append(f"{name} is {getattr(game_state, name)}, recounted {value}")
+    if list(game_state.error_indices) != mismatched + list(range(len(prompt), len(text))):
+        problems.append("error_indices don't match the mismatched chars")
+
+    if not 0 <= result.accuracy <= 100:
+        problems.append(f"accuracy {result.accuracy} is out of range")
+    if result.wpm > result.raw_wpm + TOLERANCE:
+        problems.append(f"wpm {result.wpm} is above raw wpm {result.raw_wpm}")
+    if result.consistency is not None and not 0 <= result.consistency <= 100:
+        problems.append(f"consistency {result.consistency} is out of range")
+    if game_state.mode == GameMode.TIME and result.time_elapsed_seconds > game_state.config_value + TOLERANCE:
+        problems.append(f"time test ran {result.time_elapsed_seconds}s")
+
+    replayed = replay.replay(replay.record_session(game_state))
+    for name in METRICS:
+        value, again = getattr(result, name), getattr(replayed, name)
+        if (value is None) != (again is None) or (value is not None and abs(value - again) > TOLERANCE):
+            problems.append(f"replayed {name} is {again}, not {value}")
+    return problems
+
+
+def run_games(scenario: Scenario, first_seed: int, count: int) -> BatchResult:
+    """Plays `count` games with seeds from `first_seed` on. Runs in a worker process."""
+    metrics = {name: array("d") for name in METRICS}
+    failures: List[str] = []
+    failure_count = 0
+    keystrokes = 0
+    for seed in range(first_seed, first_seed + count):
+        game_state = engine.start_game(scenario.mode, scenario.config_value, scenario.language,
+                                       scenario.options, seed=seed)
+        keystrokes += type_prompt(game_state, scenario.typist, random.Random(f"typist:{seed}"))
+        result = engine.calculate_results(game_state)
+        for name in METRICS:
+            value = getattr(result, name)
+            metrics[name].append(math.nan if value is None else value)
+        if scenario.check:
+            problems = check_game(game_state, result)
+            if problems:
+                failure_count += 1
+                if len(failures) < MAX_FAILURES:
+                    failures.append(f"seed {seed}: {'; '.join(problems)}")
+    return BatchResult(count, keystrokes, metrics, failures, failure_count)
+
+
+def distribution(values: array) -> Optional[Distribution]:
+    ordered = sorted(value for value in values if not math.isnan(value))
+    if not ordered:
+        return None
+    count = len(ordered)
+    mean = sum(ordered) / count
+    stdev = math.sqrt(sum((value - mean) ** 2 for value in ordered) / (count - 1)) if count > 1 else 0.0
+
+    def percentile(p: float) -> float:
+        return ordered[min(count - 1, int(p / 100 * count))]
+
+    return Distribution(count, mean, stdev, percentile(5), percentile(50), percentile(95), ordered[0], ordered[-1])
+
+
+def _load_word_list(language: str) -> None:
+    engine.load_word_list(language)
+
+
+def simulate(scenario: Scenario, games: int, seed: int, workers: Optional[int] = None,
+             progress: Optional[Callable[[int], None]] = None) -> Simulation:
+    """Plays `games` games spread over a process pool and aggregates their results.
+
+    Game i uses seed `seed + i` for both its prompt and its typist, so any game can
+    be played again on its own. `progress` is called with the games finished so far.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    engine.load_word_list(scenario.language) # Compile the word pack once, before the workers open it
+    batch = max(1, min(MAX_BATCH, games // (workers * BATCHES_PER_WORKER)))
+    metrics = {name: array("d") for name in METRICS}
+    failures: List[str] = []
+    failure_count = 0
+    keystrokes = 0
+    done = 0
+    started = time.perf_counter()
+
+    def collect(result: BatchResult) -> None:
+        nonlocal failure_count, keystrokes, done
+        for name in METRICS:
+            metrics[name].extend(result.metrics[name])
+        failures.extend(result.failures[:MAX_FAILURES - len(failures)])
+        failure_count += result.failure_count
+        keystrokes += result.keystrokes
+        done += result.games
+        if progress is not None:
+            progress(done)
+
+    if workers == 1:
+        for first in range(0, games, batch): # In-process: easier to profile and debug
+            collect(run_games(scenario, seed + first, min(batch, games - first)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_word_list,
+                                 initargs=(scenario.language,)) as executor:
+            futures = [executor.submit(run_games, scenario, seed + first, min(batch, games - first))
+                       for first in range(0, games, batch)]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    distributions = {}
+    for name in METRICS:
+        summary = distribution(metrics[name])
+        if summary is not None:
+            distributions[name] = summary
+    return Simulation(scenario, seed, games, keystrokes, workers, time.perf_counter() - started,
+                      distributions, failures, failure_count)
@@ -0,0 +1,194 @@
+# Local leaderboard snapshots for ranking results without a network call
+#
+# A snapshot is two parallel columns, ranks (uint32) and WPMs (float32), ordered by WPM
+# ascending so a result's WPM can be placed with a bisect. The top of a board is stored
+# densely and deeper pages are sampled, so ranks below the dense part are interpolated.
+
+from array import array
+import bisect
+import os
+import pathlib
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MAGIC = b"MTLB"
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".mtlb"
+MAX_HISTORY = 12 # Snapshots kept per board, oldest are pruned
+
+# magic, version, row count, board total, page size, refresh cursor, taken_at.
+# Followed by uint32 ranks[count] and float32 wpms[count].
+_HEADER = struct.Struct("<4sB3xIIIId")
+
+
+class Standing(NamedTuple):
+    rank: int
+    total: int
+    exact: bool # False when the rank was interpolated between sampled pages
+    taken_at: float
+
+    @property
+    def top_percent(self) -> float:
+        return 100.0 * self.rank / max(1, self.total)
+
+
+class LeaderboardSnapshot:
+    __slots__ = ("ranks", "wpms", "total", "page_size", "cursor", "taken_at")
+
+    def __init__(self, ranks: array, wpms: array, total: int, page_size: int, cursor: int, taken_at: float):
+        self.ranks = ranks
+        self.wpms = wpms
+        self.total = total
+        self.page_size = page_size
+        self.cursor = cursor # Position in the refresh plan where the next refresh continues
+        self.taken_at = taken_at
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, float]], total: int, page_size: int,
+                  cursor: int = 0, taken_at: Optional[float] = None) -> "LeaderboardSnapshot":
+        """Builds a snapshot from (rank, wpm) rows fetched at possibly different times."""
+        by_rank = sorted(rows)
+        ranks = array("I")
+        wpms = array("f")
+        floor = float("inf")
+        for rank, wpm in by_rank:
+            # Rows from different refreshes can disagree slightly; keep WPM non-increasing
+            # with rank so the column stays sorted
+            floor = min(floor, wpm)
+            ranks.append(rank)
+            wpms.append(floor)
+        ranks.reverse()
+        wpms.reverse()
+        total = max(total, ranks[0] if ranks else 0)
+        return cls(ranks, wpms, total, page_size, cursor, time.time() if taken_at is None else taken_at)
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def rows(self) -> Dict[int, float]:
+        return dict(zip(self.ranks, self.wpms))
+
+    def standing(self, wpm: float) -> Optional[Standing]:
+        """Global rank a result with this WPM would have had when the snapshot was taken."""
+        n = len(self.wpms)
+        if n == 0:
+            return None
+        i = bisect.bisect_right(self.wpms, wpm) # Rows i.. are strictly faster
+        if i == n:
+            return Standing(1, self.total, self.ranks[-1] == 1, self.taken_at)
+
+        above_rank, above_wpm = self.ranks[i], self.wpms[i]
+        if i == 0: # Slower than every sampled row: interpolate towards 0 WPM at the bottom
+            below_rank, below_wpm = self.total + 1, 0.0
+        else:
+            below_rank, below_wpm = self.ranks[i - 1], self.wpms[i - 1]
+
+        if below_rank == above_rank + 1:
+            return Standing(above_rank + 1, self.total, True, self.taken_at)
+        span = above_wpm - below_wpm
+        fraction = (above_wpm - wpm) / span if span > 0 else 1.0
+        rank = above_rank + 1 + int(fraction * (below_rank - above_rank - 1))
+        return Standing(min(rank, self.total + 1), self.total, False, self.taken_at)
+
+    def dumps(self) -> bytes:
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(self.ranks), self.total,
+                              self.page_size, self.cursor, self.taken_at)
+        ranks, wpms = self.ranks, self.wpms
+        if sys.byteorder == "big":
+            ranks, wpms = array("I", ranks), array("f", wpms)
+            ranks.byteswap()
+            wpms.byteswap()
+        return header + ranks.tobytes() + wpms.tobytes()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "LeaderboardSnapshot":
+        if len(data) < _HEADER.size:
+            raise ValueError("Leaderboard snapshot is truncated.")
+        magic, version, count, total, page_size, cursor, taken_at = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a leaderboard snapshot or unsupported version.")
+        offset = _HEADER.size
+        if len(data) < offset + 8 * count:
+            raise ValueError("Leaderboard snapshot is truncated.")
+        ranks = array("I", data[offset:offset + 4 * count])
+        wpms = array("f", data[offset + 4 * count:offset + 8 * count])
+        if sys.byteorder == "big":
+            ranks.byteswap()
+            wpms.byteswap()
+        return cls(ranks, wpms, total, page_size, cursor, taken_at)
+
+
+def refresh_plan(page_count: int, dense_pages: int = 10, growth: float = 1.5) -> List[int]:
+    """Pages a full snapshot covers: the first `dense_pages`, then geometrically spaced ones."""
+    plan = list(range(min(dense_pages, page_count)))
+    page = float(dense_pages)
+    while int(page) < page_count:
+        if int(page) != plan[-1]:
+            plan.append(int(page))
+        page *= growth
+    if page_count > 0 and plan[-1] != page_count - 1:
+        plan.append(page_count - 1) # The bottom anchors interpolation for slow results
+    return plan
+
+
+class SnapshotStore:
+    """Snapshot history per board under `directory/<mode>-<mode2>-<language>/`."""
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self._latest: Dict[pathlib.Path, Tuple[float, Optional[LeaderboardSnapshot]]] = {}
+
+    def board_dir(self, mode: str, mode2: Optional[str], language: str) -> pathlib.Path:
+        return self.directory / f"{mode}-{mode2 or 'all'}-{language}"
+
+    def _files(self, board: pathlib.Path) -> List[pathlib.Path]:
+        try:
+            return sorted(board.glob(f"*{SNAPSHOT_SUFFIX}"))
+        except OSError:
+            return []
+
+    def history(self, mode: str, mode2: Optional[str], language: str) -> List[LeaderboardSnapshot]:
+        """All stored snapshots of a board, oldest first."""
+        snapshots = []
+        for path in self._files(self.board_dir(mode, mode2, language)):
+            try:
+                snapshots.append(LeaderboardSnapshot.loads(path.read_bytes()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def latest(self, mode: str, mode2: Optional[str], language: str) -> Optional[LeaderboardSnapshot]:
+        board = self.board_dir(mode, mode2, language)
+        files = self._files(board)
+        if not files:
+            return None
+        newest = files[-1]
+        cached = self._latest.get(board)
+        if cached is not None and cached[0] == newest.stat().st_mtime:
+            return cached[1]
+        try:
+            snapshot = LeaderboardSnapshot.loads(newest.read_bytes())
+        except (OSError, ValueError):
+            snapshot = None
+        self._latest[board] = (newest.stat().st_mtime, snapshot)
+        return snapshot
+
+    def save(self, mode: str, mode2: Optional[str], language: str, snapshot: LeaderboardSnapshot) -> pathlib.Path:
+        board = self.board_dir(mode, mode2, language)
+        board.mkdir(parents=True, exist_ok=True)
+        path = board / f"{int(snapshot.taken_at * 1000):015d}{SNAPSHOT_SUFFIX}"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(snapshot.dumps())
+        os.replace(tmp_path, path)
+        for old in self._files(board)[:-MAX_HISTORY]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+        return path
+
+    def standing(self, mode: str, mode2: Optional[str], language: str, wpm: float) -> Optional[Standing]:
+        snapshot = self.latest(mode, mode2, language)
+        return snapshot.standing(wpm) if snapshot is not None else None
@@ -0,0 +1,107 @@
+# Per-second typing buckets and the consistency score built from them
+
+from array import array
+import math
+from typing import List, NamedTuple, Optional, Tuple
+
+MIN_LAST_SECOND = 0.5 # A trailing partial second shorter than this is too noisy to score
+WORDS_MODE_SECONDS_PER_WORD = 1.5 # Initial bucket estimate for word-count tests (~40 WPM)
+
+
+def kogasa(cov: float) -> float:
+    """Monkeytype's mapping of a coefficient of variation to a 0-100 consistency score."""
+    return 100 * (1 - math.tanh(cov + cov ** 3 / 3 + cov ** 5 / 5))
+
+
+class SecondSeries(NamedTuple):
+    raw_wpm: List[float] # All typed chars in each second, as WPM
+    wpm: List[float] # Correct chars so far at the end of each second, as WPM
+    errors: List[int] # Mistyped chars in each second
+    consistency: float # kogasa() of the raw WPM series
+
+
+class SecondBuckets:
+    """Typed chars, errors and the running correct count per second of a test.
+
+    The arrays are sized from the test duration up front (an estimate for word
+    count tests, doubled if it runs over), so recording a key is O(1) and the
+    series fall out of the buckets without replaying the input. The series is
+    kept until the next key, so asking for the same results again is free.
+    """
+
+    __slots__ = ("chars", "errors", "correct", "used", "_series")
+
+    def __init__(self, seconds: int) -> None:
+        seconds = max(1, seconds)
+        self.chars = array("I", bytes(4 * seconds))
+        self.errors = array("I", bytes(4 * seconds))
+        self.correct = array("I", bytes(4 * seconds)) # Correct chars so far after the bucket's last key
+        self.used = 0 # Buckets up to and including the latest key
+        self._series: Optional[Tuple[float, SecondSeries]] = None # (duration, series) last built
+
+    @classmethod
+    def for_test(cls, time_mode: bool, config_value: int) -> "SecondBuckets":
+        if time_mode:
+            return cls(config_value)
+        return cls(math.ceil(config_value * WORDS_MODE_SECONDS_PER_WORD))
+
+    def _grow(self, size: int) -> None:
+        extra = bytes(4 * (size - len(self.chars)))
+        for values in (self.chars, self.errors, self.correct):
+            values.frombytes(extra)
+
+    def _bucket(self, elapsed: float) -> int:
+        second = int(elapsed) if elapsed > 0 else 0
+        if second >= len(self.chars):
+            self._grow(max(second + 1, 2 * len(self.chars)))
+        if second >= self.used:
+            # Seconds without a key keep the correct count they started with
+            carried = self.correct[self.used - 1] if self.used else 0
+            for skipped in range(self.used, second):
+                self.correct[skipped] = carried
+            self.used = second + 1
+        return second
+
+    def record(self, elapsed: float, error: bool, correct_total: int) -> None:
+        """Counts one typed char `elapsed` seconds into the test."""
+        second = self._bucket(elapsed)
+        self._series = None
+        self.chars[second] += 1
+        if error:
+            self.errors[second] += 1
+        self.correct[second] = correct_total
+
+    def correct_changed(self, elapsed: float, correct_total: int) -> None:
+        """Notes a new correct count without a typed char (a backspace)."""
+        self._series = None
+        self.correct[self._bucket(elapsed)] = correct_total
+
+    def series(self, duration: float) -> SecondSeries:
+        """Per-second series over a test that lasted `duration` seconds."""
+        if self._series is not None and self._series[0] == duration:
+            return self._series[1]
+        seconds = math.ceil(duration) if duration > 0 else 0
+        last = duration - (seconds - 1) if seconds else 0.0 # Length of the final, possibly partial, second
+        if seconds > 1 and last < MIN_LAST_SECOND:
+            seconds -= 1 # Fold a sliver at the end into nothing rather than a spike
+            last = 1.0
+        raw, wpm, errors = [], [], []
+        correct = 0
+        for second in range(seconds):
+            length = last if second == seconds - 1 else 1.0
+            chars = error_count = 0
+            if second < self.used: # Later seconds had no keys at all
+                chars, error_count, correct = self.chars[second], self.errors[second], self.correct[second]
+            raw.append(chars * 12 / length) # chars / 5 per minute
+            wpm.append(correct * 12 / (second + length))
+            errors.append(error_count)
+
+        consistency = 0.0
+        if raw:
+            mean = sum(raw) / len(raw)
+            if mean > 0:
+                deviation = math.sqrt(sum((value - mean) ** 2 for value in raw) / len(raw))
+                consistency = kogasa(deviation / mean)
+        series = SecondSeries(raw, wpm, errors, consistency)
+        self._series = (duration, series)
+        return series
@@ -0,0 +1,192 @@
+# Compiled, memory-mapped word lists
+
+from array import array
+from collections.abc import Sequence
+import mmap
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+from typing import List, Literal, Optional, Tuple, Union, overload
+
+from .sampling import MAX_BUCKET_LENGTH, AliasTable, WordSampler, bucket_by_length
+
+MAGIC = b"MTWP"
+FORMAT_VERSION = 4 # 3: uniform weights for lists without frequency counts, 4: most frequent words first
+PACK_SUFFIX = ".mtwp"
+
+# magic, version, word count. Followed by uint32 offsets[count + 1], float32 weights[count],
+# float32 alias_prob[count], uint32 alias[count] (alias table over the whole list),
+# uint32 length_order[count], uint32 length_starts[MAX_BUCKET_LENGTH + 2] and the UTF-8 blob.
+_HEADER = struct.Struct("<4sB3xI")
+_LENGTH_STARTS_COUNT = MAX_BUCKET_LENGTH + 2
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def build(words: Sequence[str], path: pathlib.Path, weights: Optional[Sequence[float]] = None) -> pathlib.Path:
+    """Compiles words into a word pack at `path` (written atomically).
+
+    Words must be ordered most common first: a word's id is its frequency rank, which
+    the `top_n` filter and the practice index rely on. `weights` are relative word
+    frequencies; without them every word is equally likely.
+    """
+    offsets = array("I", [0])
+    blob = bytearray()
+    for word in words:
+        blob += word.encode("utf-8")
+        offsets.append(len(blob))
+    if weights is None:
+        weights = [1.0] * len(words)
+    table = AliasTable(weights) if words else None
+    length_order, length_starts = bucket_by_length(words)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per writer, so two threads or processes compiling the same pack can't interleave
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+                                     delete=False) as f:
+        tmp_path = f.name
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(words)))
+        f.write(_little_endian(offsets))
+        f.write(_little_endian(array("f", weights)))
+        if table is not None:
+            f.write(_little_endian(array("f", table.prob)))
+            f.write(_little_endian(array("I", table.alias)))
+        f.write(_little_endian(length_order))
+        f.write(_little_endian(length_starts))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_from_text(source: pathlib.Path, path: pathlib.Path) -> pathlib.Path:
+    """Compiles a word list text file into a word pack.
+
+    One word per line, optionally followed by a tab and its frequency count. Counted
+    words are sorted by count, most frequent first; without counts the file's own
+    order is taken as the frequency rank.
+    """
+    words: List[str] = []
+    counts: List[float] = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            word, _, count = line.strip().partition("\t")
+            if not word:
+                continue
+            words.append(word)
+            counts.append(float(count) if count else 0.0)
+    if not all(counts):
+        return build(words, path)
+    order = sorted(range(len(words)), key=counts.__getitem__, reverse=True)
+    return build([words[i] for i in order], path, [counts[i] for i in order])
+
+
+class WordPack(Sequence):
+    """Read-only sequence of words backed by a memory-mapped word pack.
+
+    Words are decoded on access, so loading costs the same for 100 or 500k words.
+    Frequency weights and length buckets are exposed as zero-copy views for WordSampler.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Word pack '{path}' is truncated.")
+
+        magic, version, count = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a word pack.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported word pack version {version} in '{path}'.")
+
+        self._count = count
+        offset = _HEADER.size
+        self._offsets, offset = self._section("I", offset, count + 1)
+        self.weights, offset = self._section("f", offset, count)
+        alias_prob, offset = self._section("f", offset, count)
+        alias, offset = self._section("I", offset, count)
+        self.alias_table = AliasTable.from_arrays(alias_prob, alias)
+        self.length_order, offset = self._section("I", offset, count)
+        self.length_starts, offset = self._section("I", offset, _LENGTH_STARTS_COUNT)
+        self._blob_start = offset
+        self._sampler: Optional[WordSampler] = None
+
+    def _section(self, typecode: Literal["I", "f"], offset: int, count: int) -> Tuple[Sequence, int]:
+        end = offset + 4 * count
+        if len(self._mmap) < end:
+            raise ValueError(f"Word pack '{self.path}' is truncated.")
+        if sys.byteorder == "little":
+            return memoryview(self._mmap)[offset:end].cast(typecode), end
+        values = array(typecode, self._mmap[offset:end])
+        values.byteswap()
+        return values, end
+
+    def sampler(self) -> WordSampler:
+        """Weighted sampler over this pack, using the precomputed weights and buckets."""
+        if self._sampler is None:
+            self._sampler = WordSampler(
+                self, self.weights, self.length_order, self.length_starts, self.alias_table
+            )
+        return self._sampler
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, int):
+            return self._word(index)
+        return [self._word(i) for i in range(*index.indices(self._count))]
+
+    def _word(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word pack index out of range")
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+
+def is_stale(pack_path: pathlib.Path, source: pathlib.Path) -> bool:
+    """True if the pack is missing, older than its source text file or in an old format."""
+    try:
+        if pack_path.stat().st_mtime < source.stat().st_mtime:
+            return True
+        with open(pack_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        return len(header) < _HEADER.size or _HEADER.unpack(header)[:2] != (MAGIC, FORMAT_VERSION)
+    except FileNotFoundError:
+        return True
+
+
+def open_for_source(source: pathlib.Path, cache_dir: pathlib.Path) -> WordPack:
+    """Opens the word pack for a text word list, compiling it into `cache_dir` on first use.
+
+    A pack shipped next to the text file is used as-is when it is up to date.
+    """
+    bundled = source.with_suffix(PACK_SUFFIX)
+    if not is_stale(bundled, source):
+        return WordPack(bundled)
+
+    cached = cache_dir / f"{source.stem}{PACK_SUFFIX}"
+    if is_stale(cached, source):
+        build_from_text(source, cached)
+    try:
+        return WordPack(cached)
+    except ValueError: # Damaged cache entry, compile it again
+        build_from_text(source, cached)
+        return WordPack(cached)
@@ -1,36 +1,33 @@
 import typer
 from typing_extensions import Annotated
 import sys
+import pathlib
 import platform
 import subprocess
-import asyncio
-from typing import List, Optional
-
-if platform.system() == "Windows":
-    import msvcrt
-else:
-    import tty
-    import termios
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
+# Keep module-level imports light: `--version` and `--help` must not pay for rich,
+# httpx, pydantic or pydantic-settings. Each command imports what it needs.
 from monkeytyper_cli import __version__
-from monkeytyper_cli.config.settings import settings
-from monkeytyper_cli.core.models import GameMode, TestState, Language, TestResult
-from monkeytyper_cli.core import engine
-from monkeytyper_cli.ui import prompts, results
-from monkeytyper_cli.ui.prompts import console, create_prompt_display
-from rich.live import Live
-from rich.panel import Panel
-from rich.prompt import Prompt, IntPrompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-from rich.text import Text
-
-from monkeytyper_cli.config.user_config import UserSettings
-
-from monkeytyper_cli.api.client import APIClient, ApiClientError
-
-from monkeytyper_cli.ui import stats as ui_stats
-from monkeytyper_cli.ui import leaderboard as ui_leaderboard
+from monkeytyper_cli.core.enums import GameMode, TestState, Language
+
+if TYPE_CHECKING:
+    from monkeytyper_cli.api.client import APIClient
+    from monkeytyper_cli.api.session import ApiSession
+    from monkeytyper_cli.config.user_config import UserSettings
+    from monkeytyper_cli.core.history import HistoryStore
+    from monkeytyper_cli.core.models import TestResult
+    from monkeytyper_cli.core.snapshots import SnapshotStore
+    from monkeytyper_cli.core.prompt_pool import PromptPool
+
+KEYLOG_DIR_NAME = "keylogs"
+HTTP_CACHE_DIR_NAME = "http-cache"
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_DURATIONS = (15, 60) # Seconds of the time tests that have a leaderboard
+DEFAULT_LEADERBOARD_MODE2 = "60"
+SNAPSHOT_DIR_NAME = "leaderboards"
+SNAPSHOT_MAX_AGE = 6 * 3600 # Seconds before the menu refreshes a snapshot in the background
 
 # ANSI escape codes
 CLEAR_SCREEN = "\033[2J\033[H"
@@ -43,9 +40,114 @@ def clear_terminal():
         sys.stdout.write(CLEAR_SCREEN)
         sys.stdout.flush()
 
-user_settings = UserSettings.load()
+class _LazyConsole:
+    """Stands in for the shared rich console until something is actually printed."""
+
+    def __getattr__(self, name: str):
+        from monkeytyper_cli.ui.prompts import console as rich_console
+        return getattr(rich_console, name)
+
+console = _LazyConsole()
+
+_user_settings: Optional["UserSettings"] = None
+
+def get_user_settings() -> "UserSettings":
+    """Loads the user settings on first access."""
+    global _user_settings
+    if _user_settings is None:
+        from monkeytyper_cli.config.user_config import UserSettings
+        _user_settings = UserSettings.load()
+    return _user_settings
+
+session_result_ids: List[int] = [] # History rows this process stored; other CLI processes share the file
+
+_history_store: Optional["HistoryStore"] = None
+
+def get_history_store() -> "HistoryStore":
+    """The local result history, opened on first use."""
+    global _history_store
+    if _history_store is None:
+        from monkeytyper_cli.config.user_config import get_config_dir
+        from monkeytyper_cli.core.history import HISTORY_DB_NAME, HistoryStore
+        _history_store = HistoryStore(get_config_dir() / HISTORY_DB_NAME)
+    return _history_store
+
+_prompt_pool: Optional["PromptPool"] = None
+
+def get_prompt_pool() -> "PromptPool":
+    global _prompt_pool
+    if _prompt_pool is None:
+        from monkeytyper_cli.core.prompt_pool import PromptPool
+        _prompt_pool = PromptPool()
+    return _prompt_pool
+
+offline_mode = False # Set by --offline: API data comes only from the response cache
+
+def make_api_client():
+    """APIClient backed by the on-disk response cache."""
+    from monkeytyper_cli.api.cache import ResponseCache
+    from monkeytyper_cli.api.client import APIClient
+    from monkeytyper_cli.config.user_config import get_config_dir
+
+    return APIClient(cache=ResponseCache(get_config_dir() / HTTP_CACHE_DIR_NAME), offline=offline_mode)
+
+_api_session: Optional["ApiSession"] = None
+
+def get_api_session() -> "ApiSession":
+    """Shared API loop and client for the interactive menu (see show_main_menu)."""
+    global _api_session
+    if _api_session is None:
+        from monkeytyper_cli.api.session import ApiSession
+        _api_session = ApiSession(make_api_client)
+    return _api_session
+
+_snapshot_store: Optional["SnapshotStore"] = None
+
+def get_snapshot_store() -> "SnapshotStore":
+    global _snapshot_store
+    if _snapshot_store is None:
+        from monkeytyper_cli.config.user_config import get_config_dir
+        from monkeytyper_cli.core.snapshots import SnapshotStore
+        _snapshot_store = SnapshotStore(get_config_dir() / SNAPSHOT_DIR_NAME)
+    return _snapshot_store
+
+def _snapshot_board(mode: GameMode, config_value: int, language: Language) -> Optional[Tuple[str, str, str]]:
+    """(mode, mode2, language) of the leaderboard a test counts towards, if any."""
+    if mode != GameMode.TIME or config_value not in LEADERBOARD_DURATIONS:
+        return None
+    return mode.value, str(config_value), language.value
+
+def _lookup_standing(result: "TestResult", language: Language):
+    """Rank of a result on the latest local snapshot and on the one before it."""
+    board = _snapshot_board(result.mode, result.config_value, language)
+    if board is None:
+        return None, None
+    store = get_snapshot_store()
+    standing = store.standing(*board, result.wpm)
+    if standing is None:
+        return None, None
+    history = store.history(*board)
+    previous = history[-2].standing(result.wpm) if len(history) > 1 else None
+    return standing, previous
+
+def _refresh_snapshot_in_background(mode: GameMode, config_value: int, language: Language) -> None:
+    """Tops up the local snapshot for this board from the menu's API session when it is old."""
+    board = _snapshot_board(mode, config_value, language)
+    if board is None or offline_mode:
+        return
+    latest = get_snapshot_store().latest(*board)
+    if latest is not None and time.time() - latest.taken_at < SNAPSHOT_MAX_AGE:
+        return
+
+    from monkeytyper_cli.api.pagination import LeaderboardPager
+    from monkeytyper_cli.api.snapshots import refresh_snapshot
 
-session_history: List[TestResult] = []
+    board_mode, mode2, board_language = board
+    # Failures are ignored: the next test simply tries again
+    get_api_session().submit(
+        lambda client: refresh_snapshot(LeaderboardPager(client, board_mode, board_language, mode2),
+                                        get_snapshot_store())
+    )
 
 app = typer.Typer(
     name="monkeytyper-cli",
@@ -57,7 +159,7 @@ app = typer.Typer(
 
 def version_callback(value: bool):
     if value:
-        console.print(f"MonkeyTyper CLI Version: {__version__}")
+        typer.echo(f"MonkeyTyper CLI Version: {__version__}")
         raise typer.Exit()
 
 @app.callback()
@@ -73,50 +175,93 @@ def main_callback(
             is_eager=True,
         ),
     ] = False,
+    offline: Annotated[
+        bool,
+        typer.Option("--offline", help="Don't use the network; show cached stats and leaderboards only."),
+    ] = False,
 ):
-    global user_settings
+    global offline_mode
+    offline_mode = offline
 
     if ctx.invoked_subcommand is None:
+        from rich.panel import Panel
+
         console.print(Panel("[bold cyan]Welcome to MonkeyTyper CLI![/]"), justify="center")
         show_main_menu()
         raise typer.Exit()
 
-def _get_char() -> str:
-    if platform.system() == "Windows":
-        return msvcrt.getwch()
-    else:
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            char = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return char
-
 @app.command()
 def start(
     mode: Annotated[
-        GameMode,
-        typer.Option(help="Typing test mode ('time' or 'words')."),
-    ] = user_settings.default_mode,
+        Optional[GameMode],
+        typer.Option(help="Typing test mode ('time', 'words', or 'practice' for words aimed at your weakest keys). [default: from settings]"),
+    ] = None,
     duration: Annotated[
-        int,
-        typer.Option("--duration", "-d", help="Duration in seconds (only for 'time' mode)."),
-    ] = user_settings.default_duration,
+        Optional[int],
+        typer.Option("--duration", "-d", help="Duration in seconds (only for 'time' mode). [default: from settings]"),
+    ] = None,
     length: Annotated[
-        int,
-        typer.Option("--length", "-n", help="Number of words (only for 'words' mode)."),
-    ] = user_settings.default_length,
+        Optional[int],
+        typer.Option("--length", "-n", help="Number of words (only for 'words' and 'practice' mode). [default: from settings]"),
+    ] = None,
     language: Annotated[
-        Language,
-        typer.Option("--language", "-l", help="Language for the typing test ('en' or 'id')."),
-    ] = user_settings.default_language,
+        Optional[Language],
+        typer.Option("--language", "-l", help="Language for the typing test ('en' or 'id'). [default: from settings]"),
+    ] = None,
+    punctuation: Annotated[
+        bool,
+        typer.Option("--punctuation", "-p", help="Add punctuation and capitalisation."),
+    ] = False,
+    numbers: Annotated[
+        bool,
+        typer.Option("--numbers", help="Mix numbers into the prompt."),
+    ] = False,
+    max_word_length: Annotated[
+        Optional[int],
+        typer.Option("--max-word-length", help="Only use words up to this many characters."),
+    ] = None,
+    top: Annotated[
+        Optional[int],
+        typer.Option("--top", help="Only use the N most common words of the language."),
+    ] = None,
+    seed: Annotated[
+        Optional[int],
+        typer.Option("--seed", help="Seed for the prompt; the same seed and options give the same text."),
+    ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option("--profile", help="Time every keystroke and frame, and show latency percentiles after the results."),
+    ] = False,
+    profile_trace: Annotated[
+        Optional[pathlib.Path],
+        typer.Option("--profile-trace", help="Also write a Chrome trace (chrome://tracing, Perfetto) to this file. Implies --profile.", dir_okay=False),
+    ] = None,
+    profile_memory: Annotated[
+        bool,
+        typer.Option("--profile-memory", help="Also trace allocations and show the peak and largest allocation sites (slows typing down). Implies --profile."),
+    ] = False,
 ):
+    import asyncio
+
+    from monkeytyper_cli.core import engine
+    from monkeytyper_cli.core.models import PromptOptions
+    from monkeytyper_cli.ui import game_loop, results
+    from monkeytyper_cli.ui.keyboard import CTRL_C, RawInput
+    from monkeytyper_cli.ui.prompts import create_prompt_display
+    from monkeytyper_cli.ui.prompts import console as rich_console
+    from monkeytyper_cli.ui.renderer import FrameRenderer
+
+    user_settings = get_user_settings()
+    mode = mode or user_settings.default_mode
+    duration = duration if duration is not None else user_settings.default_duration
+    length = length if length is not None else user_settings.default_length
+    language = language or user_settings.default_language
+    prompt_pool = get_prompt_pool()
+
     if mode == GameMode.TIME:
         config_value = duration
         config_unit = "seconds"
-    elif mode == GameMode.WORDS:
+    elif mode in (GameMode.WORDS, GameMode.PRACTICE):
         config_value = length
         config_unit = "words"
     else:
@@ -127,50 +272,137 @@ def start(
         f"Starting test: Mode=[cyan]{mode.value}[/], "
         f"Config=[cyan]{config_value} {config_unit}[/], "
         f"Language=[cyan]{language.value}[/]"
+        + (f", Seed=[cyan]{seed}[/]" if seed is not None else "")
     )
-    console.print("Press any key to begin...")
-    _get_char()
-
     try:
-        game_state = engine.start_game(
-            mode=mode, config_value=config_value, language=language.value
+        options = PromptOptions(
+            punctuation=punctuation, numbers=numbers, max_word_length=max_word_length, top_n=top
         )
+        if mode == GameMode.PRACTICE:
+            # Never pooled: the weak spots change with every test
+            game_state = engine.start_game(
+                mode=mode, config_value=config_value, language=language.value, options=options, seed=seed,
+                key_stats=_practice_key_stats(),
+            )
+        else:
+            game_state = prompt_pool.take(mode, config_value, language.value, options, seed)
     except (FileNotFoundError, IOError, ValueError) as e:
          console.print(f"[bold red]Error initializing game:[/bold red] {e}")
          raise typer.Exit(1)
 
+    profiler = None
+    if profile or profile_trace or profile_memory:
+        from monkeytyper_cli.ui import profiler as ui_profiler
+        profiler = ui_profiler.StageProfiler(trace=profile_trace is not None)
+
+    console.print("Press any key to begin...")
+
+    renderer = FrameRenderer(rich_console)
+    memory = None
     try:
-        while not game_state.is_finished():
-            clear_terminal()
-            console.print(create_prompt_display(game_state))
-            
-            char = _get_char()
-            if ord(char) == 3:
+        # One raw-mode session covers the start key and the whole test
+        with RawInput() as keyboard:
+            if any(CTRL_C in event.chars for event in keyboard.read()):
                 raise typer.Exit()
 
-            engine.process_input(game_state, char)
+            if profile_memory:
+                ui_profiler.start_memory_tracing()
+            try:
+                with renderer:
+                    completed = asyncio.run(
+                        game_loop.run_game(game_state, keyboard, renderer, create_prompt_display, profiler=profiler)
+                    )
+            finally:
+                if profile_memory:
+                    memory = ui_profiler.stop_memory_tracing()
+            if not completed:
+                raise typer.Exit()
 
         if game_state.state != TestState.FINISHED:
             engine.finish_game(game_state)
 
+        from monkeytyper_cli.config.settings import get_settings # Not needed to reach the typing screen
+        if get_settings().log_level.upper() == "DEBUG":
+            console.print(f"[dim]Render: {renderer.stats.summary()}[/]")
+
         final_result = engine.calculate_results(game_state)
+        final_result.keylog_path = _save_keylog(game_state)
+
+        # Have the next prompt ready by the time the user is done reading the results
+        if mode != GameMode.PRACTICE:
+            prompt_pool.prefetch(mode, config_value, language.value, options, seed)
 
+        standing, previous_standing = _lookup_standing(final_result, language)
         console.print("\n" * 1)
-        results.display_results(final_result)
+        results.display_results(final_result, standing, previous_standing)
+        if profiler is not None:
+            _report_profile(profiler, memory, profile_trace)
 
-        session_history.append(final_result)
+        try:
+            session_result_ids.append(
+                get_history_store().append(final_result, language.value, key_stats=game_state.key_stats)
+            )
+        except Exception as e: # Never lose the results screen over the history file
+            console.print(f"[yellow]Could not save the result to your history: {e}[/]")
 
     except typer.Exit:
         pass
     except Exception as e:
         console.print(f"\nAn unexpected error occurred: {e}", style="bold red")
         raise typer.Exit(1)
-    finally:
-        if platform.system() != "Windows":
-            fd = sys.stdin.fileno()
-            pass
+
+def _report_profile(profiler, memory, trace_path: Optional[pathlib.Path]) -> None:
+    from monkeytyper_cli.ui import profiler as ui_profiler
+
+    ui_profiler.display_profile(profiler, memory)
+    if trace_path is None:
+        return
+    try:
+        events = profiler.write_trace(trace_path)
+    except OSError as e:
+        console.print(f"[yellow]Could not write the trace: {e}[/]")
+        return
+    dropped = f" ({profiler.trace_dropped:,} dropped)" if profiler.trace_dropped else ""
+    console.print(f"Trace with {events:,} events{dropped} written to [cyan]{trace_path}[/]")
+
+def _practice_key_stats():
+    """Key stats to aim a practice prompt at; None (a plain words test) if they can't be read."""
+    try:
+        return get_history_store().key_stats()
+    except Exception as e:
+        console.print(f"[yellow]Could not read your key stats, practising ordinary words: {e}[/]")
+        return None
+
+def _save_keylog(game_state) -> Optional[str]:
+    """Saves the keystroke log of a finished test next to the user's results."""
+    from monkeytyper_cli.config.user_config import get_config_dir
+    from monkeytyper_cli.core import keylog, replay
+
+    if not game_state.keylog:
+        return None
+    started = time.strftime("%Y%m%d-%H%M%S")
+    try:
+        path = keylog.save_new(get_config_dir() / KEYLOG_DIR_NAME,
+                               f"{started}-{game_state.mode.value}{game_state.config_value}",
+                               replay.record_session(game_state))
+    except OSError as e:
+        console.print(f"[yellow]Could not save keystroke log: {e}[/]")
+        return None
+    return str(path)
 
 def show_main_menu():
+    prompt_pool = get_prompt_pool()
+    prompt_pool.enabled = True
+    try:
+        _run_main_menu()
+    finally:
+        prompt_pool.shutdown()
+        if _api_session is not None:
+            _api_session.close()
+
+def _run_main_menu():
+    from rich.prompt import Prompt
+
     while True:
         console.print("\n[bold]Main Menu:[/]")
         console.print("1. Start Typing Test")
@@ -178,7 +410,7 @@ def show_main_menu():
         console.print("3. View Leaderboard")
         console.print("4. Settings")
         console.print("5. Help")
-        console.print("6. View Session History")
+        console.print("6. View History")
         console.print("7. Exit")
 
         choice = Prompt.ask("Choose an option", choices=["1", "2", "3", "4", "5", "6", "7"], default="1")
@@ -194,7 +426,8 @@ def show_main_menu():
         elif choice == '5':
             show_help()
         elif choice == '6':
-            view_session_history()
+            view_history()
+            input("\nPress Enter to return to the menu...")
         elif choice == '7':
              console.print("Goodbye!")
              break
@@ -202,6 +435,9 @@ def show_main_menu():
             console.print("[red]Invalid choice.[/]")
 
 def start_test_from_menu():
+    from rich.prompt import Confirm, IntPrompt, Prompt
+
+    user_settings = get_user_settings()
     console.print("\n[bold]Configure Typing Test:[/]")
 
     # Choose Language
@@ -243,7 +479,7 @@ def start_test_from_menu():
 
     if mode == GameMode.TIME:
         config_value = IntPrompt.ask("Enter duration (seconds)", default=user_settings.default_duration)
-    elif mode == GameMode.WORDS:
+    elif mode in (GameMode.WORDS, GameMode.PRACTICE):
         config_value = IntPrompt.ask("Enter number of words", default=user_settings.default_length)
     else:
         console.print(f"[red]Invalid mode selected: {mode}[/]")
@@ -251,12 +487,19 @@ def start_test_from_menu():
 
     console.print(f"\nStarting test: Language={language}, Mode={mode.value}, Value={config_value}")
     if Confirm.ask("Start now?", default=True):
-        start(mode=mode, duration=config_value if mode == GameMode.TIME else 30, length=config_value if mode == GameMode.WORDS else 25, language=Language(language))
+        start(mode=mode, duration=config_value if mode == GameMode.TIME else 30, length=config_value if mode != GameMode.TIME else 25, language=Language(language))
+        _refresh_snapshot_in_background(mode, config_value, Language(language))
     else:
         console.print("Test cancelled.")
 
 def show_settings_menu():
-    global user_settings
+    from rich.prompt import Confirm, IntPrompt, Prompt
+
+    from monkeytyper_cli.config.settings import get_settings
+    from monkeytyper_cli.config.user_config import UserSettings
+
+    global _user_settings
+    user_settings = get_user_settings()
     while True:
         console.print("\n[bold]User Settings:[/]")
         console.print(f"1. Default Language: [cyan]{user_settings.default_language.value}[/]")
@@ -312,7 +555,7 @@ def show_settings_menu():
              user_settings.save()
              console.print(f"[green]Default {label} updated.[/]")
         elif choice == '5':
-            if settings.monkeytype_ape_key:
+            if get_settings().monkeytype_ape_key:
                 console.print(f"Monkeytype ApeKey is currently [green]set[/] (loaded from .env or environment).")
                 console.print("To change it, modify your .env file or environment variables.")
             else:
@@ -321,7 +564,7 @@ def show_settings_menu():
             input("Press Enter to continue...")
         elif choice == '6':
             if Confirm.ask("Are you sure you want to reset user settings to defaults?"):
-                 user_settings = UserSettings()
+                 user_settings = _user_settings = UserSettings()
                  user_settings.save()
                  console.print("[green]User settings reset to defaults.[/]")
         elif choice == '7':
@@ -330,9 +573,30 @@ def show_settings_menu():
             console.print("[red]Invalid choice.[/]")
 
 @app.command()
-def stats():
+def stats(
+    local: Annotated[
+        bool,
+        typer.Option("--local", help="Analyse your local result history instead of fetching stats from Monkeytype (needs NumPy)."),
+    ] = False,
+    language: Annotated[
+        Optional[Language],
+        typer.Option("--language", "-l", help="With --local: only results in this language."),
+    ] = None,
+    days: Annotated[
+        Optional[float],
+        typer.Option("--days", "-d", min=0, help="With --local: only results from the last N days."),
+    ] = None,
+):
+    if local:
+        view_local_stats(language=language, since=time.time() - days * 86400 if days is not None else None)
+        return
+
+    from monkeytyper_cli.api.client import ApiClientError
+    from monkeytyper_cli.api.session import ApiSession
+
     try:
-        asyncio.run(view_stats())
+        with ApiSession(make_api_client) as api:
+            api.run(view_stats)
     except ApiClientError as e:
          console.print(f"[bold red]API Error:[/bold red] {e}")
     except Exception as e:
@@ -341,22 +605,70 @@ def stats():
 @app.command()
 def leaderboard(
     mode: Annotated[
-        GameMode,
-        typer.Option(help="Leaderboard mode ('time' or 'words')."),
-    ] = user_settings.default_mode,
+        Optional[GameMode],
+        typer.Option(help="Leaderboard mode ('time' or 'words'). [default: from settings]"),
+    ] = None,
     language: Annotated[
-        Language,
-        typer.Option("--language", "-l", help="Leaderboard language ('en' or 'id')."),
-    ] = user_settings.default_language,
+        Optional[Language],
+        typer.Option("--language", "-l", help="Leaderboard language ('en' or 'id'). [default: from settings]"),
+    ] = None,
+    mode2: Annotated[
+        Optional[str],
+        typer.Option("--mode2", help="Leaderboard variant, e.g. '15' or '60' for time mode. [default: 60 for time mode]"),
+    ] = None,
+    pages: Annotated[
+        int,
+        typer.Option("--pages", "-p", min=1, help="Number of pages to show."),
+    ] = 1,
+    page_size: Annotated[
+        int,
+        typer.Option("--page-size", min=1, max=200, help="Entries per page."),
+    ] = LEADERBOARD_PAGE_SIZE,
+    rank: Annotated[
+        Optional[int],
+        typer.Option("--rank", min=1, help="Only show the entry at this rank."),
+    ] = None,
+    user: Annotated[
+        Optional[str],
+        typer.Option("--user", help="Only show this user's entry (needs --wpm)."),
+    ] = None,
+    wpm: Annotated[
+        Optional[float],
+        typer.Option("--wpm", help="The user's leaderboard WPM, used to locate them with --user. With --snapshot, show the rank of this WPM over time."),
+    ] = None,
+    snapshot: Annotated[
+        bool,
+        typer.Option("--snapshot", help="Refresh the local leaderboard snapshot used to rank your results and show its history."),
+    ] = False,
 ):
+    from monkeytyper_cli.api.client import ApiClientError
+    from monkeytyper_cli.api.session import ApiSession
+
+    if user is not None and wpm is None:
+        console.print("[bold red]--user needs --wpm:[/bold red] the leaderboard is ordered by WPM, not by name.")
+        raise typer.Exit(code=1)
+
     try:
-        asyncio.run(view_leaderboard(mode=mode, language=language))
+        with ApiSession(make_api_client) as api:
+            if snapshot:
+                api.run(lambda client: update_leaderboard_snapshot(
+                    client, mode=mode, language=language, mode2=mode2, page_size=page_size, wpm=wpm,
+                ))
+                return
+            api.run(lambda client: view_leaderboard(
+                client, mode=mode, language=language, mode2=mode2, pages=pages,
+                page_size=page_size, rank=rank, user=user, user_wpm=wpm,
+            ))
     except ApiClientError as e:
          console.print(f"[bold red]API Error:[/bold red] {e}")
     except Exception as e:
          console.print(f"[bold red]An unexpected error occurred:[/bold red] {e}")
 
 def _call_api_from_menu(func, *args, **kwargs):
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    from monkeytyper_cli.api.client import ApiClientError
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -365,76 +677,277 @@ def _call_api_from_menu(func, *args, **kwargs):
     ) as progress:
         progress.add_task(description="Connecting to API...", total=None)
         try:
-            asyncio.run(func(*args, **kwargs))
+            get_api_session().run(lambda client: func(client, *args, **kwargs))
         except ApiClientError as e:
             console.print(f"[bold red]API Error:[/bold red] {e}")
         except Exception as e:
             console.print(f"[bold red]An unexpected error occurred:[/bold red] {e}")
 
-async def view_stats():
+async def view_stats(client: "APIClient"):
+    import asyncio
+
+    from monkeytyper_cli.ui import stats as ui_stats
+
     console.print("\n[bold]Fetching User Stats & Personal Bests...[/]")
-    client = APIClient()
-    try:
-        stats_response, bests_response = await asyncio.gather(
-            client.get_user_stats(),
-            client.get_personal_bests()
-        )
+    stats_response, bests_response = await asyncio.gather(
+        client.get_user_stats(),
+        client.get_personal_bests()
+    )
 
-        if stats_response and stats_response.data:
-             ui_stats.display_stats(stats_response.data)
-        else:
-             console.print(f"[yellow]Could not retrieve user stats. Message: {stats_response.message if stats_response else 'N/A'}[/]")
-             
-        if bests_response and bests_response.data:
-             ui_stats.display_personal_bests(bests_response.data)
-        else:
-             console.print(f"[yellow]Could not retrieve personal bests. Message: {bests_response.message if bests_response else 'N/A'}[/]")
+    if stats_response and stats_response.data:
+         ui_stats.display_stats(stats_response.data)
+    else:
+         console.print(f"[yellow]Could not retrieve user stats. Message: {stats_response.message if stats_response else 'N/A'}[/]")
 
-    finally:
-        await client.close()
+    if bests_response and bests_response.data:
+         ui_stats.display_personal_bests(bests_response.data)
+    else:
+         console.print(f"[yellow]Could not retrieve personal bests. Message: {bests_response.message if bests_response else 'N/A'}[/]")
+
+async def view_leaderboard(
+    client: "APIClient",
+    mode: Optional[GameMode] = None,
+    language: Optional[Language] = None,
+    mode2: Optional[str] = None,
+    pages: int = 1,
+    page_size: int = LEADERBOARD_PAGE_SIZE,
+    rank: Optional[int] = None,
+    user: Optional[str] = None,
+    user_wpm: Optional[float] = None,
+):
+    from monkeytyper_cli.api.pagination import LeaderboardPager
+    from monkeytyper_cli.ui import leaderboard as ui_leaderboard
+
+    mode = mode or get_user_settings().default_mode
+    if mode == GameMode.PRACTICE:
+        mode = GameMode.WORDS # Practice tests have no leaderboard of their own
+    language = language or get_user_settings().default_language
+    if mode2 is None and mode == GameMode.TIME:
+        mode2 = DEFAULT_LEADERBOARD_MODE2
+    console.print(f"\n[bold]Fetching Leaderboard (Mode: {mode.value}{f' {mode2}' if mode2 else ''}, Lang: {language.value})...[/]")
+    pager = LeaderboardPager(client, mode.value, language.value, mode2, page_size)
+
+    if rank is not None:
+        entry = await pager.find_rank(rank)
+        ui_leaderboard.display_entry(entry, f"Rank {rank}", mode.value, language.value)
+    elif user is not None and user_wpm is not None:
+        entry = await pager.find_user(user, user_wpm)
+        ui_leaderboard.display_entry(entry, user, mode.value, language.value)
+    else:
+        await ui_leaderboard.stream_leaderboard(pager.pages(max_pages=pages), mode.value, language.value)
+
+async def update_leaderboard_snapshot(
+    client: "APIClient",
+    mode: Optional[GameMode] = None,
+    language: Optional[Language] = None,
+    mode2: Optional[str] = None,
+    page_size: int = LEADERBOARD_PAGE_SIZE,
+    wpm: Optional[float] = None,
+):
+    from monkeytyper_cli.api.pagination import LeaderboardPager
+    from monkeytyper_cli.api.snapshots import refresh_snapshot
+    from monkeytyper_cli.ui import leaderboard as ui_leaderboard
+
+    mode = mode or get_user_settings().default_mode
+    if mode == GameMode.PRACTICE:
+        mode = GameMode.WORDS # Practice tests have no leaderboard of their own
+    language = language or get_user_settings().default_language
+    if mode2 is None and mode == GameMode.TIME:
+        mode2 = DEFAULT_LEADERBOARD_MODE2
+    store = get_snapshot_store()
+    if not offline_mode:
+        console.print(f"\n[bold]Refreshing Leaderboard Snapshot (Mode: {mode.value}{f' {mode2}' if mode2 else ''}, Lang: {language.value})...[/]")
+        await refresh_snapshot(LeaderboardPager(client, mode.value, language.value, mode2, page_size), store)
+    ui_leaderboard.display_snapshot_history(store.history(mode.value, mode2, language.value), mode.value, language.value, wpm)
+
+def view_local_stats(language: Optional[Language] = None, since: Optional[float] = None):
+    from monkeytyper_cli.core.analytics import AnalyticsUnavailable, analyse, load_columns
 
-async def view_leaderboard(mode: GameMode = user_settings.default_mode, language: Language = user_settings.default_language):
-    console.print(f"\n[bold]Fetching Leaderboard (Mode: {mode.value}, Lang: {language.value})...[/]")
-    client = APIClient()
     try:
-        leaderboard_response = await client.get_leaderboard(mode=mode.value, language=language.value)
-        
-        if leaderboard_response and leaderboard_response.data:
-             ui_leaderboard.display_leaderboard(leaderboard_response.data, mode.value, language.value)
-        else:
-            console.print(f"[yellow]No leaderboard data received. Message: {leaderboard_response.message if leaderboard_response else 'N/A'}[/]")
+        stats = analyse(load_columns(get_history_store(), language.value if language else None, since))
+    except AnalyticsUnavailable as e:
+        console.print(f"[bold red]{e}[/]")
+        raise typer.Exit(1)
+    if stats is None:
+        console.print("No tests stored yet. Finish a test and try again.")
+        return
 
-    finally:
-        await client.close()
-
-def view_session_history():
-     console.print("\n[bold]Session History[/]")
-     if not session_history:
-         console.print("No tests completed in this session yet.")
-         input("\nPress Enter to return to the menu...") 
-         return
-
-     table = Table(title="Current Session Results", show_header=True, header_style="bold cyan")
-     table.add_column("Time", style="dim", width=10)
-     table.add_column("Mode", width=15)
-     table.add_column("WPM", justify="right", style="green")
-     table.add_column("Acc %", justify="right", style="blue")
-     table.add_column("Raw", justify="right")
-     table.add_column("Chars (C/I)", justify="center")
-
-     for i, result in enumerate(reversed(session_history)):
-         time_str = f"Test {len(session_history) - i}"
-         mode_str = f"{result.mode.value} ({result.config_value})"
-         wpm_str = f"{result.wpm:.1f}"
-         acc_str = f"{result.accuracy:.1f}"
-         raw_str = f"{result.raw_wpm:.1f}"
-         chars_str = f"{result.correct_chars}/{result.incorrect_chars}"
-         table.add_row(time_str, mode_str, wpm_str, acc_str, raw_str, chars_str)
-     
-     console.print(table)
-     input("\nPress Enter to return to the menu...") 
+    from monkeytyper_cli.ui.local_stats import display_local_stats
+    display_local_stats(stats)
+
+@app.command()
+def history(
+    limit: Annotated[
+        int,
+        typer.Option("--limit", "-n", min=1, help="Number of results to list."),
+    ] = 20,
+    mode: Annotated[
+        Optional[GameMode],
+        typer.Option(help="Only results of this mode."),
+    ] = None,
+    config_value: Annotated[
+        Optional[int],
+        typer.Option("--config", "-c", help="Only results with this duration/word count."),
+    ] = None,
+    language: Annotated[
+        Optional[Language],
+        typer.Option("--language", "-l", help="Only results in this language."),
+    ] = None,
+    days: Annotated[
+        Optional[float],
+        typer.Option("--days", "-d", min=0, help="Only results from the last N days."),
+    ] = None,
+):
+    since = time.time() - days * 86400 if days is not None else None
+    view_history(limit=limit, mode=mode, config_value=config_value, language=language, since=since)
+
+def view_history(
+    limit: int = 20,
+    mode: Optional[GameMode] = None,
+    config_value: Optional[int] = None,
+    language: Optional[Language] = None,
+    since: Optional[float] = None,
+):
+     from monkeytyper_cli.ui import history as ui_history
+
+     store = get_history_store()
+     mode_value = mode.value if mode else None
+     language_value = language.value if language else None
+     console.print("\n[bold]History[/]")
+
+     if session_result_ids and not (mode or config_value or language or since):
+         ui_history.display_history(store.recent(limit, ids=session_result_ids), len(session_result_ids), "This Session")
+
+     ui_history.display_history(
+         store.recent(limit, mode=mode_value, config_value=config_value, language=language_value, since=since),
+         store.count(mode=mode_value, config_value=config_value, language=language_value, since=since),
+     )
+     ui_history.display_summary(store.summary(language=language_value, since=since))
+
+@app.command()
+def heatmap(
+    limit: Annotated[
+        int,
+        typer.Option("--limit", "-n", min=1, help="Number of keys and bigrams to list."),
+    ] = 10,
+    min_hits: Annotated[
+        int,
+        typer.Option("--min-hits", min=1, help="Ignore keys and bigrams typed fewer times than this."),
+    ] = 20,
+):
+    from monkeytyper_cli.ui.heatmap import display_heatmap
+
+    display_heatmap(get_history_store().key_stats(), limit=limit, min_hits=min_hits)
+
+@app.command()
+def simulate(
+    games: Annotated[
+        int,
+        typer.Option("--games", "-g", min=1, help="Number of tests to simulate."),
+    ] = 1000,
+    mode: Annotated[
+        GameMode,
+        typer.Option(help="Test mode ('time' or 'words')."),
+    ] = GameMode.WORDS,
+    duration: Annotated[
+        int,
+        typer.Option("--duration", "-d", min=1, help="Duration in seconds (only for 'time' mode)."),
+    ] = 30,
+    length: Annotated[
+        int,
+        typer.Option("--length", "-n", min=1, help="Number of words (only for 'words' mode)."),
+    ] = 25,
+    language: Annotated[
+        Language,
+        typer.Option("--language", "-l", help="Language of the prompts."),
+    ] = Language.EN,
+    punctuation: Annotated[
+        bool,
+        typer.Option("--punctuation", "-p", help="Add punctuation and capitalisation."),
+    ] = False,
+    numbers: Annotated[
+        bool,
+        typer.Option("--numbers", help="Mix numbers into the prompts."),
+    ] = False,
+    wpm: Annotated[
+        float,
+        typer.Option("--wpm", min=5, help="Mean typing pace of the typists."),
+    ] = 80.0,
+    wpm_spread: Annotated[
+        float,
+        typer.Option("--wpm-spread", min=0, help="Standard deviation of the pace between typists."),
+    ] = 15.0,
+    error_rate: Annotated[
+        float,
+        typer.Option("--error-rate", min=0, max=1, help="Chance of mistyping each char."),
+    ] = 0.03,
+    correction_rate: Annotated[
+        float,
+        typer.Option("--correction-rate", min=0, max=1, help="Share of mistakes that get backspaced and fixed."),
+    ] = 0.8,
+    burst: Annotated[
+        float,
+        typer.Option("--burst", min=0, help="Mean chars typed between pauses (0 for no pauses)."),
+    ] = 0.0,
+    pause: Annotated[
+        float,
+        typer.Option("--pause", min=0, help="Mean seconds of a pause between bursts."),
+    ] = 0.4,
+    seed: Annotated[
+        Optional[int],
+        typer.Option("--seed", help="First seed; test i uses seed + i, so a run can be repeated. [default: random]"),
+    ] = None,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option("--jobs", "-j", min=1, help="Worker processes (1 runs in this process). [default: CPU count]"),
+    ] = None,
+    check: Annotated[
+        bool,
+        typer.Option("--check", help="Recount every test from its input and replay its keystrokes; exits 1 on a mismatch."),
+    ] = False,
+):
+    import random
+
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeRemainingColumn
+
+    from monkeytyper_cli.core import simulate as core_simulate
+    from monkeytyper_cli.core.models import PromptOptions
+    from monkeytyper_cli.ui.simulate import console as rich_console
+    from monkeytyper_cli.ui.simulate import display_simulation
+
+    if mode == GameMode.PRACTICE:
+        console.print("Error: Practice prompts need a typing history; simulate 'words' instead.", style="bold red")
+        raise typer.Exit(1)
+
+    scenario = core_simulate.Scenario(
+        mode=mode,
+        config_value=duration if mode == GameMode.TIME else length,
+        language=language.value,
+        options=PromptOptions(punctuation=punctuation, numbers=numbers),
+        typist=core_simulate.Typist(wpm, wpm_spread, error_rate, correction_rate, burst, pause),
+        check=check,
+    )
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeRemainingColumn(),
+        transient=True,
+        console=rich_console
+    ) as progress:
+        task = progress.add_task(description="Simulating...", total=games)
+        simulation = core_simulate.simulate(
+            scenario, games, seed if seed is not None else random.randrange(2 ** 31), jobs,
+            progress=lambda done: progress.update(task, completed=done),
+        )
+    display_simulation(simulation)
+    if simulation.failure_count:
+        raise typer.Exit(1)
 
 def show_help():
+     from rich.panel import Panel
+     from rich.text import Text
+
      console.print("\n[bold]MonkeyTyper CLI Help[/]")
      
      help_text = Text()
@@ -442,8 +955,11 @@ def show_help():
      help_text.append("Use the interactive menu or run commands directly.\n\n")
      help_text.append("Main Commands:\n", style="bold yellow")
      help_text.append("  start        : Start a new typing test (configurable via options or menu).\n")
-     help_text.append("  stats        : View your personal stats (requires ApeKey set in .env).\n")
+     help_text.append("  stats        : View your personal stats (requires ApeKey set in .env; --local for offline analytics).\n")
      help_text.append("  leaderboard  : View public leaderboards.\n")
+     help_text.append("  history      : View your stored results and averages.\n")
+     help_text.append("  heatmap      : View your weakest keys and bigrams.\n")
+     help_text.append("  simulate     : Run synthetic typists through the engine (load and scoring checks).\n")
      help_text.append("  --version    : Show application version.\n")
      help_text.append("  --help       : Show detailed help for commands and options.\n\n")
      
@@ -453,7 +969,7 @@ def show_help():
      help_text.append("  3. Leaderboard: Fetch and display public leaderboards.\n")
      help_text.append("  4. Settings   : Change default test parameters (language, mode, etc.).\n")
      help_text.append("  5. Help       : Display this help message.\n")
-     help_text.append("  6. History    : View results from the current session.\n")
+     help_text.append("  6. History    : View your stored results (this session first).\n")
      help_text.append("  7. Exit       : Close the application.\n")
 
      console.print(Panel(help_text, title="Help Summary", border_style="green"))
@@ -0,0 +1,173 @@
+# asyncio game loop: input reader, test timer and frame scheduler
+
+import asyncio
+import platform
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from rich.console import RenderableType
+
+from monkeytyper_cli.core import engine
+from monkeytyper_cli.core.models import GameMode, GameState, TestState
+from monkeytyper_cli.ui.keyboard import CTRL_C, RawInput
+from monkeytyper_cli.ui.renderer import FrameRenderer
+
+if TYPE_CHECKING:
+    from monkeytyper_cli.ui.profiler import StageProfiler
+
+DEFAULT_FPS = 60
+COUNTDOWN_REFRESH = 0.1 # Seconds between redraws while idle, keeps the time-mode countdown moving
+WINDOWS_POLL_INTERVAL = 0.01
+
+
+class _GameLoop:
+    def __init__(
+        self,
+        game_state: GameState,
+        keyboard: RawInput,
+        renderer: FrameRenderer,
+        build_frame: Callable[[GameState], RenderableType],
+        fps: int,
+        profiler: Optional["StageProfiler"] = None,
+    ):
+        self.game_state = game_state
+        self.profiler = profiler # None unless --profile; every hook below is skipped then
+        self.keyboard = keyboard
+        self.renderer = renderer
+        self.build_frame = build_frame
+        self.frame_interval = 1 / max(1, fps)
+        self.interrupted = False
+        self.error: BaseException | None = None
+        self.started = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.dirty = asyncio.Event()
+
+    def _handle_events(self, events) -> None:
+        game_state = self.game_state
+        profiler = self.profiler
+        for event in events:
+            if CTRL_C in event.chars:
+                self.interrupted = True
+                self.finished.set()
+                break
+            if profiler is None:
+                engine.feed(game_state, event.chars, event.timestamp)
+                continue
+            started = time.perf_counter()
+            engine.feed(game_state, event.chars, event.timestamp)
+            profiler.record("process_input", started, time.perf_counter() - started, len(event.chars))
+            profiler.keys_arrived(event.timestamp, len(event.chars))
+        if game_state.state != TestState.NOT_STARTED:
+            self.started.set()
+        if game_state.state == TestState.FINISHED or game_state.is_finished():
+            self.finished.set()
+        self.dirty.set()
+
+    async def read_input(self) -> None:
+        """Input reader: hands every batch of keystrokes to the engine as it arrives."""
+        loop = asyncio.get_running_loop()
+        if platform.system() == "Windows":
+            while not self.finished.is_set():
+                events = await asyncio.to_thread(self.keyboard.read, WINDOWS_POLL_INTERVAL)
+                self._handle_events(events)
+            return
+
+        def on_readable() -> None:
+            try:
+                if self.profiler is None:
+                    events = self.keyboard.read_available()
+                else:
+                    started = time.perf_counter()
+                    events = self.keyboard.read_available()
+                    self.profiler.record("read", started, time.perf_counter() - started)
+                self._handle_events(events)
+            except Exception as e: # Surface errors from the reader callback in run()
+                self.error = e
+                self.finished.set()
+
+        fd = self.keyboard.fileno()
+        loop.add_reader(fd, on_readable)
+        try:
+            await self.finished.wait()
+        finally:
+            loop.remove_reader(fd)
+
+    async def run_timer(self) -> None:
+        """Ends a time-mode test at its exact deadline, whether or not keys are coming in."""
+        await self.started.wait()
+        game_state = self.game_state
+        if game_state.start_time is not None: # Set by the first key, which is what `started` waits for
+            remaining = game_state.start_time + game_state.config_value - game_state.clock()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        engine.finish_game(game_state)
+        self.finished.set()
+        self.dirty.set()
+
+    async def schedule_frames(self) -> None:
+        """Frame scheduler: redraws at most `fps` times a second, merging pending keystrokes."""
+        loop = asyncio.get_running_loop()
+        while not self.finished.is_set():
+            self.dirty.clear()
+            if self.profiler is None:
+                self.renderer.render(self.build_frame(self.game_state))
+            else:
+                self._profiled_frame(self.profiler)
+            last_frame = loop.time()
+
+            idle_timeout = None
+            if self.game_state.mode == GameMode.TIME and self.game_state.state == TestState.RUNNING:
+                idle_timeout = COUNTDOWN_REFRESH
+            try:
+                await asyncio.wait_for(self.dirty.wait(), idle_timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            delay = last_frame + self.frame_interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _profiled_frame(self, profiler: "StageProfiler") -> None:
+        started = time.perf_counter()
+        frame = self.build_frame(self.game_state)
+        built = time.perf_counter()
+        self.renderer.render(frame)
+        write = self.renderer.last_write_seconds
+        profiler.frame_done(started, built - started, time.perf_counter() - built - write, write)
+
+    async def run(self) -> bool:
+        tasks = [
+            asyncio.create_task(self.read_input()),
+            asyncio.create_task(self.schedule_frames()),
+        ]
+        if self.game_state.mode == GameMode.TIME:
+            tasks.append(asyncio.create_task(self.run_timer()))
+        finished = asyncio.create_task(self.finished.wait())
+        try:
+            done, _ = await asyncio.wait([*tasks, finished], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in [*tasks, finished]:
+                task.cancel()
+            await asyncio.gather(*tasks, finished, return_exceptions=True)
+
+        for task in done:
+            if task is finished or task.cancelled():
+                continue
+            exception = task.exception()
+            if exception is not None:
+                raise exception
+        if self.error is not None:
+            raise self.error
+        return not self.interrupted
+
+
+async def run_game(
+    game_state: GameState,
+    keyboard: RawInput,
+    renderer: FrameRenderer,
+    build_frame: Callable[[GameState], RenderableType],
+    fps: int = DEFAULT_FPS,
+    profiler: Optional["StageProfiler"] = None,
+) -> bool:
+    """Runs a test to completion. Returns False if the user aborted with Ctrl+C."""
+    return await _GameLoop(game_state, keyboard, renderer, build_frame, fps, profiler).run()
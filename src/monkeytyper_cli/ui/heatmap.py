@@ -0,0 +1,69 @@
+# ui/heatmap.py
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+from typing import List
+
+from monkeytyper_cli.core.keystats import KeyStats, Weakness, key_id
+
+console = Console()
+
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+ROW_INDENTS = (0, 2, 3, 4)
+# Error rate at or above which a key is drawn in each colour
+ERROR_COLOURS = ((0.10, "bold white on red"), (0.05, "black on dark_orange"),
+                 (0.02, "black on yellow"), (0.0, "black on green"))
+
+def _visible(text: str) -> str:
+    return text.replace(" ", "␣")
+
+def _key_style(stats: KeyStats, char: str, min_hits: int) -> str:
+    weakness = stats.weakness(key_id(char))
+    if weakness.hits < min_hits:
+        return "dim"
+    return next(style for threshold, style in ERROR_COLOURS if weakness.error_rate >= threshold)
+
+def _keyboard(stats: KeyStats, min_hits: int) -> Text:
+    text = Text()
+    for indent, row in zip(ROW_INDENTS, KEYBOARD_ROWS):
+        text.append(" " * indent)
+        for char in row:
+            text.append(f" {char} ", style=_key_style(stats, char, min_hits))
+            text.append(" ")
+        text.append("\n")
+    text.append(" " * 12)
+    text.append(f"{'space':^23}", style=_key_style(stats, " ", min_hits))
+    return text
+
+def _weakness_table(title: str, column: str, rows: List[Weakness]) -> Table:
+    table = Table(title=title, show_header=True, header_style="bold cyan")
+    table.add_column(column, justify="center", style="bold")
+    table.add_column("Typed", justify="right")
+    table.add_column("Err %", justify="right", style="red")
+    table.add_column("Avg ms", justify="right")
+    table.add_column("± ms", justify="right", style="dim")
+    for row in rows:
+        table.add_row(
+            _visible(row.text),
+            f"{row.hits:,}",
+            f"{row.error_rate * 100:.1f}",
+            f"{row.mean_latency * 1000:.0f}" if row.mean_latency else "-",
+            f"{row.stdev_latency * 1000:.0f}" if row.stdev_latency else "-",
+        )
+    return table
+
+def display_heatmap(stats: KeyStats, limit: int = 10, min_hits: int = 20):
+    """Keyboard coloured by error rate, followed by the weakest keys and bigrams."""
+    keys = stats.weakest(limit=limit, min_hits=min_hits)
+    if not keys:
+        console.print(f"Not enough typing stored yet (keys need {min_hits} hits). Finish a few tests and try again.")
+        return
+    console.print(Panel(_keyboard(stats, min_hits), title="⌨️  Error Heatmap",
+                        subtitle="green <2%  yellow <5%  orange <10%  red ≥10%", border_style="blue"))
+    console.print(_weakness_table("Weakest Keys", "Key", keys))
+    bigrams = stats.weakest(bigrams=True, limit=limit, min_hits=min_hits)
+    if bigrams:
+        console.print(_weakness_table("Weakest Bigrams", "Bigram", bigrams))
+    console.print("[dim]Weakest = slowest on average, with each mistake counted as a second lost.[/]")
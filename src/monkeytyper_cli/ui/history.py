@@ -0,0 +1,69 @@
+# ui/history.py
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from typing import List, Optional
+import datetime
+
+from monkeytyper_cli.core.history import HistorySummary, StoredResult
+
+console = Console()
+
+def _format_time(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+def display_history(results: List[StoredResult], total: int, title: str = "Recent Results"):
+    """Lists stored results, newest first."""
+    if not results:
+        console.print("No tests stored yet.")
+        return
+
+    table = Table(title=f"{title} ({len(results)} of {total:,})", show_header=True, header_style="bold cyan")
+    table.add_column("Finished", style="dim", width=16)
+    table.add_column("Mode", width=12)
+    table.add_column("Lang", width=4)
+    table.add_column("WPM", justify="right", style="green")
+    table.add_column("Acc %", justify="right", style="blue")
+    table.add_column("Raw", justify="right")
+    table.add_column("Chars (C/I)", justify="center")
+
+    for result in results:
+        table.add_row(
+            _format_time(result.finished_at),
+            f"{result.mode} ({result.config_value})",
+            result.language,
+            f"{result.wpm:.1f}",
+            f"{result.accuracy:.1f}",
+            f"{result.raw_wpm:.1f}",
+            f"{result.correct_chars}/{result.incorrect_chars}",
+        )
+    console.print(table)
+
+def display_summary(summaries: List[HistorySummary], title: Optional[str] = None):
+    """Per mode/config aggregates; the last row holds the totals."""
+    if not summaries:
+        return
+    table = Table(title=title or "📈 Summary", show_header=True, header_style="bold magenta")
+    table.add_column("Mode")
+    table.add_column("Tests", justify="right")
+    table.add_column("Avg WPM", justify="right", style="green")
+    table.add_column("Best WPM", justify="right", style="bold green")
+    table.add_column("Acc %", justify="right", style="blue")
+    table.add_column("Typed", justify="right")
+    table.add_column("Since", justify="right", style="dim")
+
+    for i, summary in enumerate(summaries):
+        is_total = summary.mode is None
+        table.add_row(
+            "All" if is_total else f"{summary.mode} ({summary.config_value})",
+            f"{summary.tests:,}",
+            f"{summary.avg_wpm:.1f}",
+            f"{summary.best_wpm:.1f}",
+            f"{summary.avg_accuracy:.1f}",
+            str(datetime.timedelta(seconds=int(summary.time_typing))),
+            datetime.datetime.fromtimestamp(summary.first_at).strftime("%Y-%m-%d"),
+            style="bold" if is_total else None,
+            end_section=i == len(summaries) - 2, # Rule above the totals
+        )
+    console.print(Panel(table, border_style="magenta"))
@@ -0,0 +1,117 @@
+# Raw-mode keyboard input for the typing screen
+
+import codecs
+import os
+import platform
+import re
+import sys
+import time
+from typing import Any, List, NamedTuple, Optional
+
+if platform.system() == "Windows":
+    import msvcrt
+else:
+    import select
+    import termios
+    import tty
+
+READ_SIZE = 4096
+CTRL_C = "\x03"
+
+# CSI/SS3 sequences (arrow keys, function keys, ...) and lone ESC presses are not typing input.
+# An ESC that doesn't start a complete sequence is dropped on its own, keeping whatever follows it.
+_ESCAPE_SEQUENCE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|O[@-~])?")
+# The start of a sequence cut off by the end of a read; held back until the rest arrives
+_INCOMPLETE_ESCAPE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|O)?\Z")
+
+
+class KeyEvent(NamedTuple):
+    """A burst of characters that arrived together, stamped with their arrival time."""
+    chars: str
+    timestamp: float # time.monotonic() when the bytes were read
+
+
+class RawInput:
+    """Puts the terminal in raw mode once for a whole test and reads keystrokes in batches.
+
+    Use as a context manager; the previous terminal mode is restored on exit.
+    """
+
+    def __init__(self) -> None:
+        self._windows = platform.system() == "Windows"
+        self._fd: Optional[int] = None
+        self._old_settings: Optional[List[Any]] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = "" # Incomplete escape sequence from the end of the previous read
+
+    def __enter__(self) -> "RawInput":
+        if not self._windows:
+            self._fd = sys.stdin.fileno()
+            self._old_settings = termios.tcgetattr(self._fd)
+            tty.setraw(self._fd)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._fd is not None and self._old_settings is not None:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._old_settings)
+        self._fd = None
+        self._old_settings = None
+
+    def fileno(self) -> int:
+        if self._fd is None:
+            raise RuntimeError("RawInput is not active.")
+        return self._fd
+
+    def read(self, timeout: Optional[float] = None) -> List[KeyEvent]:
+        """Waits up to `timeout` seconds (forever if None) and returns every event available."""
+        if self._windows:
+            return self._read_windows(timeout)
+        fd = self.fileno()
+        if not select.select([fd], [], [], timeout)[0]:
+            return []
+        return self.read_available()
+
+    def read_available(self) -> List[KeyEvent]:
+        """Drains whatever input is pending without blocking."""
+        if self._windows:
+            return self._read_windows(0)
+        fd = self.fileno()
+        events = []
+        while select.select([fd], [], [], 0)[0]:
+            data = os.read(fd, READ_SIZE)
+            timestamp = time.monotonic()
+            if not data:
+                break
+            chars = self._strip_escapes(self._decoder.decode(data))
+            if chars:
+                events.append(KeyEvent(chars, timestamp))
+        return events
+
+    def _strip_escapes(self, text: str) -> str:
+        """Removes escape sequences from decoded input, holding back one split across reads."""
+        text = self._pending + text
+        incomplete = _INCOMPLETE_ESCAPE.search(text)
+        if incomplete is None:
+            self._pending = ""
+        else:
+            self._pending = text[incomplete.start():]
+            text = text[:incomplete.start()]
+        return _ESCAPE_SEQUENCE.sub("", text)
+
+    def _read_windows(self, timeout: Optional[float]) -> List[KeyEvent]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            time.sleep(0.001)
+
+        events = []
+        while msvcrt.kbhit():
+            char = msvcrt.getwch()
+            timestamp = time.monotonic()
+            if char in ("\x00", "\xe0"): # Prefix of a special key (arrows, F-keys)
+                msvcrt.getwch()
+                continue
+            if char != "\x1b":
+                events.append(KeyEvent(char, timestamp))
+        return events
@@ -3,48 +3,112 @@
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from typing import Dict, Any, List
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional
 import datetime
 
-from monkeytyper_cli.api.models import LeaderboardEntry
+from monkeytyper_cli.api.models import LeaderboardEntry, LeaderboardPage
+from monkeytyper_cli.core.snapshots import LeaderboardSnapshot
 
 console = Console()
 
-def display_leaderboard(leaderboard_data: List[LeaderboardEntry], mode: str, language: str):
+def _new_table(title: Optional[str] = None, show_header: bool = True) -> Table:
+    # Fixed widths so tables printed page by page line up as one list
+    table = Table(title=title, show_header=show_header, header_style="bold cyan")
+    table.add_column("Rank", style="dim", width=7, justify="right")
+    table.add_column("Name", width=25)
+    table.add_column("WPM", justify="right", style="green", width=7)
+    table.add_column("Acc %", justify="right", style="blue", width=6)
+    table.add_column("Raw", justify="right", width=7)
+    table.add_column("Date", justify="right", width=10)
+    return table
+
+def _add_entry_row(table: Table, entry: LeaderboardEntry, highlight: bool = False):
+    rank_str = str(entry.rank) if entry.rank is not None else "-"
+    name_str = entry.name or "-"
+    wpm_str = f"{entry.wpm:.2f}" if entry.wpm is not None else "-"
+    acc_str = f"{entry.acc:.2f}" if entry.acc is not None else "-"
+    raw_str = f"{entry.raw:.2f}" if entry.raw is not None else "-"
+    date_str = "-"
+    if entry.timestamp:
+        try:
+             date_str = datetime.datetime.fromtimestamp(entry.timestamp).strftime("%Y-%m-%d")
+        except ValueError:
+             pass
+
+    table.add_row(
+        rank_str,
+        name_str,
+        wpm_str,
+        acc_str,
+        raw_str,
+        date_str,
+        style="bold yellow" if highlight else None,
+    )
+
+def _title(mode: str, language: str) -> str:
+    return f"🏆 Leaderboard - {mode.capitalize()} ({language.upper()}) 🏆"
+
+def display_leaderboard(leaderboard_data: Iterable[LeaderboardEntry], mode: str, language: str):
+    leaderboard_data = list(leaderboard_data)
     if not leaderboard_data:
         console.print(Panel(f"[yellow]No leaderboard data available for {mode} ({language}).[/]", title="Leaderboard"))
         return
 
-    title = f"🏆 Leaderboard - {mode.capitalize()} ({language.upper()}) 🏆"
-    table = Table(title=title, show_header=True, header_style="bold cyan")
+    table = _new_table(_title(mode, language))
+    for entry in leaderboard_data:
+        _add_entry_row(table, entry)
 
-    table.add_column("Rank", style="dim", width=5, justify="right")
-    table.add_column("Name", width=25)
-    table.add_column("WPM", justify="right", style="green")
-    table.add_column("Acc %", justify="right", style="blue")
-    table.add_column("Raw", justify="right")
-    table.add_column("Date", justify="right")
+    console.print(Panel(table, border_style="cyan"))
 
-    for entry in leaderboard_data:
-        rank_str = str(entry.rank) if entry.rank is not None else "-"
-        name_str = entry.name or "-"
-        wpm_str = f"{entry.wpm:.2f}" if entry.wpm is not None else "-"
-        acc_str = f"{entry.acc:.2f}" if entry.acc is not None else "-"
-        raw_str = f"{entry.raw:.2f}" if entry.raw is not None else "-"
-        date_str = "-"
-        if entry.timestamp:
-            try:
-                 date_str = datetime.datetime.fromtimestamp(entry.timestamp).strftime("%Y-%m-%d")
-            except ValueError:
-                 pass
-        
-        table.add_row(
-            rank_str,
-            name_str,
-            wpm_str,
-            acc_str,
-            raw_str,
-            date_str
-        )
-
-    console.print(Panel(table, border_style="cyan")) 
\ No newline at end of file
+async def stream_leaderboard(pages: AsyncIterable[LeaderboardPage], mode: str, language: str) -> int:
+    """Prints leaderboard rows page by page as they arrive. Returns the number of rows shown."""
+    shown = 0
+    async for page in pages:
+        table = _new_table(_title(mode, language) if shown == 0 else None, show_header=shown == 0)
+        for entry in page.entries:
+            _add_entry_row(table, entry)
+        console.print(table)
+        shown += len(page.entries)
+    if shown == 0:
+        console.print(Panel(f"[yellow]No leaderboard data available for {mode} ({language}).[/]", title="Leaderboard"))
+    return shown
+
+def display_entry(entry: Optional[LeaderboardEntry], description: str, mode: str, language: str):
+    """Shows a single looked-up leaderboard entry (e.g. rank N or a user)."""
+    if entry is None:
+        console.print(f"[yellow]{description} not found on the {mode} ({language}) leaderboard.[/]")
+        return
+    table = _new_table(f"{description} - {mode.capitalize()} ({language.upper()})")
+    _add_entry_row(table, entry, highlight=True)
+    console.print(Panel(table, border_style="cyan"))
+
+def display_snapshot_history(snapshots: List[LeaderboardSnapshot], mode: str, language: str,
+                             wpm: Optional[float] = None):
+    """Lists the stored snapshots of a board, with the rank `wpm` had in each one."""
+    if not snapshots:
+        console.print(f"[yellow]No local snapshots of the {mode} ({language}) leaderboard yet.[/]")
+        return
+    table = Table(title=f"📸 Leaderboard Snapshots - {mode.capitalize()} ({language.upper()})",
+                  show_header=True, header_style="bold cyan")
+    table.add_column("Taken", justify="right")
+    table.add_column("Board Size", justify="right")
+    table.add_column("Rows Stored", justify="right")
+    table.add_column("Top WPM", justify="right", style="green")
+    if wpm is not None:
+        table.add_column(f"Rank @ {wpm:g} WPM", justify="right", style="bold yellow")
+
+    for snapshot in snapshots:
+        row = [
+            datetime.datetime.fromtimestamp(snapshot.taken_at).strftime("%Y-%m-%d %H:%M"),
+            f"{snapshot.total:,}",
+            f"{len(snapshot):,}",
+            f"{snapshot.wpms[-1]:.2f}" if len(snapshot) else "-",
+        ]
+        if wpm is not None:
+            standing = snapshot.standing(wpm)
+            if standing is None:
+                row.append("-")
+            else:
+                row.append(f"{'' if standing.exact else '~'}#{standing.rank:,} ({standing.top_percent:.1f}%)")
+        table.add_row(*row)
+    console.print(Panel(table, border_style="cyan"))
@@ -0,0 +1,68 @@
+# ui/local_stats.py
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+import datetime
+
+from monkeytyper_cli.core.analytics import PERCENTILES, LocalStats
+
+console = Console()
+
+BAR_WIDTH = 20
+
+def _date(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+def display_local_stats(stats: LocalStats):
+    """Renders the analytics computed from the local result history."""
+    console.print(Panel(
+        f"[bold]{stats.tests:,}[/] tests from {_date(stats.first_at)} to {_date(stats.last_at)}",
+        title="📊 Local Stats", border_style="blue",
+    ))
+
+    if stats.rolling:
+        table = Table(title="Rolling Averages", show_header=True, header_style="bold cyan")
+        table.add_column("Last N Tests", justify="right")
+        table.add_column("WPM", justify="right", style="green")
+        table.add_column("Best N-Test WPM", justify="right", style="bold green")
+        table.add_column("Acc %", justify="right", style="blue")
+        for rolling in stats.rolling:
+            table.add_row(str(rolling.window), f"{rolling.current_wpm:.1f}",
+                          f"{rolling.best_wpm:.1f}", f"{rolling.current_accuracy:.1f}")
+        console.print(table)
+
+    table = Table(title="By Mode", show_header=True, header_style="bold cyan")
+    table.add_column("Mode")
+    table.add_column("Tests", justify="right")
+    table.add_column("Avg WPM", justify="right", style="green")
+    for p in PERCENTILES:
+        table.add_column(f"p{p}", justify="right")
+    table.add_column("Acc %", justify="right", style="blue")
+    table.add_column("Trend/wk", justify="right")
+    for group in stats.groups:
+        trend = group.slope_per_week
+        trend_str = f"[green]+{trend:.2f}[/]" if trend > 0 else (f"[red]{trend:.2f}[/]" if trend < 0 else "-")
+        table.add_row(
+            f"{group.mode} ({group.config_value})",
+            f"{group.tests:,}",
+            f"{group.mean_wpm:.1f}",
+            *(f"{value:.1f}" for value in group.percentiles),
+            f"{group.mean_accuracy:.1f}",
+            trend_str,
+        )
+    console.print(table)
+
+    if stats.hours:
+        table = Table(title="Time of Day", show_header=True, header_style="bold cyan")
+        table.add_column("Hour", justify="right")
+        table.add_column("Tests", justify="right")
+        table.add_column("Avg WPM", justify="right", style="green")
+        table.add_column("Acc %", justify="right", style="blue")
+        table.add_column("")
+        best = max(hour.mean_wpm for hour in stats.hours)
+        for hour in stats.hours:
+            bar = "█" * max(1, round(BAR_WIDTH * hour.mean_wpm / best)) if best > 0 else ""
+            table.add_row(f"{hour.hour:02d}:00", f"{hour.tests:,}", f"{hour.mean_wpm:.1f}",
+                          f"{hour.mean_accuracy:.1f}", f"[green]{bar}[/]")
+        console.print(table)
@@ -0,0 +1,251 @@
+# Keystroke-to-frame latency profiling for `start --profile`
+
+from array import array
+import heapq
+import json
+import pathlib
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+SUB_BUCKET_BITS = 4 # 16 linear sub-buckets per power of two: values are kept to within ~6%
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 32 # Values up to 2**37 ns (~2 min); anything longer lands in the last bucket
+WORST_FRAMES = 5
+MAX_TRACE_EVENTS = 500_000 # Roughly 50MB of trace JSON; later events are dropped
+TOP_ALLOCATIONS = 5
+
+# Stages in the order they happen for a keystroke
+STAGES = ("read", "process_input", "create_prompt_display", "render", "write", "frame", "key_to_frame")
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of durations (HdrHistogram-style buckets, in ns).
+
+    Recording is O(1) and the memory use is the same for ten samples or ten million.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = array("Q", bytes(8 * (MAX_EXPONENT + 2) * SUB_BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        exponent = min(value.bit_length() - SUB_BUCKET_BITS - 1, MAX_EXPONENT)
+        sub = min(value >> exponent, 2 * SUB_BUCKETS - 1)
+        return (exponent + 1) * SUB_BUCKETS + sub - SUB_BUCKETS
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Midpoint of a bucket."""
+        if index < SUB_BUCKETS:
+            return index
+        exponent = index // SUB_BUCKETS - 1
+        sub = index % SUB_BUCKETS + SUB_BUCKETS
+        return (sub << exponent) + ((1 << exponent) >> 1)
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        value = int(seconds * 1e9) if seconds > 0 else 0
+        self.counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Seconds below which `p` percent of the samples fall."""
+        if not self.count:
+            return 0.0
+        if p >= 100:
+            return self.max / 1e9
+        rank = max(1, round(p / 100 * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                if index == len(self.counts) - 1: # Clamped values: the bucket has no midpoint
+                    return self.max / 1e9
+                return min(self._value(index), self.max) / 1e9
+        return self.max / 1e9
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1e9 if self.count else 0.0
+
+
+class FrameTiming(NamedTuple):
+    total: float # Seconds from starting to build the frame to the end of the terminal write
+    frame: int
+    at: float # Seconds since profiling started
+    keys: int # Keystrokes the frame was the first to show
+    build: float
+    render: float
+    write: float
+
+
+class StageProfiler:
+    """Collects per-stage timings for one test.
+
+    The game loop and renderer only call into this when profiling is enabled; with
+    `trace` set, every timed span is also kept for a Chrome trace file.
+    """
+
+    def __init__(self, trace: bool = False, worst: int = WORST_FRAMES):
+        self.histograms: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self.worst: List[FrameTiming] = [] # Min-heap of the slowest frames
+        self.worst_count = worst
+        self.frames = 0
+        self.origin = time.perf_counter()
+        self.trace_events: Optional[List[Tuple[str, float, float, int]]] = [] if trace else None
+        self.trace_dropped = 0
+        self._pending_keys: List[Tuple[float, int]] = [] # (time.monotonic() of arrival, keys) not yet on screen
+
+    def record(self, stage: str, started: float, seconds: float, count: int = 1) -> None:
+        """Adds a span that began at perf_counter() `started`; `count` keys share it evenly."""
+        self.histograms[stage].record(seconds / count if count > 1 else seconds, count)
+        if self.trace_events is not None:
+            if len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append((stage, started, seconds, count))
+            else:
+                self.trace_dropped += 1
+
+    def keys_arrived(self, timestamp: float, count: int) -> None:
+        self._pending_keys.append((timestamp, count))
+
+    def frame_done(self, started: float, build: float, render: float, write: float) -> None:
+        """Records a drawn frame, and how long its new keystrokes waited to be seen."""
+        self.frames += 1
+        total = build + render + write
+        self.record("create_prompt_display", started, build)
+        self.record("render", started + build, render)
+        self.record("write", started + build + render, write)
+        self.record("frame", started, total)
+
+        keys = 0
+        if self._pending_keys:
+            shown = time.monotonic()
+            histogram = self.histograms["key_to_frame"]
+            for arrived, count in self._pending_keys:
+                histogram.record(shown - arrived, count)
+                keys += count
+            self._pending_keys.clear()
+
+        timing = FrameTiming(total, self.frames, started - self.origin, keys, build, render, write)
+        if len(self.worst) < self.worst_count:
+            heapq.heappush(self.worst, timing)
+        elif total > self.worst[0].total:
+            heapq.heapreplace(self.worst, timing)
+
+    def worst_frames(self) -> List[FrameTiming]:
+        return sorted(self.worst, reverse=True)
+
+    def write_trace(self, path: pathlib.Path) -> int:
+        """Writes the spans as a Chrome trace (chrome://tracing, Perfetto). Returns the event count."""
+        if self.trace_events is None:
+            raise ValueError("Profiler was created without trace=True.")
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "monkeytyper-cli"}}]
+        for stage, started, seconds, count in self.trace_events:
+            events.append({
+                "name": stage,
+                "cat": "keystroke" if stage in ("read", "process_input") else "frame",
+                "ph": "X",
+                "pid": 1,
+                "tid": 1,
+                "ts": round((started - self.origin) * 1e6, 3),
+                "dur": round(seconds * 1e6, 3),
+                "args": {"keys": count} if count > 1 else {},
+            })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events) - 1
+
+
+class MemorySummary(NamedTuple):
+    current: int # Bytes traced at the end of the test
+    peak: int
+    top: List[Tuple[str, int, int]] # (file:line, bytes, blocks) of the largest live allocation sites
+
+
+def start_memory_tracing() -> None:
+    tracemalloc.start()
+
+
+def stop_memory_tracing(limit: int = TOP_ALLOCATIONS) -> MemorySummary:
+    """Stops tracemalloc and summarises what the test allocated."""
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    tracemalloc.stop()
+    top = [
+        # The last two path parts (package/module.py) are enough to tell sites apart
+        (f"{'/'.join(pathlib.PurePath(stat.traceback[0].filename).parts[-2:])}:{stat.traceback[0].lineno}",
+         stat.size, stat.count)
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+    return MemorySummary(current, peak, top)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}"
+
+
+def display_profile(profiler: StageProfiler, memory: Optional[MemorySummary] = None):
+    """Per-stage latency percentiles, the slowest frames and (if traced) memory use."""
+    table = Table(title="⏱️  Latency Profile (ms)", show_header=True, header_style="bold cyan")
+    table.add_column("Stage")
+    table.add_column("Count", justify="right")
+    for column in ("Mean", "p50", "p95", "p99", "Max"):
+        table.add_column(column, justify="right")
+    for stage in STAGES:
+        histogram = profiler.histograms[stage]
+        if not histogram.count:
+            continue
+        table.add_row(
+            stage,
+            f"{histogram.count:,}",
+            _ms(histogram.mean),
+            *(_ms(histogram.percentile(p)) for p in (50, 95, 99)),
+            _ms(histogram.max / 1e9),
+            style="bold" if stage == "key_to_frame" else None,
+        )
+    console.print(table)
+    console.print("[dim]process_input is per keystroke; key_to_frame is from the key being read to its frame being written.[/]")
+
+    worst = profiler.worst_frames()
+    if worst:
+        table = Table(title="Slowest Frames (ms)", show_header=True, header_style="bold cyan")
+        table.add_column("Frame", justify="right")
+        table.add_column("At (s)", justify="right")
+        table.add_column("Keys", justify="right")
+        table.add_column("Build", justify="right")
+        table.add_column("Render", justify="right")
+        table.add_column("Write", justify="right")
+        table.add_column("Total", justify="right", style="bold red")
+        for timing in worst:
+            table.add_row(str(timing.frame), f"{timing.at:.2f}", str(timing.keys),
+                          _ms(timing.build), _ms(timing.render), _ms(timing.write), _ms(timing.total))
+        console.print(table)
+
+    if memory is not None:
+        table = Table(title=f"Memory (peak {memory.peak / 1024:,.0f} KiB, end {memory.current / 1024:,.0f} KiB)",
+                      show_header=True, header_style="bold cyan")
+        table.add_column("Largest Live Allocations")
+        table.add_column("KiB", justify="right")
+        table.add_column("Blocks", justify="right")
+        for location, size, blocks in memory.top:
+            table.add_row(location, f"{size / 1024:,.1f}", f"{blocks:,}")
+        console.print(table)
@@ -4,46 +4,156 @@ from rich.console import Console, Group
 from rich.text import Text
 from rich.table import Table
 from rich.panel import Panel
+import bisect
 import time
+from typing import Container, Dict, List, Optional, Tuple
 
 from monkeytyper_cli.core.models import GameState, TestResult, GameMode
 
 console = Console()
 
-# Store the Live object globally or pass it around?
-# For simplicity in this structure, let's keep the logic of *what* to display here,
-# and let main.py handle the Live context.
+VISIBLE_LINES = 3 # Lines of the prompt shown at once, Monkeytype-style
+
+TYPED_STYLE = "bold green"
+ERROR_STYLE = "bold red"
+CURSOR_STYLE = "reverse bold blue"
+PENDING_STYLE = "dim grey50"
+
+
+class PromptLayout:
+    """Word-wrapped line layout of a prompt for one display width.
+
+    Built once per prompt and width. Lines that are entirely typed or entirely
+    pending are styled once and cached, so a frame only re-styles the cursor line.
+    """
+
+    def __init__(self, prompt_text: str, width: int):
+        self.prompt_text = prompt_text
+        self.width = max(1, width)
+        self.line_starts: List[int] = []
+        self._pending_lines: Dict[int, Text] = {}
+        self._typed_lines: Dict[int, Text] = {}
+        self._wrap()
+
+    def _wrap(self, line_start: int = 0) -> None:
+        text = self.prompt_text
+        width = self.width
+        pos = line_start
+        self.line_starts.append(line_start)
+        while pos < len(text):
+            space = text.find(' ', pos)
+            word_end = len(text) if space == -1 else space + 1
+            if word_end - line_start > width and pos > line_start:
+                line_start = pos
+                self.line_starts.append(line_start)
+            while word_end - line_start > width: # Word longer than a whole line
+                line_start += width
+                self.line_starts.append(line_start)
+            pos = word_end
+
+    def extend(self, prompt_text: str) -> None:
+        """Adopts a longer prompt that starts with the current one, re-wrapping only its tail."""
+        last_line = len(self.line_starts) - 1
+        self.prompt_text = prompt_text
+        self._pending_lines.pop(last_line, None)
+        self._typed_lines.pop(last_line, None)
+        self._wrap(self.line_starts.pop())
+
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, index: int) -> int:
+        """Returns the line holding the char at `index`."""
+        return max(0, bisect.bisect_right(self.line_starts, index) - 1)
+
+    def line_bounds(self, line: int) -> Tuple[int, int]:
+        start = self.line_starts[line]
+        end = self.line_starts[line + 1] if line + 1 < len(self.line_starts) else len(self.prompt_text)
+        return start, end
+
+    def _line_chars(self, line: int) -> str:
+        start, end = self.line_bounds(line)
+        return self.prompt_text[start:end].replace(' ', '·')
+
+    def pending_line(self, line: int) -> Text:
+        """A line the cursor has not reached yet."""
+        if line not in self._pending_lines:
+            self._pending_lines[line] = Text(self._line_chars(line), style=PENDING_STYLE)
+        return self._pending_lines[line]
+
+    def typed_line(self, line: int, error_indices: Container[int]) -> Text:
+        """A line the cursor has moved past."""
+        if line not in self._typed_lines:
+            self._typed_lines[line] = self.styled_line(line, self.line_bounds(line)[1], error_indices)
+        return self._typed_lines[line]
+
+    def styled_line(self, line: int, cursor: int, error_indices: Container[int]) -> Text:
+        """Styles a line with spans: typed runs (correct/error), the cursor, then pending chars."""
+        start, end = self.line_bounds(line)
+        text = Text(self._line_chars(line))
+        typed_end = min(cursor, end)
+
+        run_start = start
+        run_is_error = start in error_indices
+        for i in range(start + 1, typed_end + 1):
+            is_error = i < typed_end and i in error_indices
+            if i == typed_end or is_error != run_is_error:
+                text.stylize(ERROR_STYLE if run_is_error else TYPED_STYLE, run_start - start, i - start)
+                run_start = i
+                run_is_error = is_error
+
+        if start <= cursor < end:
+            text.stylize(CURSOR_STYLE, cursor - start, cursor - start + 1)
+            text.stylize(PENDING_STYLE, cursor - start + 1, end - start)
+        return text
+
+    def visible_lines(self, cursor: int, error_indices: Container[int]) -> List[Text]:
+        """Returns the lines to show around the cursor."""
+        cursor_line = self.line_of(cursor)
+        first = max(0, min(cursor_line - 1, self.line_count() - VISIBLE_LINES))
+        last = min(self.line_count(), first + VISIBLE_LINES)
+
+        # Typed lines only stay valid while the cursor is past them (backspace can return to them)
+        for line in [line for line in self._typed_lines if line >= cursor_line or line < first]:
+            del self._typed_lines[line]
+        for line in [line for line in self._pending_lines if line <= cursor_line]:
+            del self._pending_lines[line]
+
+        lines = []
+        for line in range(first, last):
+            if line < cursor_line:
+                lines.append(self.typed_line(line, error_indices))
+            elif line == cursor_line:
+                lines.append(self.styled_line(line, cursor, error_indices))
+            else:
+                lines.append(self.pending_line(line))
+        return lines
+
+
+_layout: Optional[PromptLayout] = None
+
+
+def get_prompt_layout(prompt_text: str, width: int) -> PromptLayout:
+    """Returns the cached layout, recomputing it only for a new prompt or a resize.
+
+    A prompt that was extended in place only has its last line re-wrapped.
+    """
+    global _layout
+    if _layout is not None and _layout.prompt_text is not prompt_text and _layout.width == max(1, width):
+        if len(prompt_text) > len(_layout.prompt_text) and prompt_text.startswith(_layout.prompt_text):
+            _layout.extend(prompt_text) # Time-mode prompt grew ahead of the cursor
+    if _layout is None or _layout.prompt_text is not prompt_text or _layout.width != max(1, width):
+        _layout = PromptLayout(prompt_text, width)
+    return _layout
+
 
 def create_prompt_display(game_state: GameState) -> Panel:
     """Creates a Rich Renderable object representing the current game state."""
-    prompt_text = game_state.prompt_text
-    user_input_text = game_state.user_input_text
-    error_indices = game_state.error_indices
-    current_index = len(user_input_text)
-
-    # Calculate visible portion of text
-    console_width = console.width - 6  # Account for panel borders and padding
-    visible_chars = console_width
-    
-    # Center the text in view
-    start_index = max(0, current_index - (visible_chars // 2))
-    end_index = min(len(prompt_text), start_index + visible_chars)
-    
-    # Create the display text
-    display = Text()
-    
-    for i in range(start_index, end_index):
-        char = prompt_text[i]
-        display_char = '·' if char == ' ' else char
-        
-        if i < current_index:
-            style = "bold green" if i not in error_indices else "bold red"
-        elif i == current_index:
-            style = "reverse bold blue"
-        else:
-            style = "dim grey50"
-            
-        display.append(display_char, style=style)
+    user_input_chars = game_state.user_input_chars
+    current_index = len(user_input_chars)
+
+    layout = get_prompt_layout(game_state.prompt_text, console.width - 6)  # Account for panel borders and padding
+    display = Text("\n").join(layout.visible_lines(current_index, game_state.error_indices))
 
     # Add status information
     elapsed_time = game_state.time_elapsed()
@@ -53,8 +163,8 @@ def create_prompt_display(game_state: GameState) -> Panel:
         time_left = max(0, game_state.config_value - elapsed_time)
         status.append(f"Time: {time_left:.1f}s", style="yellow")
     else:
-        words_typed = user_input_text.count(' ')
-        if user_input_text and not user_input_text.endswith(' '):
+        words_typed = game_state.current_word_index
+        if user_input_chars and user_input_chars[-1] != ' ':
             words_typed += 1
         status.append(f"Words: {words_typed}/{game_state.config_value}", style="yellow")
 
@@ -0,0 +1,174 @@
+# Differential terminal renderer for the typing screen
+
+import sys
+import time
+from typing import List, Optional, TextIO, Tuple
+
+from rich.cells import get_character_cell_size
+from rich.console import COLOR_SYSTEMS, Console, RenderableType
+from rich.style import Style
+
+Cell = Tuple[str, Optional[Style]]
+
+# ANSI escape codes
+SYNC_START = "\033[?2026h" # Terminals supporting synchronized output hold the frame until SYNC_END
+SYNC_END = "\033[?2026l"
+HIDE_CURSOR = "\033[?25l"
+SHOW_CURSOR = "\033[?25h"
+CLEAR_SCREEN = "\033[2J\033[H"
+CLEAR_LINE_END = "\033[K"
+CLEAR_BELOW = "\033[J"
+
+
+def _move_to(row: int, column: int = 0) -> str:
+    return f"\033[{row + 1};{column + 1}H"
+
+
+class RenderStats:
+    """Per-frame render time and bytes written."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_bytes = 0
+        self.max_bytes = 0
+
+    def add(self, seconds: float, written: int) -> None:
+        self.frames += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.total_bytes += written
+        self.max_bytes = max(self.max_bytes, written)
+
+    def summary(self) -> str:
+        if not self.frames:
+            return "No frames rendered."
+        return (
+            f"{self.frames} frames, "
+            f"avg {self.total_seconds / self.frames * 1000:.2f}ms / max {self.max_seconds * 1000:.2f}ms, "
+            f"avg {self.total_bytes / self.frames:.0f}B / max {self.max_bytes}B written per frame"
+        )
+
+
+class FrameRenderer:
+    """Draws renderables full-screen, rewriting only the cells that changed since the last frame.
+
+    Each frame is rendered to a grid of styled cells, diffed row by row against the previous
+    one and sent to the terminal as a single write wrapped in synchronized-update escapes.
+    """
+
+    def __init__(self, console: Console, stream: Optional[TextIO] = None):
+        self.console = console
+        self.stream = stream or sys.stdout
+        self.stats = RenderStats()
+        self.last_write_seconds = 0.0 # Terminal write part of the latest frame
+        self._previous: List[List[Cell]] = []
+        self._width: Optional[int] = None
+        self._color_system = COLOR_SYSTEMS.get(console.color_system or "")
+
+    def __enter__(self) -> "FrameRenderer":
+        self._write(HIDE_CURSOR + CLEAR_SCREEN)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._write(_move_to(len(self._previous)) + SHOW_CURSOR)
+        self._previous = []
+        self._width = None
+
+    def _render_cells(self, renderable: RenderableType, width: int) -> List[List[Cell]]:
+        options = self.console.options.update_width(width)
+        rows = []
+        for line in self.console.render_lines(renderable, options, pad=True):
+            cells: List[Cell] = []
+            for text, style, control in line:
+                if control:
+                    continue
+                for char in text:
+                    cells.append((char, style))
+                    if get_character_cell_size(char) == 2:
+                        cells.append(("", style)) # Placeholder so list index == column
+            rows.append(cells)
+        return rows
+
+    def _styled(self, cells: List[Cell]) -> str:
+        """Turns a run of cells into text with escape codes, one code per style change."""
+        out = []
+        run: List[str] = []
+        run_style = cells[0][1]
+        for char, style in cells:
+            if style != run_style:
+                out.append(self._render_run("".join(run), run_style))
+                run = []
+                run_style = style
+            run.append(char)
+        out.append(self._render_run("".join(run), run_style))
+        return "".join(out)
+
+    def _render_run(self, text: str, style: Optional[Style]) -> str:
+        if style is None or self._color_system is None:
+            return text
+        return style.render(text, color_system=self._color_system)
+
+    def _write(self, data: str) -> int:
+        encoded = data.encode("utf-8")
+        buffer = getattr(self.stream, "buffer", None)
+        if buffer is not None:
+            self.stream.flush()
+            buffer.write(encoded)
+            buffer.flush()
+        else:
+            self.stream.write(data)
+            self.stream.flush()
+        return len(encoded)
+
+    def render(self, renderable: RenderableType) -> None:
+        """Draws one frame."""
+        started = time.perf_counter()
+
+        if self.console.legacy_windows:
+            self.console.clear()
+            self.console.print(renderable)
+            self.last_write_seconds = 0.0 # Not separable from rendering here
+            self.stats.add(time.perf_counter() - started, 0)
+            return
+
+        width = self.console.width
+        rows = self._render_cells(renderable, width)
+
+        out = [SYNC_START]
+        previous = self._previous
+        if width != self._width:
+            out.append(CLEAR_SCREEN)
+            previous = []
+            self._width = width
+
+        for row, cells in enumerate(rows):
+            if row >= len(previous) or len(previous[row]) != len(cells):
+                if cells:
+                    out.append(_move_to(row) + self._styled(cells) + CLEAR_LINE_END)
+                continue
+            old = previous[row]
+            first = 0
+            while first < len(cells) and cells[first] == old[first]:
+                first += 1
+            if first == len(cells):
+                continue
+            last = len(cells) - 1
+            while cells[last] == old[last]:
+                last -= 1
+            while first > 0 and cells[first][0] == "": # Don't start inside a wide character
+                first -= 1
+            out.append(_move_to(row, first) + self._styled(cells[first:last + 1]))
+        if len(rows) < len(previous):
+            out.append(_move_to(len(rows)) + CLEAR_BELOW)
+        out.append(_move_to(len(rows)))
+        out.append(SYNC_END)
+
+        self._previous = rows
+        data = "".join(out)
+        write_started = time.perf_counter()
+        written = self._write(data)
+        finished = time.perf_counter()
+        self.last_write_seconds = finished - write_started
+        self.stats.add(finished - started, written)
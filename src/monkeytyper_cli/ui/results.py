@@ -3,13 +3,31 @@
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+import datetime
+from typing import Optional
 
 from monkeytyper_cli.core.models import TestResult
+from monkeytyper_cli.core.snapshots import Standing
 
 console = Console()
 
-def display_results(result: TestResult):
-    """Displays the final test results in a formatted table."""
+def _format_standing(standing: Standing, previous: Optional[Standing]) -> str:
+    rank = f"#{standing.rank:,}" if standing.exact else f"~#{standing.rank:,}"
+    text = f"[bold yellow]{rank}[/] of {standing.total:,} (top {standing.top_percent:.1f}%)"
+    if previous is not None and previous.rank != standing.rank:
+        change = previous.rank - standing.rank # Positive: the same WPM ranks better now
+        arrow = "[green]▲" if change > 0 else "[red]▼"
+        text += f" {arrow}{abs(change):,}[/]"
+    as_of = datetime.datetime.fromtimestamp(standing.taken_at).strftime("%Y-%m-%d %H:%M")
+    return f"{text} [dim]as of {as_of}[/]"
+
+def display_results(result: TestResult, standing: Optional[Standing] = None,
+                    previous_standing: Optional[Standing] = None):
+    """Displays the final test results in a formatted table.
+
+    `standing` is where the WPM would place on the local leaderboard snapshot, and
+    `previous_standing` the same for the snapshot before it.
+    """
 
     table = Table(title="🏁 Test Results 🏁", show_header=True, header_style="bold magenta")
     table.add_column("Metric", style="dim", width=20)
@@ -18,9 +36,13 @@ def display_results(result: TestResult):
     table.add_row("WPM (Correct)", f"[bold green]{result.wpm:.2f}[/]")
     table.add_row("Accuracy", f"[bold blue]{result.accuracy:.2f}%[/]")
     table.add_row("Raw WPM", f"{result.raw_wpm:.2f}")
+    if result.consistency is not None:
+        table.add_row("Consistency", f"{result.consistency:.2f}%")
     table.add_row("Correct Characters", f"[green]{result.correct_chars}[/]")
     table.add_row("Incorrect Characters", f"[red]{result.incorrect_chars}[/]")
     table.add_row("Time Elapsed", f"{result.time_elapsed_seconds:.2f}s")
     table.add_row("Mode", f"{result.mode.value} ({result.config_value})")
+    if standing is not None:
+        table.add_row("Global Rank", _format_standing(standing, previous_standing))
 
     console.print(Panel(table, border_style="blue")) 
\ No newline at end of file
@@ -0,0 +1,58 @@
+# ui/simulate.py
+
+from rich.console import Console
+from rich.table import Table
+
+from monkeytyper_cli.core.simulate import Simulation
+
+console = Console()
+
+METRIC_LABELS = {
+    "wpm": "WPM",
+    "raw_wpm": "Raw WPM",
+    "accuracy": "Accuracy %",
+    "consistency": "Consistency %",
+    "time_elapsed_seconds": "Duration (s)",
+}
+
+def display_simulation(simulation: Simulation):
+    """Result distributions over the simulated games, throughput and any failed checks."""
+    scenario, typist = simulation.scenario, simulation.scenario.typist
+    table = Table(
+        title=f"🤖 {simulation.games:,} Simulated Tests ({scenario.mode.value} {scenario.config_value}, "
+              f"{scenario.language}, seed {simulation.seed})",
+        show_header=True, header_style="bold cyan",
+    )
+    table.add_column("Metric", style="bold")
+    for column in ("Mean", "± SD", "p5", "p50", "p95", "Min", "Max"):
+        table.add_column(column, justify="right")
+    for name, label in METRIC_LABELS.items():
+        summary = simulation.distributions.get(name)
+        if summary is None:
+            continue
+        table.add_row(label, *(f"{value:.2f}" for value in summary[1:]))
+    console.print(table)
+    console.print(
+        f"[dim]Typists: {typist.wpm:g} ± {typist.wpm_spread:g} WPM, {typist.error_rate:.0%} errors, "
+        f"{typist.correction_rate:.0%} corrected"
+        + (f", bursts of ~{typist.burst:g} chars with {typist.pause:g}s pauses" if typist.burst else "")
+        + ".[/]"
+    )
+
+    seconds = max(simulation.seconds, 1e-9)
+    console.print(
+        f"{simulation.keystrokes:,} keystrokes in {simulation.seconds:.2f}s on {simulation.workers} "
+        f"worker{'s' if simulation.workers != 1 else ''}: [bold]{simulation.games / seconds:,.0f}[/] tests/s, "
+        f"[bold]{simulation.keystrokes / seconds:,.0f}[/] keys/s"
+    )
+
+    if not scenario.check:
+        return
+    if not simulation.failure_count:
+        console.print(f"[green]All {simulation.games:,} tests passed the recount and replay checks.[/]")
+        return
+    console.print(f"[bold red]{simulation.failure_count:,} of {simulation.games:,} tests failed the checks:[/]")
+    for failure in simulation.failures:
+        console.print(f"  {failure}", markup=False)
+    if simulation.failure_count > len(simulation.failures):
+        console.print(f"  ... and {simulation.failure_count - len(simulation.failures):,} more")
@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from monkeytyper_cli.api.cache import CacheEntry, ResponseCache
+from monkeytyper_cli.api import client as client_module
+from monkeytyper_cli.api.client import APIClient, RequestDeadlineExceeded
+from monkeytyper_cli.api.ratelimit import RateLimiter, RetryPolicy
+
+BASE_URL = "https://api.test"
+NO_DELAY = RetryPolicy(max_attempts=3, base_delay=0.0)
+
+
+def make_client(handler, **kwargs) -> APIClient:
+    kwargs.setdefault("retry_policy", NO_DELAY)
+    return APIClient(base_url=BASE_URL, api_key="key", http2=False,
+                     transport=httpx.MockTransport(handler), **kwargs)
+
+
+def get(client: APIClient, endpoint: str) -> dict:
+    async def run() -> dict:
+        try:
+            return await client.get(endpoint)
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+class FakeTime:
+    """Virtual clock for the rate limiter, advanced by the patched asyncio.sleep."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch) -> FakeTime:
+    fake = FakeTime()
+    monkeypatch.setattr(client_module.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def responses(*statuses: int, headers=None):
+    """A handler answering with these statuses in turn, recording the requests."""
+    handler_statuses = list(statuses)
+
+    def handler(request):
+        handler.calls.append(request)
+        return httpx.Response(handler_statuses.pop(0), headers=headers, json={"ok": True})
+
+    handler.calls = []
+    return handler
+
+
+def test_429_waits_for_retry_after(fake_time):
+    handler = responses(429, 200, headers={"Retry-After": "3"})
+    client = make_client(handler, rate_limiter=RateLimiter(fake_time.clock))
+    assert get(client, "/test") == {"ok": True}
+    assert len(handler.calls) == 2
+    # The backoff (at most base_delay) is shorter, so the server's wait wins
+    assert fake_time.sleeps == [3.0]
+
+
+def test_backoff_is_jittered_and_grows(fake_time):
+    policy = RetryPolicy(max_attempts=4, base_delay=1.0)
+    handler = responses(503, 502, 504, 200)
+    client = make_client(handler, retry_policy=policy, rng=random.Random(5),
+                         rate_limiter=RateLimiter(fake_time.clock))
+    assert get(client, "/test") == {"ok": True}
+    expected_rng = random.Random(5)
+    assert fake_time.sleeps == [policy.backoff(attempt, expected_rng) for attempt in (1, 2, 3)]
+    for attempt, delay in enumerate(fake_time.sleeps, 1):
+        assert 0 <= delay <= policy.base_delay * 2 ** (attempt - 1)
+
+
+def test_retries_stop_at_max_attempts(fake_time):
+    handler = responses(503, 503, 503)
+    client = make_client(handler, rate_limiter=RateLimiter(fake_time.clock))
+    with pytest.raises(httpx.HTTPStatusError):
+        get(client, "/test")
+    assert len(handler.calls) == NO_DELAY.max_attempts
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 422])
+def test_client_errors_are_not_retried(fake_time, status):
+    handler = responses(status)
+    client = make_client(handler, rate_limiter=RateLimiter(fake_time.clock))
+    with pytest.raises(httpx.HTTPStatusError):
+        get(client, "/test")
+    assert len(handler.calls) == 1
+    assert fake_time.sleeps == []
+
+
+def test_retry_after_past_the_deadline_gives_up_at_once():
+    handler = responses(503, 200, headers={"Retry-After": "60"})
+    client = make_client(handler, retry_policy=RetryPolicy(max_attempts=3, deadline=5.0))
+    started = time.monotonic()
+    with pytest.raises(RequestDeadlineExceeded):
+        get(client, "/test")
+    assert len(handler.calls) == 1
+    assert time.monotonic() - started < 5.0
+
+
+def test_slow_response_hits_the_deadline():
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    client = make_client(handler, retry_policy=RetryPolicy(deadline=0.2))
+    started = time.monotonic()
+    with pytest.raises(RequestDeadlineExceeded):
+        get(client, "/test")
+    assert time.monotonic() - started < 2.0
+
+
+def test_retries_can_be_turned_off_in_the_settings(monkeypatch):
+    monkeypatch.setenv("API_MAX_ATTEMPTS", "1")
+    client_module.get_settings.cache_clear()
+    try:
+        client = APIClient(base_url=BASE_URL, http2=False, transport=httpx.MockTransport(responses(503)))
+    finally:
+        client_module.get_settings.cache_clear()
+    assert client.retry_policy.max_attempts == 1
+    with pytest.raises(httpx.HTTPStatusError):
+        get(client, "/test")
+
+
+def cache_with_expired_stats(directory) -> ResponseCache:
+    """A cache holding a /users/stats body too old to be served without asking the server."""
+    cache = ResponseCache(directory)
+    key = ResponseCache.key(BASE_URL, "/users/stats", None, "key")
+    cache.put(key, CacheEntry(body={"data": "cached"}, stored_at=time.time() - 7 * 24 * 3600))
+    return cache
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_outages_fall_back_to_the_cached_entry(tmp_path, status):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(status)
+
+    client = make_client(handler, cache=cache_with_expired_stats(tmp_path))
+    assert get(client, "/users/stats") == {"data": "cached"}
+    assert len(calls) == NO_DELAY.max_attempts
+
+
+def test_client_errors_are_not_hidden_by_the_cache(tmp_path):
+    client = make_client(lambda request: httpx.Response(404), cache=cache_with_expired_stats(tmp_path))
+    with pytest.raises(httpx.HTTPStatusError):
+        get(client, "/users/stats")
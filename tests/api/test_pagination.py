@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+
+import httpx
+import pytest
+
+from monkeytyper_cli.api.client import APIClient
+from monkeytyper_cli.api.pagination import LeaderboardPager
+from monkeytyper_cli.api.ratelimit import RateLimiter
+
+BOARD_SIZE = 237
+PAGE_SIZE = 10
+# Sorted by WPM, with a tie spanning the boundary between pages 4 and 5
+BOARD = [{"uid": f"u{i}", "name": f"User{i}", "wpm": 200.0 - i if not 38 <= i <= 52 else 160.0}
+         for i in range(BOARD_SIZE)]
+
+
+def board_handler(report_count: bool, unranked: bool = False):
+    def handler(request):
+        page = int(request.url.params["page"])
+        size = int(request.url.params["pageSize"])
+        handler.pages.append(page)
+        entries = [dict(entry) for entry in BOARD[page * size:(page + 1) * size]]
+        if not unranked:
+            for offset, entry in enumerate(entries):
+                entry["rank"] = page * size + offset + 1
+        data = {"entries": entries, "pageSize": size}
+        if report_count:
+            data["count"] = BOARD_SIZE
+        return httpx.Response(200, json={"data": data})
+
+    handler.pages = []
+    return handler
+
+
+def run(handler, func):
+    async def go():
+        ticks = itertools.count(0, 60) # A minute passes between requests, so the limiter never waits
+        client = APIClient(base_url="https://api.test", http2=False, transport=httpx.MockTransport(handler),
+                           rate_limiter=RateLimiter(clock=lambda: next(ticks)))
+        try:
+            return await func(LeaderboardPager(client, "time", "english", "60", page_size=PAGE_SIZE))
+        finally:
+            await client.close()
+    return asyncio.run(go())
+
+
+@pytest.mark.parametrize("report_count", [True, False])
+@pytest.mark.parametrize("rank", [1, 10, 11, 150, BOARD_SIZE])
+def test_find_rank(report_count, rank):
+    entry = run(board_handler(report_count), lambda pager: pager.find_rank(rank))
+    assert entry is not None and entry.rank == rank and entry.uid == f"u{rank - 1}"
+
+
+def test_find_rank_past_the_end():
+    assert run(board_handler(True), lambda pager: pager.find_rank(BOARD_SIZE + 1)) is None
+
+
+def test_unranked_entries_are_numbered_by_page():
+    entry = run(board_handler(True, unranked=True), lambda pager: pager.find_rank(57))
+    assert entry is not None and entry.uid == "u56"
+
+
+@pytest.mark.parametrize("report_count", [True, False])
+@pytest.mark.parametrize("index", [0, 5, 39, 52, 120, BOARD_SIZE - 1])
+def test_find_user(report_count, index):
+    handler = board_handler(report_count)
+    user = BOARD[index]
+    entry = run(handler, lambda pager: pager.find_user(user["name"].upper(), user["wpm"]))
+    assert entry is not None and entry.uid == user["uid"]
+    assert len(set(handler.pages)) <= 12 # A search, not a scan of all 24 pages
+
+
+def test_pages_streams_the_whole_board():
+    async def collect(pager):
+        return [entry.uid async for entry in pager.entries()]
+
+    assert run(board_handler(False), collect) == [entry["uid"] for entry in BOARD]
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import httpx
+
+from monkeytyper_cli.api import session
+from monkeytyper_cli.api.client import APIClient
+from monkeytyper_cli.api.session import ApiSession
+
+
+def make_client() -> APIClient:
+    handler = lambda request: httpx.Response(200, json={"path": request.url.path})
+    return APIClient(base_url="https://api.test", http2=False, transport=httpx.MockTransport(handler))
+
+
+def test_calls_share_the_session_client():
+    with ApiSession(make_client) as api:
+        first = api.run(lambda client: client.get("/a"))
+        second = api.run(lambda client: client.get("/b"))
+        client = api.client
+    assert (first, second) == ({"path": "/a"}, {"path": "/b"})
+    assert client._client is None # Closed with the session
+
+
+def test_close_gives_up_on_a_hung_client(monkeypatch):
+    monkeypatch.setattr(session, "CLOSE_TIMEOUT", 0.2)
+
+    class HungClient(APIClient):
+        async def close(self) -> None:
+            await asyncio.sleep(60)
+
+    api = ApiSession(lambda: HungClient(base_url="https://api.test"))
+    api.run(lambda client: asyncio.sleep(0))
+    started = time.monotonic()
+    api.close()
+    assert time.monotonic() - started < 5
@@ -0,0 +1,64 @@
+import asyncio
+import itertools
+
+import httpx
+import pytest
+
+from monkeytyper_cli import main
+from monkeytyper_cli.api.client import APIClient
+from monkeytyper_cli.api.pagination import LeaderboardPager
+from monkeytyper_cli.api.ratelimit import RateLimiter
+from monkeytyper_cli.api.snapshots import refresh_snapshot
+from monkeytyper_cli.core.enums import GameMode, Language
+from monkeytyper_cli.core.snapshots import SnapshotStore, refresh_plan
+
+BOARD_SIZE = 600
+PAGE_SIZE = 10
+
+
+def handler(request):
+    page = int(request.url.params["page"])
+    ranks = range(page * PAGE_SIZE + 1, min(BOARD_SIZE, (page + 1) * PAGE_SIZE) + 1)
+    entries = [{"rank": rank, "wpm": 250.0 - rank / 4} for rank in ranks]
+    return httpx.Response(200, json={"data": {"count": BOARD_SIZE, "entries": entries}})
+
+
+def refresh(store: SnapshotStore, max_pages: int):
+    async def go():
+        ticks = itertools.count(0, 60)
+        client = APIClient(base_url="https://api.test", http2=False, transport=httpx.MockTransport(handler),
+                           rate_limiter=RateLimiter(clock=lambda: next(ticks)))
+        try:
+            pager = LeaderboardPager(client, "time", "en", "60", page_size=PAGE_SIZE)
+            return await refresh_snapshot(pager, store, max_pages)
+        finally:
+            await client.close()
+    return asyncio.run(go())
+
+
+def test_refreshes_build_up_the_plan(tmp_path):
+    store = SnapshotStore(tmp_path)
+    first = refresh(store, max_pages=4)
+    assert sorted({(rank - 1) // PAGE_SIZE for rank in first.ranks}) == [0, 1, 2, 3]
+    second = refresh(store, max_pages=4)
+    # The top page again, three new pages, and the rows of the first refresh carried over
+    assert sorted({(rank - 1) // PAGE_SIZE for rank in second.ranks}) == [0, 1, 2, 3, 4, 5, 6]
+    assert second.total == BOARD_SIZE
+    assert store.latest("time", "60", "en") is not None
+
+
+def test_full_plan_gives_exact_standings(tmp_path):
+    store = SnapshotStore(tmp_path)
+    snapshot = refresh(store, max_pages=len(refresh_plan(BOARD_SIZE // PAGE_SIZE)))
+    standing = snapshot.standing(250.0 - 25.5 / 4) # Between ranks 25 and 26
+    assert standing is not None and standing.exact and standing.rank == 26
+
+
+@pytest.mark.parametrize("mode, config_value, board", [
+    (GameMode.TIME, 15, ("time", "15", "en")),
+    (GameMode.TIME, 60, ("time", "60", "en")),
+    (GameMode.TIME, 30, None), # No leaderboard for 30 second tests
+    (GameMode.WORDS, 60, None),
+])
+def test_only_leaderboard_durations_have_a_board(mode, config_value, board):
+    assert main._snapshot_board(mode, config_value, Language.EN) == board
@@ -0,0 +1,53 @@
+import calendar
+import time
+
+import pytest
+
+from monkeytyper_cli.core.analytics import analyse, load_columns
+from monkeytyper_cli.core.enums import GameMode
+from monkeytyper_cli.core.history import HistoryStore
+from monkeytyper_cli.core.models import TestResult as Result # Not collected as a test class
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def utc(*fields: int) -> float:
+    return float(calendar.timegm((*fields, 0, 0, 0)))
+
+
+def columns_for(tmp_path, finished_at):
+    with HistoryStore(tmp_path / "history.sqlite3") as store:
+        for timestamp in finished_at:
+            store.append(Result(wpm=80.0, accuracy=95.0, mode=GameMode.TIME, config_value=60), "en",
+                         finished_at=timestamp)
+        return load_columns(store)
+
+
+def test_hours_follow_daylight_saving(tmp_path, new_york):
+    # Noon in New York: 17:00 UTC in winter (EST), 16:00 UTC in summer (EDT)
+    winter, summer = utc(2025, 1, 15, 17, 0), utc(2025, 7, 15, 16, 0)
+    stats = analyse(columns_for(tmp_path, [winter, summer]))
+    assert stats is not None
+    assert [(hour.hour, hour.tests) for hour in stats.hours] == [(12, 2)]
+
+
+def test_hours_either_side_of_a_transition(tmp_path, new_york):
+    # Clocks went forward at 07:00 UTC on 9 March 2025: 01:30 EST, then 03:30 EDT
+    stats = analyse(columns_for(tmp_path, [utc(2025, 3, 9, 6, 30), utc(2025, 3, 9, 7, 30)]))
+    assert stats is not None
+    assert [hour.hour for hour in stats.hours] == [1, 3]
+
+
+def test_fixed_offset(tmp_path, new_york):
+    stats = analyse(columns_for(tmp_path, [utc(2025, 1, 15, 17, 0), utc(2025, 7, 15, 16, 0)]), utc_offset=0)
+    assert stats is not None
+    assert [hour.hour for hour in stats.hours] == [16, 17]
@@ -0,0 +1,191 @@
+import random
+
+import pytest
+
+from monkeytyper_cli.core import engine
+from monkeytyper_cli.core.enums import GameMode
+from monkeytyper_cli.core.enums import TestState as State # Not collected as a test class
+from monkeytyper_cli.core.models import ErrorBitmap, GameState
+
+BACKSPACE = engine.BACKSPACE_CHAR
+
+
+KEY_INTERVAL = 0.1
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def new_game(prompt: str, mode: GameMode = GameMode.TIME, config_value: int = 60) -> GameState:
+    return GameState(prompt_text=prompt, mode=mode, config_value=config_value, clock=FakeClock())
+
+
+def type_keys(game_state: GameState, keys: str) -> None:
+    """Types `keys` one every KEY_INTERVAL seconds, starting at time 0."""
+    clock = game_state.clock
+    assert isinstance(clock, FakeClock)
+    for char in keys:
+        if game_state.state != State.NOT_STARTED:
+            clock.now += KEY_INTERVAL
+        engine.process_input(game_state, char, clock.now)
+
+
+def recount(game_state: GameState) -> dict:
+    """The counters rebuilt from the typed text, the way the engine used to compute them."""
+    prompt, text = game_state.prompt_text, game_state.user_input_text
+    overlap = min(len(prompt), len(text))
+    mismatched = [i for i in range(overlap) if text[i] != prompt[i]]
+    return {
+        "correct_chars_count": overlap - len(mismatched),
+        "incorrect_chars_count": len(mismatched),
+        "extra_chars_count": max(0, len(text) - len(prompt)),
+        "error_indices": mismatched + list(range(len(prompt), len(text))),
+        "current_word_index": text.count(" "),
+        "current_char_index_overall": len(text),
+    }
+
+
+def counters(game_state: GameState) -> dict:
+    return {
+        "correct_chars_count": game_state.correct_chars_count,
+        "incorrect_chars_count": game_state.incorrect_chars_count,
+        "extra_chars_count": game_state.extra_chars_count,
+        "error_indices": list(game_state.error_indices),
+        "current_word_index": game_state.current_word_index,
+        "current_char_index_overall": game_state.current_char_index_overall,
+    }
+
+
+def test_correct_typing():
+    game_state = new_game("the quick")
+    type_keys(game_state, "the qu")
+    assert counters(game_state) == recount(game_state)
+    assert game_state.correct_chars_count == 6
+    assert game_state.total_typed_entries == 6
+
+
+def test_backspace_over_error():
+    game_state = new_game("the quick")
+    type_keys(game_state, "thx")
+    assert game_state.incorrect_chars_count == 1
+    type_keys(game_state, BACKSPACE + "e")
+    assert counters(game_state) == recount(game_state)
+    assert game_state.incorrect_chars_count == 0
+    assert game_state.correct_chars_count == 3
+    assert game_state.total_typed_entries == 4 # Backspaced keys still count towards raw WPM
+
+
+def test_backspace_over_correct_char():
+    game_state = new_game("the quick")
+    type_keys(game_state, "the" + BACKSPACE * 2)
+    assert counters(game_state) == recount(game_state)
+    assert game_state.correct_chars_count == 1
+
+
+def test_extra_chars_past_prompt():
+    game_state = new_game("ab")
+    type_keys(game_state, "abcd")
+    assert counters(game_state) == recount(game_state)
+    assert game_state.extra_chars_count == 2
+    type_keys(game_state, BACKSPACE * 3)
+    assert counters(game_state) == recount(game_state)
+    assert game_state.extra_chars_count == 0
+    assert game_state.correct_chars_count == 1
+
+
+def test_word_boundary():
+    game_state = new_game("ab cd ef")
+    type_keys(game_state, "ab c")
+    assert game_state.current_word_index == 1
+    type_keys(game_state, BACKSPACE * 2)
+    assert counters(game_state) == recount(game_state)
+    assert game_state.current_word_index == 0
+    type_keys(game_state, "x") # A mistyped space still ends the word only if it's a space
+    assert game_state.current_word_index == 0
+    assert counters(game_state) == recount(game_state)
+
+
+def test_backspace_before_start_is_ignored():
+    game_state = new_game("ab")
+    engine.process_input(game_state, BACKSPACE, 0.0)
+    assert game_state.state == State.NOT_STARTED
+    assert game_state.total_typed_entries == 0
+
+
+def test_words_mode_finishes_on_the_last_word():
+    game_state = new_game("ab cd ef", GameMode.WORDS, 2)
+    assert game_state.target_chars == len("ab cd")
+    type_keys(game_state, "ab cd ")
+    assert game_state.state == State.FINISHED
+    type_keys(game_state, "ef") # Ignored once finished
+    assert game_state.user_input_text == "ab cd "
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_keys_match_recount(seed):
+    rng = random.Random(seed)
+    game_state = new_game("lorem ipsum dolor sit amet")
+    for _ in range(200):
+        roll = rng.random()
+        if roll < 0.25:
+            char = BACKSPACE
+        elif roll < 0.4:
+            char = " "
+        elif roll < 0.7 and len(game_state.user_input_chars) < len(game_state.prompt_text):
+            char = game_state.prompt_text[len(game_state.user_input_chars)]
+        else:
+            char = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        type_keys(game_state, char)
+        assert counters(game_state) == recount(game_state)
+
+
+def test_results_use_the_counters():
+    game_state = new_game("ab cd", GameMode.WORDS, 2)
+    type_keys(game_state, "ax" + BACKSPACE + "b cd")
+    engine.finish_game(game_state)
+    result = engine.calculate_results(game_state)
+    assert result.correct_chars == 5
+    assert result.incorrect_chars == 0
+    assert result.accuracy == 100.0
+    assert result.total_chars == 5
+    assert result.time_elapsed_seconds == pytest.approx(0.6) # Seven keys, first to last
+    assert result.wpm == pytest.approx(5 / 5 / (0.6 / 60))
+    assert result.raw_wpm == pytest.approx(6 / 5 / (0.6 / 60))
+
+
+def test_per_second_series_is_built_once():
+    game_state = new_game("the quick brown fox", mode=GameMode.WORDS, config_value=4)
+    type_keys(game_state, "the quick brown fo")
+    seconds = game_state.seconds
+    first = seconds.series(1.7)
+    assert seconds.series(1.7) is first
+    later = seconds.series(2.5) # Another duration is built again
+    assert later is not first
+    type_keys(game_state, "x") # A new key drops the cached series
+    assert seconds.series(2.5) is not later
+    assert seconds.series(2.5).raw_wpm != later.raw_wpm
+
+
+def test_game_states_get_their_own_buffers():
+    first, second = new_game("abc def"), new_game("abc def")
+    assert first.error_indices is not second.error_indices
+    assert first.seconds is not second.seconds
+    type_keys(first, "x")
+    assert list(first.error_indices) == [0] and list(second.error_indices) == []
+    with pytest.raises(TypeError):
+        GameState(prompt_text="abc", mode=GameMode.TIME, config_value=15, seconds=None) # Built from the mode
+
+
+def test_error_bitmap_reserve():
+    bitmap = ErrorBitmap()
+    bitmap.reserve(100)
+    size = len(bitmap.bits)
+    for index in (0, 7, 8, 99):
+        bitmap.add(index)
+    assert len(bitmap.bits) == size
+    assert list(bitmap) == [0, 7, 8, 99] and 99 in bitmap and 98 not in bitmap and "x" not in bitmap
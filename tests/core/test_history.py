@@ -0,0 +1,79 @@
+import pytest
+
+from monkeytyper_cli import main
+from monkeytyper_cli.core.enums import GameMode
+from monkeytyper_cli.core.history import HistoryStore
+from monkeytyper_cli.core.models import TestResult as Result # Not collected as a test class
+
+DAY = 86400.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(tmp_path / "history.sqlite3") as store:
+        for day, (mode, config_value, language, wpm) in enumerate([
+            (GameMode.TIME, 60, "en", 80.0),
+            (GameMode.TIME, 15, "en", 95.0),
+            (GameMode.WORDS, 25, "id", 70.0),
+            (GameMode.TIME, 60, "id", 85.0),
+            (GameMode.TIME, 60, "en", 90.0),
+        ]):
+            result = Result(wpm=wpm, raw_wpm=wpm + 5, accuracy=96.0, time_elapsed_seconds=config_value,
+                            mode=mode, config_value=config_value)
+            store.append(result, language, finished_at=day * DAY)
+        yield store
+
+
+def test_append_returns_increasing_ids(store):
+    result = Result(mode=GameMode.TIME, config_value=30)
+    first, second = store.append(result, "en"), store.append(result, "en")
+    assert second == first + 1
+
+
+def test_recent_is_newest_first(store):
+    assert [row.wpm for row in store.recent(3)] == [90.0, 85.0, 70.0]
+    assert [row.wpm for row in store.recent(2, offset=3)] == [95.0, 80.0]
+
+
+@pytest.mark.parametrize("filters, wpms", [
+    ({"mode": "time"}, [90.0, 85.0, 95.0, 80.0]),
+    ({"mode": "time", "config_value": 60}, [90.0, 85.0, 80.0]),
+    ({"language": "id"}, [85.0, 70.0]),
+    ({"since": 2 * DAY}, [90.0, 85.0, 70.0]),
+    ({"since": DAY, "until": 3 * DAY}, [70.0, 95.0]),
+    ({"mode": "words", "language": "en"}, []),
+    ({"ids": [1, 4, 5]}, [90.0, 85.0, 80.0]),
+    ({"ids": [2, 5], "language": "en"}, [90.0, 95.0]),
+    ({"ids": []}, []),
+])
+def test_filters(store, filters, wpms):
+    assert [row.wpm for row in store.recent(10, **filters)] == wpms
+    assert store.count(**filters) == len(wpms)
+
+
+def test_summary(store):
+    *per_board, total = store.summary(language="en")
+    assert [(s.mode, s.config_value, s.tests) for s in per_board] == [("time", 60, 2), ("time", 15, 1)]
+    assert total.mode is None and total.tests == 3
+    assert total.avg_wpm == pytest.approx((80 + 95 + 90) / 3)
+    assert total.best_wpm == 95.0
+    assert (total.first_at, total.last_at) == (0.0, 4 * DAY)
+
+
+def test_this_session_only_lists_this_processes_results(store, monkeypatch):
+    from monkeytyper_cli.ui import history as ui_history
+
+    own = store.append(Result(wpm=101.0, mode=GameMode.TIME, config_value=15), "en", finished_at=10 * DAY)
+    # Stored by another CLI process sharing the file
+    store.append(Result(wpm=55.0, mode=GameMode.TIME, config_value=15), "en", finished_at=11 * DAY)
+    monkeypatch.setattr(main, "get_history_store", lambda: store)
+    monkeypatch.setattr(main, "session_result_ids", [own])
+    shown = []
+
+    def display_history(results, total, title="Recent Results"):
+        shown.append((title, [row.wpm for row in results], total))
+
+    monkeypatch.setattr(ui_history, "display_history", display_history)
+    monkeypatch.setattr(ui_history, "display_summary", lambda summaries: None)
+    main.view_history()
+    assert shown == [("This Session", [101.0], 1), ("Recent Results", [55.0, 101.0, 90.0, 85.0, 70.0, 95.0, 80.0], 7)]
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from monkeytyper_cli.core.keystats import KEYS, MAX_LATENCY, KeyStats, key_id, slot_text
+
+TEXT = "the quick brown fox jumps over the lazy dog " * 20
+
+
+def typed(key_stats: KeyStats, text: str, rng: random.Random, start: float = 0.0) -> float:
+    """Records `text` typed with random gaps and mistakes; returns the last timestamp."""
+    timestamp = start
+    for char in text:
+        timestamp += rng.uniform(0.05, 0.4)
+        key_stats.record(char, error=rng.random() < 0.1, timestamp=timestamp)
+    return timestamp
+
+
+def assert_same_rows(actual: KeyStats, expected: KeyStats) -> None:
+    expected_rows = expected.rows()
+    actual_rows = actual.rows()
+    assert [row[:4] for row in actual_rows] == [row[:4] for row in expected_rows]
+    for (*_, mean, m2), (*_, expected_mean, expected_m2) in zip(actual_rows, expected_rows):
+        assert mean == pytest.approx(expected_mean, rel=1e-12)
+        assert m2 == pytest.approx(expected_m2, rel=1e-9, abs=1e-12)
+
+
+def test_merged_halves_match_a_single_pass():
+    half = len(TEXT) // 2
+    single = KeyStats()
+    timestamp = typed(single, TEXT[:half], random.Random(1))
+    single.break_sequence() # The second half is a separate test
+    typed(single, TEXT[half:], random.Random(2), timestamp)
+
+    first, second = KeyStats(), KeyStats()
+    typed(first, TEXT[:half], random.Random(1))
+    typed(second, TEXT[half:], random.Random(2), timestamp)
+    merged = KeyStats()
+    for part in (first, second):
+        for row in part.rows():
+            merged.merge_row(*row)
+    assert_same_rows(merged, single)
+
+    # Merging into an accumulator that already has data gives the same result
+    for row in second.rows():
+        first.merge_row(*row)
+    assert_same_rows(first, single)
+
+
+def test_merged_variance_is_the_sample_variance():
+    latencies = [0.1, 0.3, 0.2, 0.6, 0.25, 0.15]
+    parts = []
+    for chunk in (latencies[:2], latencies[2:]):
+        key_stats = KeyStats()
+        timestamp = 0.0
+        key_stats.record("a", False, timestamp)
+        for latency in chunk:
+            timestamp += latency
+            key_stats.record("a", False, timestamp)
+        parts.append(key_stats)
+    merged = KeyStats()
+    for part in parts:
+        for row in part.rows([key_id("a")]):
+            merged.merge_row(*row)
+    weakness = merged.weakness(key_id("a"))
+    assert weakness.hits == 8
+    assert weakness.mean_latency == pytest.approx(sum(latencies) / 6)
+    mean = sum(latencies) / 6
+    assert weakness.stdev_latency == pytest.approx((sum((x - mean) ** 2 for x in latencies) / 5) ** 0.5)
+
+
+@pytest.mark.parametrize("gap, counted", [
+    (MAX_LATENCY / 2, True),
+    (MAX_LATENCY, True),
+    (MAX_LATENCY + 0.01, False), # A pause, not typing speed
+    (-0.01, False), # Out-of-order timestamp
+])
+def test_latency_gating(gap, counted):
+    key_stats = KeyStats()
+    key_stats.record("a", False, 10.0)
+    key_stats.record("b", False, 10.0 + gap)
+    bigram = KEYS + key_id("a") * KEYS + key_id("b")
+    rows = {slot: (hits, samples) for slot, hits, _, samples, _, _ in key_stats.rows()}
+    assert rows[key_id("a")] == (1, 0) # First key has no latency
+    assert rows[key_id("b")] == rows[bigram] == (1, int(counted))
+
+
+def test_bigram_slots():
+    key_stats = KeyStats()
+    for timestamp, char in enumerate("th"):
+        key_stats.record(char, error=char == "h", timestamp=timestamp * 0.1)
+    slots = [slot for slot, *_ in key_stats.rows()]
+    bigram = KEYS + key_id("t") * KEYS + key_id("h")
+    assert slots == sorted([key_id("t"), key_id("h"), bigram])
+    assert slot_text(bigram) == "th"
+    assert key_stats.weakness(bigram).errors == 1
+    assert key_stats.weakness(KEYS + key_id("h") * KEYS + key_id("t")).hits == 0
+
+
+@pytest.mark.parametrize("between", ["é", None])
+def test_untracked_chars_and_backspaces_break_bigrams(between):
+    key_stats = KeyStats()
+    key_stats.record("a", False, 0.0)
+    if between is None:
+        key_stats.break_sequence()
+    else:
+        key_stats.record(between, False, 0.1)
+    key_stats.record("b", False, 0.2)
+    assert [slot for slot, *_ in key_stats.rows()] == [key_id("a"), key_id("b")]
+    assert key_stats.weakness(key_id("b")).hits == 1
@@ -0,0 +1,38 @@
+import random
+
+from monkeytyper_cli.core import practice
+from monkeytyper_cli.core.keystats import KeyStats, key_id
+from monkeytyper_cli.core.sampling import WordSampler
+
+WORDS = ["the", "of", "and", "quiz", "jazz", "queen", "fizz", "zero", "that", "with"]
+
+
+def postings(index: practice.BigramIndex, slot: int):
+    word_ids, counts = index.postings(slot)
+    return list(word_ids), list(counts)
+
+
+def test_index_round_trip(tmp_path):
+    built = practice.BigramIndex.build(WORDS)
+    path = tmp_path / f"words{practice.INDEX_SUFFIX}"
+    built.save(path)
+    loaded = practice.BigramIndex.load(path)
+    assert loaded.word_count == len(WORDS)
+    for slot in range(len(built.starts) - 1):
+        assert postings(loaded, slot) == postings(built, slot)
+    z = key_id("z")
+    assert postings(loaded, z) == ([3, 4, 6, 7], [1, 2, 2, 1])
+
+
+def test_practice_words_target_the_weak_key():
+    key_stats = KeyStats()
+    timestamp = 0.0
+    for _ in range(50):
+        for char in "zebra":
+            timestamp += 0.2
+            key_stats.record(char, error=char == "z", timestamp=timestamp)
+    index = practice.BigramIndex.build(WORDS)
+    plan = practice.plan(key_stats, index, min_hits=10)
+    assert plan is not None and plan.slots[0] == key_id("z")
+    drawn = practice.draw_practice_words(WORDS, WordSampler(WORDS), index, plan, 200, rng=random.Random(4))
+    assert sum("z" in word for word in drawn) > 100
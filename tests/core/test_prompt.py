@@ -0,0 +1,37 @@
+import random
+
+from monkeytyper_cli.core import engine
+from monkeytyper_cli.core.models import PromptOptions
+
+WORDS = [f"word{i}" for i in range(200)]
+PUNCTUATION = PromptOptions(punctuation=True)
+
+
+def assert_sentences(words: list) -> None:
+    """Every word after a sentence ending is capitalised, and no other word is."""
+    starts_sentence = True
+    for word in words:
+        assert word[0].isupper() == starts_sentence, word
+        starts_sentence = word[-1] in engine.SENTENCE_ENDINGS
+
+
+def test_stream_carries_sentences_across_chunks():
+    stream = engine.PromptStream(WORDS, PUNCTUATION, random.Random(1))
+    chunks = [stream(engine.PROMPT_CHUNK_WORDS) for _ in range(40)]
+    assert_sentences([word for chunk in chunks for word in chunk])
+    # A chunk boundary doesn't close the sentence
+    assert any(chunk[-1][-1] not in engine.SENTENCE_ENDINGS for chunk in chunks)
+
+
+def test_extended_time_prompt_reads_as_one_text(monkeypatch):
+    monkeypatch.setitem(engine.WORD_LIST_CACHE, "en", WORDS)
+    game_state = engine.start_game(engine.GameMode.TIME, 60, "en", PUNCTUATION, seed=3)
+    for _ in range(10):
+        engine.extend_prompt(game_state)
+    assert_sentences(game_state.prompt_text.split(" "))
+
+
+def test_words_prompt_ends_a_sentence():
+    words = engine.draw_words(WORDS, 30, PUNCTUATION, random.Random(2))
+    assert_sentences(words)
+    assert words[-1][-1] in engine.SENTENCE_ENDINGS
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from monkeytyper_cli.core import engine, practice, wordpack
+from monkeytyper_cli.core.enums import GameMode
+from monkeytyper_cli.core.models import GameState, PromptOptions
+from monkeytyper_cli.core.prompt_pool import PromptPool
+
+OPTIONS = PromptOptions(punctuation=True, numbers=True)
+
+
+@pytest.fixture
+def pool():
+    pool = PromptPool()
+    pool.enabled = True
+    yield pool
+    pool.shutdown()
+
+
+def full_prompt(game_state: GameState, chunks: int = 5) -> str:
+    """The prompt after streaming in a few more chunks, as a long time test would."""
+    for _ in range(chunks):
+        engine.extend_prompt(game_state)
+    return game_state.prompt_text
+
+
+@pytest.mark.parametrize("mode, config_value", [(GameMode.TIME, 30), (GameMode.WORDS, 25)])
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_seeded_prompt_is_the_same_with_the_pool(pool, mode, config_value, prefetch):
+    expected = full_prompt(engine.start_game(mode, config_value, "en", OPTIONS, seed=7))
+    if prefetch:
+        pool.prefetch(mode, config_value, "en", OPTIONS, seed=7)
+    assert full_prompt(pool.take(mode, config_value, "en", OPTIONS, seed=7)) == expected
+
+
+def test_take_matches_the_seed(pool):
+    pool.prefetch(GameMode.TIME, 30, "en", OPTIONS, seed=1)
+    game_state = pool.take(GameMode.TIME, 30, "en", OPTIONS, seed=2)
+    assert game_state.prompt_text == engine.start_game(GameMode.TIME, 30, "en", OPTIONS, seed=2).prompt_text
+    # The unmatched prefetch is still there for a later test with seed 1
+    assert pool.take(GameMode.TIME, 30, "en", OPTIONS, seed=1).prompt_text == \
+        engine.start_game(GameMode.TIME, 30, "en", OPTIONS, seed=1).prompt_text
+
+
+WORDS = [f"word{i}" for i in range(20000)]
+
+
+def test_concurrent_pack_builds_leave_a_whole_pack(tmp_path):
+    path = tmp_path / f"words{wordpack.PACK_SUFFIX}"
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: wordpack.build(WORDS, path), range(8)))
+    assert list(wordpack.WordPack(path)) == WORDS
+    assert list(tmp_path.iterdir()) == [path] # No temp files left behind
+
+
+def test_concurrent_index_saves_leave_a_whole_index(tmp_path):
+    path = tmp_path / f"words{practice.INDEX_SUFFIX}"
+    index = practice.BigramIndex.build(WORDS)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: index.save(path), range(8)))
+    assert list(practice.BigramIndex.load(path).word_ids) == list(index.word_ids)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_word_list_is_loaded_once_across_threads(monkeypatch):
+    monkeypatch.setattr(engine, "WORD_LIST_CACHE", {})
+    opened = []
+    open_for_source = wordpack.open_for_source
+
+    def counting_open(*args):
+        opened.append(args)
+        return open_for_source(*args)
+
+    monkeypatch.setattr(wordpack, "open_for_source", counting_open)
+    with ThreadPoolExecutor(4) as executor:
+        word_lists = list(executor.map(lambda _: engine.load_word_list("en"), range(4)))
+    assert len(opened) == 1
+    assert all(word_list is word_lists[0] for word_list in word_lists)
@@ -0,0 +1,97 @@
+import pytest
+
+from monkeytyper_cli.core import engine, keylog, replay
+from monkeytyper_cli.core.enums import GameMode, Language
+from monkeytyper_cli.core.keylog import BACKSPACE_CODE, KeystrokeLog, RecordedSession
+from monkeytyper_cli.core.models import GameState
+
+BACKSPACE = engine.BACKSPACE_CHAR
+
+
+def play(prompt: str, mode: GameMode, config_value: int, keys: str, start: float = 1000.0,
+         interval: float = 0.13, end: float | None = None) -> GameState:
+    """Plays `keys` on a virtual clock starting at `start`, like a real test would on time.monotonic()."""
+    now = [start]
+    game_state = GameState(prompt_text=prompt, mode=mode, config_value=config_value, language="en",
+                           clock=lambda: now[0])
+    for i, char in enumerate(keys):
+        now[0] = start + i * interval
+        engine.process_input(game_state, char, now[0])
+    if end is not None:
+        now[0] = end
+    engine.finish_game(game_state)
+    return game_state
+
+
+def sample_session() -> RecordedSession:
+    log = KeystrokeLog()
+    for i, code in enumerate((ord("h"), ord("é"), BACKSPACE_CODE, ord("i"), ord("😀"))):
+        log.record(code, 50.0 + i * 0.25)
+    return RecordedSession("hi there – ünïcode 😀", "time", 30, "en", 12.5, log)
+
+
+def test_keylog_round_trip():
+    session = sample_session()
+    loaded = keylog.loads(keylog.dumps(session))
+    assert loaded.prompt_text == session.prompt_text
+    assert (loaded.mode, loaded.config_value, loaded.language, loaded.duration) == ("time", 30, "en", 12.5)
+    assert list(loaded.log) == list(session.log)
+    assert list(loaded.log.times) == [0.0, 0.25, 0.5, 0.75, 1.0] # Relative to the first key
+
+
+def test_keylog_file_round_trip(tmp_path):
+    session = sample_session()
+    path = keylog.save(tmp_path / "logs" / "test.mtkl", session)
+    assert list(keylog.load(path).log) == list(session.log)
+
+
+def test_save_new_never_overwrites(tmp_path):
+    session = sample_session()
+    paths = [keylog.save_new(tmp_path, "20260101-120000-time30", session) for _ in range(3)]
+    assert [path.name for path in paths] == [
+        "20260101-120000-time30.mtkl", "20260101-120000-time30-2.mtkl", "20260101-120000-time30-3.mtkl",
+    ]
+
+
+@pytest.mark.parametrize("data", [b"", b"MTKL", b"XXXX" + bytes(40)])
+def test_loads_rejects_bad_data(data):
+    with pytest.raises(ValueError):
+        keylog.loads(data)
+
+
+def test_loads_rejects_truncated_keys():
+    data = keylog.dumps(sample_session())
+    with pytest.raises(ValueError):
+        keylog.loads(data[:-1])
+
+
+def test_backspace_is_normalised():
+    game_state = play("ab", GameMode.TIME, 30, "ax" + BACKSPACE + "b")
+    assert list(game_state.keylog.codes) == [ord("a"), ord("x"), BACKSPACE_CODE, ord("b")]
+
+
+@pytest.mark.parametrize("mode, config_value, keys, end", [
+    (GameMode.WORDS, 3, "the quikc" + BACKSPACE * 2 + "ck brown ", None),
+    (GameMode.WORDS, 2, "thx" + BACKSPACE + "e quick extra", None), # Finishes on the space after the second word
+    (GameMode.TIME, 2, "the quick brown fox", 1002.0), # Runs into the deadline
+    (GameMode.TIME, 30, "the qu", 1010.0), # Stopped early
+])
+def test_replay_matches_the_original_results(mode, config_value, keys, end):
+    game_state = play("the quick brown fox jumps", mode, config_value, keys, end=end)
+    original = engine.calculate_results(game_state)
+    session = keylog.loads(keylog.dumps(replay.record_session(game_state)))
+    assert replay.replay(session) == original
+
+
+def test_replay_file(tmp_path):
+    game_state = play("the quick brown", GameMode.WORDS, 2, "the quick ")
+    path = keylog.save(tmp_path / "game.mtkl", replay.record_session(game_state))
+    assert replay.replay_file(path) == engine.calculate_results(game_state)
+
+
+@pytest.mark.parametrize("language", ["id", "xx"]) # "xx" is from a newer version, or a damaged log
+def test_replay_keeps_known_languages(language):
+    game_state = play("the quick brown", GameMode.WORDS, 2, "the quick ")
+    session = replay.record_session(game_state)._replace(language=language)
+    assert replay.replay(session) == engine.calculate_results(game_state)
+    assert replay._language(language) == (Language.ID if language == "id" else None)
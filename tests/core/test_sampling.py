@@ -0,0 +1,54 @@
+from collections import Counter
+import random
+
+from monkeytyper_cli.core import engine, wordpack
+from monkeytyper_cli.core.sampling import AliasTable, WordSampler
+
+WORDS = [f"w{i}" for i in range(100)]
+
+
+def test_alias_table_follows_the_weights():
+    table = AliasTable([1.0, 3.0, 0.0, 4.0])
+    rng = random.Random(1)
+    counts = Counter(table.draw(rng) for _ in range(80000))
+    assert counts[2] == 0
+    for index, share in ((0, 1 / 8), (1, 3 / 8), (3, 4 / 8)):
+        assert abs(counts[index] / 80000 - share) < 0.01
+
+
+def test_sampler_without_counts_is_uniform():
+    sampler = WordSampler(WORDS)
+    counts = Counter(sampler.draw(50000, rng=random.Random(2)))
+    assert max(counts.values()) / 50000 < 0.02 # 1% expected per word
+
+
+def test_word_pack_without_counts_is_uniform(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("\n".join(WORDS), encoding="utf-8")
+    pack = wordpack.WordPack(wordpack.build_from_text(source, tmp_path / "words.mtwp"))
+    assert set(pack.weights) == {1.0}
+
+
+def test_word_pack_counts_are_used_as_weights(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("common\t900\nrare\t100\n", encoding="utf-8")
+    pack = wordpack.WordPack(wordpack.build_from_text(source, tmp_path / "words.mtwp"))
+    assert list(pack.weights) == [900.0, 100.0]
+    rng = random.Random(3)
+    counts = Counter(pack.alias_table.draw(rng) for _ in range(20000))
+    assert abs(counts[0] / 20000 - 0.9) < 0.01
+
+
+def test_bundled_list_is_not_dominated_by_its_first_word():
+    words = engine.load_word_list("en")
+    counts = Counter(engine.draw_words(words, 20000, rng=random.Random(4)))
+    assert counts[words[0]] / 20000 < 0.03
+
+
+def test_word_pack_is_sorted_by_count(tmp_path):
+    source = tmp_path / "words.txt"
+    source.write_text("rare\t5\ncommon\t900\nusual\t100\nodd\t5\n", encoding="utf-8")
+    pack = wordpack.WordPack(wordpack.build_from_text(source, tmp_path / "words.mtwp"))
+    assert list(pack) == ["common", "usual", "rare", "odd"] # Ties keep their file order
+    assert list(pack.weights) == [900.0, 100.0, 5.0, 5.0]
+    assert set(pack.sampler().draw(200, top_n=2, rng=random.Random(4))) == {"common", "usual"}
@@ -0,0 +1,30 @@
+from array import array
+import math
+
+import pytest
+
+from monkeytyper_cli.core import simulate
+from monkeytyper_cli.core.enums import GameMode
+from monkeytyper_cli.core.models import PromptOptions
+
+
+def test_distribution():
+    summary = simulate.distribution(array("d", [float(i) for i in range(1, 101)] + [math.nan]))
+    assert summary is not None
+    assert summary.samples == 100
+    assert summary.mean == pytest.approx(50.5)
+    assert (summary.p5, summary.p50, summary.p95) == (6.0, 51.0, 96.0)
+    assert (summary.min, summary.max) == (1.0, 100.0)
+    assert simulate.distribution(array("d", [math.nan])) is None
+
+
+@pytest.mark.parametrize("mode, config_value", [(GameMode.WORDS, 10), (GameMode.TIME, 15)])
+def test_simulated_games_pass_the_checks(mode, config_value):
+    typist = simulate.Typist(error_rate=0.1, burst=20)
+    scenario = simulate.Scenario(mode, config_value, "en", PromptOptions(punctuation=True), typist, check=True)
+    result = simulate.simulate(scenario, games=20, seed=1, workers=1)
+    assert result.failures == [] and result.failure_count == 0
+    assert result.distributions["wpm"].samples == 20
+    # Every game replays from its seed
+    again = simulate.simulate(scenario, games=20, seed=1, workers=1)
+    assert again.distributions == result.distributions
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from monkeytyper_cli.core import engine
+from monkeytyper_cli.core.models import GameMode, TestState as State # Not collected as a test class
+from monkeytyper_cli.ui.game_loop import run_game
+from monkeytyper_cli.ui.keyboard import CTRL_C, KeyEvent
+
+WORDS = [f"word{i}" for i in range(200)]
+
+
+def typed(game_state) -> str:
+    return game_state.user_input_chars.tounicode()
+
+
+class FakeKeyboard:
+    """Hands out queued key events; a pipe makes the loop's reader see them arrive."""
+
+    def __init__(self) -> None:
+        self._read_fd, self._write_fd = os.pipe()
+        self._events: list = []
+
+    def send(self, chars: str, timestamp: float | None = None) -> None:
+        self._events.append(KeyEvent(chars, time.monotonic() if timestamp is None else timestamp))
+        os.write(self._write_fd, b"k")
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def read_available(self) -> list:
+        os.read(self._read_fd, 4096)
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> None:
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+class FakeRenderer:
+    def __init__(self) -> None:
+        self.frames: list = [] # Event loop time of each frame
+        self.last_write_seconds = 0.0
+
+    def render(self, renderable) -> None:
+        self.frames.append(asyncio.get_running_loop().time())
+
+
+@pytest.fixture
+def keyboard():
+    keyboard = FakeKeyboard()
+    yield keyboard
+    keyboard.close()
+
+
+@pytest.fixture(autouse=True)
+def word_list(monkeypatch):
+    monkeypatch.setitem(engine.WORD_LIST_CACHE, "en", WORDS)
+
+
+def play(game_state, keyboard, renderer, script, fps=60) -> bool:
+    """Runs a test, sending each (delay, chars) of the script from inside the event loop."""
+    async def go() -> bool:
+        loop = asyncio.get_running_loop()
+        for delay, chars in script:
+            loop.call_later(delay, keyboard.send, chars)
+        return await asyncio.wait_for(
+            run_game(game_state, keyboard, renderer, typed, fps), 5
+        )
+    return asyncio.run(go())
+
+
+def test_time_test_ends_at_its_deadline_without_more_keys(keyboard):
+    game_state = engine.start_game(GameMode.TIME, 15, "en", seed=1)
+    # The first key was pressed almost 15 seconds ago, and no other key follows
+    keyboard.send(game_state.prompt_text[0], time.monotonic() - 14.8)
+    started = time.monotonic()
+    assert play(game_state, keyboard, FakeRenderer(), []) is True
+    assert time.monotonic() - started < 1.0
+    assert game_state.state == State.FINISHED
+    assert game_state.start_time is not None
+    assert game_state.end_time == game_state.start_time + 15
+
+
+def test_ctrl_c_aborts(keyboard):
+    game_state = engine.start_game(GameMode.WORDS, 10, "en", seed=1)
+    renderer = FakeRenderer()
+    assert play(game_state, keyboard, renderer, [(0.01, game_state.prompt_text[:3]), (0.05, CTRL_C)]) is False
+    assert game_state.state == State.RUNNING
+    assert typed(game_state) == game_state.prompt_text[:3]
+    assert renderer.frames
+
+
+def test_frames_are_coalesced_to_the_fps(keyboard):
+    fps = 20
+    game_state = engine.start_game(GameMode.WORDS, 50, "en", seed=1)
+    text = game_state.prompt_text
+    keys = 100
+    script = [(i * 0.004, text[i]) for i in range(keys)] + [(keys * 0.004 + 0.05, CTRL_C)]
+    renderer = FakeRenderer()
+    assert play(game_state, keyboard, renderer, script, fps=fps) is False
+    assert typed(game_state) == text[:keys]
+    assert 3 <= len(renderer.frames) < keys / 4
+    gaps = [later - earlier for earlier, later in zip(renderer.frames, renderer.frames[1:])]
+    assert min(gaps) >= 1 / fps - 0.001
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from monkeytyper_cli.ui.keyboard import RawInput
+
+
+@pytest.fixture
+def keyboard():
+    """A RawInput reading from a pipe instead of the terminal."""
+    read_fd, write_fd = os.pipe()
+    raw = RawInput()
+    raw._fd = read_fd
+
+    def send(data: bytes) -> str:
+        os.write(write_fd, data)
+        return "".join(event.chars for event in raw.read_available())
+
+    yield send
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+@pytest.mark.parametrize("data, chars", [
+    (b"ab\x1b[Acd", "abcd"), # Arrow key
+    (b"a\x1b[15~b", "ab"), # F5
+    (b"a\x1bOPb", "ab"), # F1 (SS3)
+    (b"\x1ba", "a"), # ESC, then a key in the same read
+    (b"\x1b\x1b[Bz", "z"),
+])
+def test_escape_sequences_are_removed(keyboard, data, chars):
+    assert keyboard(data) == chars
+
+
+def test_sequence_split_across_reads(keyboard):
+    assert keyboard(b"ab\x1b") == "ab"
+    assert keyboard(b"[A") == ""
+    assert keyboard(b"c\x1bO") == "c"
+    assert keyboard(b"Bd") == "d"
+    assert keyboard(b"\x1b[1;5") == ""
+    assert keyboard(b"Ce") == "e"
+
+
+def test_lone_esc_waits_for_the_next_read(keyboard):
+    assert keyboard(b"\x1b") == ""
+    assert keyboard(b"x") == "x"
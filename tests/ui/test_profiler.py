@@ -0,0 +1,93 @@
+import json
+import random
+import statistics
+
+import pytest
+
+from monkeytyper_cli.ui.profiler import MAX_EXPONENT, SUB_BUCKETS, LatencyHistogram, StageProfiler
+
+LAST_BUCKET = (MAX_EXPONENT + 2) * SUB_BUCKETS - 1
+
+
+@pytest.mark.parametrize("value, index", [
+    (0, 0),
+    (15, 15), # Exact below SUB_BUCKETS
+    (16, 16), # First power of two: buckets one ns wide
+    (31, 31),
+    (32, 32), # Then two ns wide
+    (33, 32),
+    (34, 33),
+    (2 ** 37 - 1, LAST_BUCKET),
+    (2 ** 37, LAST_BUCKET), # Clamped at MAX_EXPONENT
+    (2 ** 60, LAST_BUCKET),
+])
+def test_bucket_index(value, index):
+    assert LatencyHistogram._index(value) == index
+
+
+@pytest.mark.parametrize("index, value", [(15, 15), (16, 16), (31, 31), (32, 33), (33, 35), (48, 66)])
+def test_bucket_midpoint(index, value):
+    assert LatencyHistogram._value(index) == value
+
+
+def test_buckets_hold_their_midpoints():
+    for index in range(LAST_BUCKET + 1):
+        assert LatencyHistogram._index(LatencyHistogram._value(index)) == index
+    assert len(LatencyHistogram().counts) == LAST_BUCKET + 1
+
+
+def test_clamped_values_keep_the_max():
+    histogram = LatencyHistogram()
+    histogram.record(0.001)
+    histogram.record(1e6, 3) # Over eleven days
+    assert histogram.counts[LAST_BUCKET] == 3
+    # The last bucket has no upper bound, so it reports the largest value seen instead of a midpoint
+    assert histogram.percentile(50) == histogram.percentile(100) == pytest.approx(1e6)
+    assert histogram.percentile(25) == pytest.approx(0.001, rel=1 / SUB_BUCKETS)
+
+
+def test_percentiles_within_the_bucket_resolution():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-9, 1.5) for _ in range(20000)] # Mostly 10µs to 1ms
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    for p in (1, 25, 50, 90, 99):
+        assert histogram.percentile(p) == pytest.approx(quantiles[p - 1], rel=1 / SUB_BUCKETS)
+    assert histogram.percentile(100) == pytest.approx(max(samples), abs=1e-9)
+    assert histogram.mean == pytest.approx(statistics.fmean(samples), abs=1e-9)
+    assert histogram.count == len(samples)
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().percentile(50) == LatencyHistogram().mean == 0.0
+
+
+def test_chrome_trace(tmp_path):
+    profiler = StageProfiler(trace=True)
+    origin = profiler.origin
+    profiler.record("read", origin + 0.001, 0.0002)
+    profiler.record("process_input", origin + 0.0012, 0.0003, count=3)
+    profiler.frame_done(origin + 0.002, 0.001, 0.0005, 0.0001)
+    path = tmp_path / "traces" / "trace.json"
+    assert profiler.write_trace(path) == 6
+
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert trace["displayTimeUnit"] == "ms"
+    metadata, *events = trace["traceEvents"]
+    assert metadata == {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "monkeytyper-cli"}}
+    assert events[0] == {"name": "read", "cat": "keystroke", "ph": "X", "pid": 1, "tid": 1,
+                         "ts": 1000.0, "dur": 200.0, "args": {}}
+    assert events[1]["args"] == {"keys": 3}
+    assert [(event["name"], event["cat"], event["ts"], event["dur"]) for event in events[2:]] == [
+        ("create_prompt_display", "frame", 2000.0, 1000.0),
+        ("render", "frame", 3000.0, 500.0),
+        ("write", "frame", 3500.0, 100.0),
+        ("frame", "frame", 2000.0, 1600.0),
+    ]
+
+
+def test_trace_needs_tracing(tmp_path):
+    with pytest.raises(ValueError):
+        StageProfiler().write_trace(tmp_path / "trace.json")
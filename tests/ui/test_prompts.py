@@ -0,0 +1,70 @@
+import pytest
+from rich.text import Text
+
+from monkeytyper_cli.ui import prompts
+from monkeytyper_cli.ui.prompts import CURSOR_STYLE, PromptLayout, get_prompt_layout
+
+PROMPT = "the quick brown fox"
+EXTENDED = PROMPT + " jumps over"
+
+
+@pytest.fixture(autouse=True)
+def no_cached_layout(monkeypatch):
+    monkeypatch.setattr(prompts, "_layout", None)
+
+
+def lines(layout: PromptLayout):
+    return [layout.prompt_text[slice(*layout.line_bounds(line))] for line in range(layout.line_count())]
+
+
+def test_words_wrap_at_the_width():
+    assert lines(PromptLayout(PROMPT, 10)) == ["the quick ", "brown fox"]
+
+
+def test_word_longer_than_the_width_is_split():
+    layout = PromptLayout("ab abcdefghijkl cd", 5)
+    assert lines(layout) == ["ab ", "abcde", "fghij", "kl cd"]
+    assert layout.line_of(9) == 2
+
+
+def test_extend_rewraps_only_the_tail():
+    layout = PromptLayout(PROMPT, 10)
+    typed = layout.visible_lines(12, set())[0] # Line 0 is typed and cached
+    layout.extend(EXTENDED)
+    assert layout.line_starts == PromptLayout(EXTENDED, 10).line_starts == [0, 10, 20]
+    assert layout.typed_line(0, set()) is typed
+    assert lines(layout)[1:] == ["brown fox ", "jumps over"]
+
+
+def test_backspace_onto_a_typed_line_restyles_it():
+    layout = PromptLayout(PROMPT, 10)
+    errors = {8}
+    assert layout.visible_lines(12, errors)[0] is layout.typed_line(0, errors)
+    errors.discard(8) # Backspaced over the error, back onto line 0
+    first = layout.visible_lines(8, errors)[0]
+    assert 0 not in layout._typed_lines
+    assert first == layout.styled_line(0, 8, errors)
+    assert any(span.style == CURSOR_STYLE and (span.start, span.end) == (8, 9) for span in first.spans)
+    # Moving past it again caches it without the error
+    assert layout.visible_lines(11, errors)[0] == layout.styled_line(0, 10, errors)
+
+
+def test_layout_is_cached_per_prompt_and_width():
+    layout = get_prompt_layout(PROMPT, 10)
+    assert get_prompt_layout(PROMPT, 10) is layout
+    resized = get_prompt_layout(PROMPT, 20)
+    assert resized is not layout and lines(resized) == ["the quick brown fox"]
+    assert get_prompt_layout(PROMPT, 10) is not resized
+
+
+def test_extended_prompt_keeps_the_layout():
+    layout = get_prompt_layout(PROMPT, 10)
+    extended = "".join([PROMPT, " jumps over"]) # A new string object, as extend_prompt makes
+    assert get_prompt_layout(extended, 10) is layout
+    assert layout.prompt_text is extended and layout.line_count() == 3
+    assert get_prompt_layout("the quick brown cat", 10) is not layout
+
+
+def test_pending_lines_are_plain():
+    layout = PromptLayout(EXTENDED, 10)
+    assert layout.visible_lines(0, set())[2] == Text("jumps·over", style=prompts.PENDING_STYLE)
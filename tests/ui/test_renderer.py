@@ -0,0 +1,84 @@
+import io
+
+import pytest
+from rich.console import Console
+from rich.style import Style
+from rich.text import Text
+
+from monkeytyper_cli.ui.renderer import CLEAR_BELOW, CLEAR_LINE_END, CLEAR_SCREEN, SYNC_END, SYNC_START, FrameRenderer
+
+
+class Screen:
+    """A renderer drawing into a StringIO, handing back the bytes of each frame."""
+
+    def __init__(self, width: int):
+        self.console = Console(file=io.StringIO(), width=width, color_system=None, legacy_windows=False)
+        self.stream = io.StringIO()
+        self.renderer = FrameRenderer(self.console, self.stream)
+
+    def draw(self, text: str) -> str:
+        self.renderer.render(Text(text))
+        written = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return written
+
+
+def frame(*parts: str) -> str:
+    return SYNC_START + "".join(parts) + SYNC_END
+
+
+@pytest.fixture
+def screen() -> Screen:
+    screen = Screen(8)
+    screen.draw("abc\ndef")
+    return screen
+
+
+def test_first_frame_draws_every_row():
+    assert Screen(8).draw("abc\ndef") == frame(
+        CLEAR_SCREEN, "\x1b[1;1Habc     ", CLEAR_LINE_END, "\x1b[2;1Hdef     ", CLEAR_LINE_END, "\x1b[3;1H"
+    )
+
+
+def test_unchanged_frame_only_moves_the_cursor(screen):
+    assert screen.draw("abc\ndef") == frame("\x1b[3;1H")
+
+
+def test_changed_row_rewrites_only_the_changed_cells(screen):
+    assert screen.draw("abc\ndXf") == frame("\x1b[2;2HX", "\x1b[3;1H")
+    assert screen.draw("Abc\ndXF") == frame("\x1b[1;1HA", "\x1b[2;3HF", "\x1b[3;1H")
+
+
+def test_wide_characters(screen):
+    assert screen.draw("ab界x\ndef") == frame("\x1b[1;3H界x", "\x1b[3;1H")
+    assert screen.draw("ab界y\ndef") == frame("\x1b[1;5Hy", "\x1b[3;1H") # Column 5, after the two cells of 界
+
+
+def test_change_inside_a_wide_character_starts_at_the_character(screen):
+    screen.draw("ab界x\ndef")
+    renderer = screen.renderer
+    char, style = renderer._previous[0][3]
+    assert (char, style) == ("", renderer._previous[0][2][1]) # Placeholder for the second cell of 界
+    renderer._previous[0][3] = ("", Style(bold=True))
+    assert screen.draw("ab界x\ndef") == frame("\x1b[1;3H界", "\x1b[3;1H")
+
+
+def test_shrunk_frame_clears_below(screen):
+    assert screen.draw("a") == frame("\x1b[1;2H  ", "\x1b[2;1H", CLEAR_BELOW, "\x1b[2;1H")
+
+
+def test_resize_redraws_everything(screen):
+    screen.console.width = 5
+    assert screen.draw("abc\ndef") == frame(
+        CLEAR_SCREEN, "\x1b[1;1Habc  ", CLEAR_LINE_END, "\x1b[2;1Hdef  ", CLEAR_LINE_END, "\x1b[3;1H"
+    )
+    assert screen.draw("abc\ndef") == frame("\x1b[3;1H")
+
+
+def test_stats_count_the_bytes_written():
+    screen = Screen(8)
+    written = [screen.draw("ab界\ndef"), screen.draw("ab界\ndXf")]
+    stats = screen.renderer.stats
+    assert stats.frames == 2
+    assert stats.total_bytes == sum(len(data.encode("utf-8")) for data in written)